@@ -0,0 +1,131 @@
+"""
+Persistent per-series cache of fitted forecast models.
+- SQLite file keyed on (model, series id); each entry stores the fitted parameters (JSON), the
+  number of observations they cover and a fingerprint of exactly that history
+- A series whose first n observations still match the fingerprint only gained new days, so its
+  model can be updated incrementally; a changed history (restated sales) is refit from scratch
+- classify() decides per series: hit, append, warm_start, refit or miss; report() summarizes a run
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+from utils.config import get_env
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+DEFAULT_CACHE_PATH = "forecast_models.sqlite"
+DEFAULT_REFIT_EVERY = 30  # new observations absorbed with cached parameters before re-estimating
+STATUSES = ("hit", "append", "warm_start", "refit", "miss")
+REUSED = ("hit", "append", "warm_start")
+
+
+@dataclass
+class CachedModel:
+    model: str  # model key, e.g. 'arima:1,1,1' or 'prophet'
+    series_id: str
+    n_obs: int  # observations the state was fitted on
+    fingerprint: str  # fingerprint() of those observations
+    state: Dict[str, Any]  # JSON-serializable fitted parameters (and last forecast)
+
+
+def fingerprint(dates: "np.ndarray", values: "np.ndarray") -> str:
+    """SHA-256 of a series' daily dates and values (order-sensitive)."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(np.asarray(dates).astype("datetime64[D]").astype(np.int64)).tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(values, dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def classify(entry: Optional[CachedModel], dates: "np.ndarray", values: "np.ndarray", refit_every: Optional[int] = DEFAULT_REFIT_EVERY, can_append: bool = True) -> str:
+    """How a series can reuse its cached model.
+
+    'hit': same history; 'append': new observations only, absorbed with the
+    cached parameters (fewer than `refit_every` since the last estimation);
+    'warm_start': new observations, re-estimated starting from the cached
+    parameters; 'refit': earlier history changed; 'miss': nothing cached.
+    """
+    if entry is None:
+        return "miss"
+    n = len(values)
+    if entry.n_obs > n or fingerprint(dates[:entry.n_obs], values[:entry.n_obs]) != entry.fingerprint:
+        return "refit"
+    if entry.n_obs == n:
+        return "hit"
+    fitted_n = entry.state.get("fitted_n", entry.n_obs)
+    if can_append and refit_every is not None and n - fitted_n < refit_every:
+        return "append"
+    return "warm_start"
+
+
+def report(statuses: Iterable[str]) -> Dict[str, Any]:
+    """Counts per status plus the share of series that reused a cached model."""
+    counts = {status: 0 for status in STATUSES}
+    for status in statuses:
+        counts[status] += 1
+    total = sum(counts.values())
+    counts["hit_rate"] = round(sum(counts[s] for s in REUSED) / total, 4) if total else None
+    return counts
+
+
+class ModelCache:
+    """SQLite-backed store of CachedModel entries; safe to share between threads."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_env("FORECAST_MODEL_CACHE", DEFAULT_CACHE_PATH)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "model TEXT NOT NULL, series_id TEXT NOT NULL, n_obs INTEGER NOT NULL, fingerprint TEXT NOT NULL, "
+            "state TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (model, series_id))"
+        )
+        self.conn.commit()
+
+    def get_many(self, model: str, series_ids: Iterable[Any]) -> Dict[str, CachedModel]:
+        """Entries for the given series (ids compared as strings), keyed by string id."""
+        ids = [str(sid) for sid in series_ids]
+        entries: Dict[str, CachedModel] = {}
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT series_id, n_obs, fingerprint, state FROM models WHERE model = ? AND series_id IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                for series_id, n_obs, print_, state in rows:
+                    entries[series_id] = CachedModel(model, series_id, n_obs, print_, json.loads(state))
+        return entries
+
+    def get(self, model: str, series_id: Any) -> Optional[CachedModel]:
+        return self.get_many(model, [series_id]).get(str(series_id))
+
+    def put_many(self, entries: Iterable[CachedModel]) -> None:
+        now = time.time()
+        rows = [(e.model, str(e.series_id), int(e.n_obs), e.fingerprint, json.dumps(e.state), now) for e in entries]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def put(self, entry: CachedModel) -> None:
+        self.put_many([entry])
+
+    def clear(self, model: Optional[str] = None) -> None:
+        with self.lock:
+            if model is None:
+                self.conn.execute("DELETE FROM models")
+            else:
+                self.conn.execute("DELETE FROM models WHERE model = ?", (model,))
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
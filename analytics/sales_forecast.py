@@ -1,104 +1,514 @@
 """
 Sales Forecasting from historical CSV data using Prophet, ARIMA, and Linear Regression.
-Generates and saves forecast plots using matplotlib.
+- Numbers-only API (forecast_series): yhat plus prediction interval bounds, no plotting
+- Plots are optional, drawn headless on an Agg canvas to a caller-supplied path or buffer,
+  so repeated or concurrent runs neither leak figures nor overwrite each other's files
 - Robust to missing dependencies (Prophet, ARIMA)
+- pandas/numpy load on first use; matplotlib, Prophet, statsmodels and scipy only in the function that needs them
+- Batch mode for many series (e.g. SKU x location) from one long-format frame: linear trends for all
+  series in one vectorized least-squares pass, ARIMA/Prophet fitted in parallel in a process pool,
+  one tidy result frame, and per-series failures collected instead of aborting the run
+- Optional model cache (analytics/model_cache.py): when only new days arrived, ARIMA applies its
+  cached parameters to the extended history (re-estimating, warm-started, every refit_every days)
+  and Prophet warm-starts from its previous fit; unchanged series reuse their stored forecast
 """
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from typing import Tuple
-from utils.file_io import read_csv
-from sklearn.linear_model import LinearRegression
-
-# Prophet
-try:
-    from prophet import Prophet
-except ImportError:
-    Prophet = None
-# ARIMA
-try:
-    from statsmodels.tsa.arima.model import ARIMA
-except ImportError:
-    ARIMA = None
-
-
-def load_sales_data(csv_path: str) -> pd.DataFrame:
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+from analytics.model_cache import DEFAULT_REFIT_EVERY, CachedModel, ModelCache, classify, fingerprint, report
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+DEFAULT_INTERVAL = 0.95  # coverage of yhat_lower..yhat_upper
+PlotTarget = Union[str, os.PathLike, BinaryIO]  # file path or binary file object (e.g. io.BytesIO)
+
+
+def _prophet():
+    try:
+        from prophet import Prophet
+    except ImportError:
+        raise ImportError("Prophet is not installed.") from None
+    return Prophet
+
+def _arima():
+    try:
+        from statsmodels.tsa.arima.model import ARIMA
+    except ImportError:
+        raise ImportError("statsmodels is not installed.") from None
+    return ARIMA
+
+
+def load_sales_data(csv_path: str) -> "pd.DataFrame":
     """Load sales data from CSV."""
-    df = pd.DataFrame(read_csv(csv_path))
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
     df['date'] = pd.to_datetime(df['date'])
     df['sales'] = pd.to_numeric(df['sales'])
     return df
 
-def forecast_prophet(df: pd.DataFrame, periods: int = 7) -> Tuple[pd.DataFrame, str]:
-    if Prophet is None:
-        raise ImportError("Prophet is not installed.")
-    prophet_df = df.rename(columns={'date': 'ds', 'sales': 'y'})
-    model = Prophet()
-    model.fit(prophet_df)
-    future = model.make_future_dataframe(periods=periods)
-    forecast = model.predict(future)
-    fig = model.plot(forecast)
-    plot_path = "prophet_forecast.png"
-    fig.savefig(plot_path)
-    return forecast[['ds', 'yhat']], plot_path
-
-def forecast_arima(df: pd.DataFrame, periods: int = 7) -> Tuple[np.ndarray, str]:
-    if ARIMA is None:
-        raise ImportError("statsmodels is not installed.")
-    model = ARIMA(df['sales'], order=(1,1,1))
-    model_fit = model.fit()
-    forecast = model_fit.forecast(steps=periods)
-    plt.figure()
-    plt.plot(df['date'], df['sales'], label='History')
-    plt.plot(pd.date_range(df['date'].iloc[-1], periods=periods+1, freq='D')[1:], forecast, label='ARIMA Forecast')
-    plt.legend()
-    plot_path = "arima_forecast.png"
-    plt.savefig(plot_path)
-    return forecast, plot_path
-
-def forecast_linear_regression(df: pd.DataFrame, periods: int = 7) -> Tuple[np.ndarray, str]:
-    df = df.copy()
-    df['ordinal'] = df['date'].map(pd.Timestamp.toordinal)
-    X = df['ordinal'].values.reshape(-1, 1)
-    y = df['sales'].values
-    model = LinearRegression()
-    model.fit(X, y)
-    future_dates = [df['date'].iloc[-1] + pd.Timedelta(days=i) for i in range(1, periods+1)]
-    X_future = np.array([d.toordinal() for d in future_dates]).reshape(-1, 1)
-    forecast = model.predict(X_future)
-    plt.figure()
-    plt.plot(df['date'], y, label='History')
-    plt.plot(future_dates, forecast, label='Linear Regression Forecast')
-    plt.legend()
-    plot_path = "linear_regression_forecast.png"
-    plt.savefig(plot_path)
-    return forecast, plot_path
-
-def main():
+def _cached_fit(cache: Optional[ModelCache], method: str, series_id: Any, dates, values, periods: int):
+    """Plan a single-series fit against the cache: (status, cached state or None)."""
+    if cache is None:
+        return "miss", None
+    entry = cache.get(MODEL_KEYS[method](), series_id)
+    status = classify(entry, dates, values, can_append=method == "arima")
+    return status, entry.state if entry is not None else None
+
+def _store_fit(cache: Optional[ModelCache], method: str, series_id: Any, dates, values, state: Dict[str, Any]) -> None:
+    if cache is not None:
+        cache.put(CachedModel(MODEL_KEYS[method](), str(series_id), len(values), fingerprint(dates, values), state))
+
+def _check_interval(interval: float) -> None:
+    if not 0 < interval < 1:
+        raise ValueError("interval must be between 0 and 1 (e.g. 0.95).")
+
+def _forecast_frame(dates: "np.ndarray", bands: "np.ndarray") -> "pd.DataFrame":
+    """date, yhat, yhat_lower, yhat_upper from future dates and a (3, periods) array of yhat/lower/upper."""
+    return pd.DataFrame({
+        "date": np.asarray(dates).astype("datetime64[ns]"),
+        "yhat": bands[0],
+        "yhat_lower": bands[1],
+        "yhat_upper": bands[2],
+    })
+
+def forecast_series(
+    df: "pd.DataFrame",
+    periods: int = 7,
+    method: str = "linear",
+    interval: float = DEFAULT_INTERVAL,
+    cache: Optional[ModelCache] = None,
+    series_id: Any = "default",
+) -> "pd.DataFrame":
+    """Forecast one date/sales series as numbers only: date, yhat, yhat_lower, yhat_upper.
+
+    The bounds are the `interval` prediction interval of each method (OLS
+    prediction interval for 'linear', state-space forecast interval for
+    'arima', Prophet's uncertainty interval). Nothing is plotted and
+    matplotlib is not imported, so this is safe to call any number of times
+    in one process. `cache` and `series_id` are used by 'arima' and 'prophet'
+    as in forecast_batch().
+    """
+    if method not in BATCH_METHODS:
+        raise ValueError(f"Unknown forecast method '{method}'. Use one of: {', '.join(BATCH_METHODS)}.")
+    if periods < 1:
+        raise ValueError("periods must be at least 1.")
+    _check_interval(interval)
+    df = df.sort_values("date", kind="stable")
+    dates, values = df['date'].to_numpy(), df['sales'].to_numpy(dtype=float)
+    if method == "linear":
+        data = pd.DataFrame({"series_id": 0, "date": dates, "sales": values})
+        _, future, yhat, lower, upper = linear_batch(data, periods, interval)
+        return _forecast_frame(future[0], np.vstack([yhat[0], lower[0], upper[0]]))
+    status, state = _cached_fit(cache, method, series_id, dates, values, periods)
+    if method == "arima":
+        bands, state = _fit_arima(values, periods, interval, status, state)
+    else:
+        bands, state = _fit_prophet(dates, values, periods, interval, status, state)
+    _store_fit(cache, method, series_id, dates, values, state)
+    return _forecast_frame(_future_dates(dates[-1:].astype("datetime64[ns]"), periods)[0], bands)
+
+def plot_forecast(history: "pd.DataFrame", forecast: "pd.DataFrame", target: PlotTarget, label: str = "Forecast", format: Optional[str] = None) -> PlotTarget:
+    """Render history, forecast and its interval band to a file path or a binary file object (e.g. io.BytesIO).
+
+    The figure is drawn on an explicit Agg canvas and never registered with
+    pyplot: no display is needed, no figure outlives the call, and concurrent
+    or repeated calls share no global state. `format` defaults to the path's
+    extension, or PNG for file objects.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    if format is None and not isinstance(target, (str, os.PathLike)):
+        format = "png"
+    fig = Figure(figsize=(8, 4.5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(history['date'], history['sales'], label='History')
+    ax.plot(forecast['date'], forecast['yhat'], label=label)
+    ax.fill_between(forecast['date'], forecast['yhat_lower'], forecast['yhat_upper'], alpha=0.25, label='Prediction interval')
+    ax.legend()
+    fig.autofmt_xdate()
+    fig.savefig(target, format=format)
+    fig.clear()
+    return target
+
+def _with_plot(df: "pd.DataFrame", forecast: "pd.DataFrame", plot_to: Optional[PlotTarget], label: str) -> Tuple["pd.DataFrame", Optional[PlotTarget]]:
+    return forecast, plot_forecast(df, forecast, plot_to, label) if plot_to is not None else None
+
+def forecast_prophet(df: "pd.DataFrame", periods: int = 7, cache: Optional[ModelCache] = None, series_id: Any = "default", interval: float = DEFAULT_INTERVAL, plot_to: Optional[PlotTarget] = None) -> Tuple["pd.DataFrame", Optional[PlotTarget]]:
+    """Prophet forecast_series(), plus a plot written to `plot_to` if given: (forecast, plot_to)."""
+    return _with_plot(df, forecast_series(df, periods, "prophet", interval, cache, series_id), plot_to, 'Prophet Forecast')
+
+def forecast_arima(df: "pd.DataFrame", periods: int = 7, cache: Optional[ModelCache] = None, series_id: Any = "default", interval: float = DEFAULT_INTERVAL, plot_to: Optional[PlotTarget] = None) -> Tuple["pd.DataFrame", Optional[PlotTarget]]:
+    """ARIMA forecast_series(), plus a plot written to `plot_to` if given: (forecast, plot_to)."""
+    return _with_plot(df, forecast_series(df, periods, "arima", interval, cache, series_id), plot_to, 'ARIMA Forecast')
+
+def forecast_linear_regression(df: "pd.DataFrame", periods: int = 7, interval: float = DEFAULT_INTERVAL, plot_to: Optional[PlotTarget] = None) -> Tuple["pd.DataFrame", Optional[PlotTarget]]:
+    """Linear trend forecast_series(), plus a plot written to `plot_to` if given: (forecast, plot_to)."""
+    return _with_plot(df, forecast_series(df, periods, "linear", interval), plot_to, 'Linear Regression Forecast')
+
+BATCH_METHODS = ("linear", "arima", "prophet")
+MIN_POINTS = {"linear": 2, "arima": 10, "prophet": 10}  # observations a series needs per method
+ARIMA_ORDER = (1, 1, 1)
+MAX_CHUNK_SERIES = 64  # series sent to a pool worker per task
+
+
+@dataclass
+class BatchForecast:
+    forecasts: "pd.DataFrame"  # series_id, date, yhat, yhat_lower, yhat_upper, method: `periods` rows per forecast series
+    failures: "pd.DataFrame"  # series_id, method, error: one row per series that could not be forecast
+    cache_report: Dict[str, Any] = field(default_factory=dict)  # model_cache.report() of the fitted series, if cached
+
+
+def prepare_long(
+    frame: "pd.DataFrame",
+    series_col: str = "series_id",
+    date_col: str = "date",
+    value_col: str = "sales",
+) -> "pd.DataFrame":
+    """Normalize a long-format frame to series_id/date/sales, sorted by series then date.
+
+    Rows with an unparseable date or value are dropped; duplicate dates within
+    a series are summed.
+    """
+    data = pd.DataFrame({
+        "series_id": frame[series_col].to_numpy(),
+        "date": pd.to_datetime(frame[date_col], errors="coerce").to_numpy(),
+        "sales": pd.to_numeric(frame[value_col], errors="coerce").to_numpy(),
+    })
+    data = data.dropna(subset=["date", "sales"])
+    return data.groupby(["series_id", "date"], sort=True, as_index=False)["sales"].sum()
+
+
+def _future_dates(last: "np.ndarray", periods: int) -> "np.ndarray":
+    """(n_series, periods) daily dates following each series' last date."""
+    return last.astype("datetime64[D]")[:, None] + np.arange(1, periods + 1).astype("timedelta64[D]")[None, :]
+
+
+def linear_batch(data: "pd.DataFrame", periods: int = 7, interval: float = DEFAULT_INTERVAL) -> Tuple["pd.Index", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Least-squares linear trend for every series of a prepare_long() frame at once.
+
+    Same fit as LinearRegression on date ordinals, computed in closed form with
+    per-series sums (np.bincount), with the OLS prediction interval at
+    `interval` coverage (NaN for series of only two observations). Returns
+    (series ids, future dates, yhat, lower, upper), the last four shaped
+    (n_series, periods).
+    """
+    from scipy.stats import t as student_t
+    codes, ids = pd.factorize(data["series_id"], sort=False)
+    n = np.bincount(codes).astype(float)
+    days = data["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    y = data["sales"].to_numpy(dtype=float)
+    last = days[np.cumsum(n).astype(int) - 1]  # rows are sorted by series then date
+    x = (days - last[codes]).astype(float)  # days before each series' last observation
+    mean_x = np.bincount(codes, x) / n
+    mean_y = np.bincount(codes, y) / n
+    dx = x - mean_x[codes]
+    var = np.bincount(codes, dx * dx)
+    cov = np.bincount(codes, dx * (y - mean_y[codes]))
+    slope = np.divide(cov, var, out=np.zeros_like(cov), where=var > 0)
+    intercept = mean_y - slope * mean_x
+    steps = np.arange(1, periods + 1, dtype=float)
+    yhat = intercept[:, None] + slope[:, None] * steps[None, :]
+    resid = y - intercept[codes] - slope[codes] * x
+    dof = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(np.bincount(codes, resid * resid) / dof)
+        leverage = 1 / n[:, None] + (steps[None, :] - mean_x[:, None]) ** 2 / var[:, None]
+        half = np.where(dof > 0, student_t.ppf((1 + interval) / 2, np.maximum(dof, 1)), np.nan)[:, None] * sigma[:, None] * np.sqrt(1 + leverage)
+    return ids, _future_dates(last.astype("datetime64[D]"), periods), yhat, yhat - half, yhat + half
+
+
+MODEL_KEYS = {
+    "arima": lambda: "arima:" + ",".join(str(part) for part in ARIMA_ORDER),
+    "prophet": lambda: "prophet",
+}
+
+
+def _reuse(status: str, state: Optional[Dict[str, Any]], periods: int, interval: float) -> bool:
+    """A cached forecast is reused only for an unchanged series and the same horizon and interval."""
+    return status == "hit" and state.get("periods") == periods and state.get("interval") == interval and "bands" in state
+
+
+def _fit_arima(values: "np.ndarray", periods: int, interval: float = DEFAULT_INTERVAL, status: str = "miss", state: Optional[Dict[str, Any]] = None) -> Tuple["np.ndarray", Dict[str, Any]]:
+    """ARIMA forecast as a (3, periods) yhat/lower/upper array, plus the state to cache.
+
+    `state` is reused as classify() allows: 'hit'/'append' apply the cached
+    parameters to the (extended) history with one Kalman filter pass, the
+    statsmodels results.apply/append(refit=False) path; 'warm_start'
+    re-estimates starting from them; otherwise a full fit.
+    """
+    if _reuse(status, state, periods, interval):
+        return np.asarray(state["bands"], dtype=float), state
+    model = _arima()(np.asarray(values, dtype=float), order=ARIMA_ORDER)
+    fitted_n = len(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # convergence chatter on short or flat series
+        if status in ("hit", "append"):
+            results = model.filter(np.asarray(state["params"], dtype=float))
+            fitted_n = state.get("fitted_n", fitted_n)
+        elif status == "warm_start":
+            results = model.fit(start_params=np.asarray(state["params"], dtype=float))
+        else:
+            results = model.fit()
+    prediction = results.get_forecast(steps=periods)
+    bounds = np.asarray(prediction.conf_int(alpha=1 - interval), dtype=float)
+    bands = np.vstack([np.asarray(prediction.predicted_mean, dtype=float), bounds[:, 0], bounds[:, 1]])
+    return bands, {"params": np.asarray(results.params, dtype=float).tolist(), "fitted_n": fitted_n, "periods": periods, "interval": interval, "bands": bands.tolist()}
+
+
+def _stan_init(model) -> Dict[str, Any]:
+    """Fitted Prophet parameters in the form Prophet.fit(init=...) accepts (warm start)."""
+    init = {name: float(model.params[name][0][0]) for name in ("k", "m", "sigma_obs")}
+    init.update({name: model.params[name][0].tolist() for name in ("delta", "beta")})
+    return init
+
+
+def _warm_start_compatible(previous, model, dates: "np.ndarray") -> bool:
+    """Whether `previous`'s fitted parameters have the shapes `model` will need on `dates`.
+
+    Prophet sizes delta by n_changepoints, which it lowers to
+    floor(changepoint_range * n) - 1 on short histories, and beta by the
+    seasonalities it turns on from the history span (weekly from two weeks,
+    yearly from two years, daily for sub-daily data). Stan rejects an init
+    of the wrong size, so a mismatch needs a cold fit.
+    """
+    days = np.asarray(dates, dtype="datetime64[ns]")
+    n_changepoints = min(model.n_changepoints, max(int(np.floor(len(days) * model.changepoint_range)) - 1, 0))
+    span = (days.max() - days.min()) / np.timedelta64(1, "D") if len(days) else 0.0
+    step = np.diff(np.unique(days)).min() / np.timedelta64(1, "D") if len(np.unique(days)) > 1 else 0.0
+    seasonalities = set(model.seasonalities)
+    auto = {"weekly": span >= 14 and step < 7, "yearly": span >= 730, "daily": span >= 2 and step < 1}
+    for name, enabled in auto.items():
+        setting = getattr(model, f"{name}_seasonality")  # 'auto', a bool or a Fourier order
+        if enabled if setting == "auto" else bool(setting):
+            seasonalities.add(name)
+    return previous.n_changepoints == n_changepoints and set(previous.seasonalities) == seasonalities
+
+
+def _prophet_model(dates: "np.ndarray", values: "np.ndarray", interval: float = DEFAULT_INTERVAL, status: str = "miss", state: Optional[Dict[str, Any]] = None):
+    """A fitted Prophet model: the cached one on 'hit', warm-started from it when days were added.
+
+    Falls back to a cold fit when the extra days change the model's shape (see _warm_start_compatible).
+    """
+    Prophet = _prophet()
+    if status in ("hit", "append", "warm_start"):
+        from prophet.serialize import model_from_json
+        previous = model_from_json(state["model"])
+        if status == "hit":
+            previous.interval_width = interval  # only used at predict time
+            return previous
+    model = Prophet(interval_width=interval)
+    history = pd.DataFrame({"ds": dates, "y": values})
+    if status in ("append", "warm_start") and _warm_start_compatible(previous, model, dates):
+        model.fit(history, init=_stan_init(previous))
+    else:
+        model.fit(history)
+    return model
+
+
+def _prophet_state(model, n_obs: int) -> Dict[str, Any]:
+    from prophet.serialize import model_to_json
+    return {"model": model_to_json(model), "fitted_n": n_obs}
+
+
+def _fit_prophet(dates: "np.ndarray", values: "np.ndarray", periods: int, interval: float = DEFAULT_INTERVAL, status: str = "miss", state: Optional[Dict[str, Any]] = None) -> Tuple["np.ndarray", Dict[str, Any]]:
+    """Prophet forecast as a (3, periods) yhat/lower/upper array, plus the state to cache."""
+    if _reuse(status, state, periods, interval):
+        return np.asarray(state["bands"], dtype=float), state
+    model = _prophet_model(dates, values, interval, status, state)
+    forecast = model.predict(model.make_future_dataframe(periods=periods, include_history=False))
+    bands = forecast[["yhat", "yhat_lower", "yhat_upper"]].to_numpy(dtype=float).T
+    new_state = dict(state) if status == "hit" else _prophet_state(model, len(values))
+    new_state.update(periods=periods, interval=interval, bands=bands.tolist())
+    return bands, new_state
+
+
+def _fit_series_chunk(method: str, chunk: Sequence[Tuple[Any, "np.ndarray", "np.ndarray", str, Optional[Dict[str, Any]]]], periods: int, interval: float = DEFAULT_INTERVAL) -> List[Tuple[Any, Optional["np.ndarray"], Optional[str], Optional[Dict[str, Any]]]]:
+    """Fit one model per (series_id, dates, values, cache status, cached state); runs in a pool worker.
+
+    Returns (series_id, yhat/lower/upper bands, error, state to cache) per series. Errors are returned, not raised.
+    """
+    results = []
+    for series_id, dates, values, status, state in chunk:
+        try:
+            if method == "arima":
+                bands, new_state = _fit_arima(values, periods, interval, status, state)
+            else:
+                bands, new_state = _fit_prophet(dates, values, periods, interval, status, state)
+            if bands.shape != (3, periods) or not np.all(np.isfinite(bands[0])):
+                raise ValueError("model returned a non-finite forecast")
+            results.append((series_id, bands, None, new_state))
+        except Exception as e:
+            results.append((series_id, None, f"{type(e).__name__}: {e}", None))
+    return results
+
+
+def _fit_parallel(method: str, items: list, periods: int, interval: float, workers: int, chunk_size: Optional[int]) -> list:
+    if not items:
+        return []
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SERIES, len(items) // (workers * 4) or 1))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if workers <= 1 or len(chunks) == 1:
+        return [result for chunk in chunks for result in _fit_series_chunk(method, chunk, periods, interval)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        parts = pool.map(_fit_series_chunk, repeat(method), chunks, repeat(periods), repeat(interval))
+        return [result for part in parts for result in part]
+
+
+def _tidy(ids: Sequence, dates: "np.ndarray", yhat: "np.ndarray", lower: "np.ndarray", upper: "np.ndarray", method: str) -> "pd.DataFrame":
+    periods = yhat.shape[1] if yhat.ndim == 2 else 0
+    return pd.DataFrame({
+        "series_id": np.repeat(np.asarray(ids, dtype=object), periods),
+        "date": dates.reshape(-1).astype("datetime64[ns]"),
+        "yhat": yhat.reshape(-1),
+        "yhat_lower": lower.reshape(-1),
+        "yhat_upper": upper.reshape(-1),
+        "method": method,
+    })
+
+
+def forecast_batch(
+    frame: "pd.DataFrame",
+    periods: int = 7,
+    method: str = "linear",
+    series_col: str = "series_id",
+    date_col: str = "date",
+    value_col: str = "sales",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    fallback: Optional[str] = "linear",
+    cache: Optional[ModelCache] = None,
+    refit_every: Optional[int] = DEFAULT_REFIT_EVERY,
+    interval: float = DEFAULT_INTERVAL,
+) -> BatchForecast:
+    """Forecast every series in a long-format frame (one row per series and day).
+
+    method='linear' fits all series at once with vectorized least squares.
+    'arima' and 'prophet' fit one model per series across `workers` processes
+    (default: CPU count; 1 runs in-process), `chunk_size` series per task.
+    Series with fewer than MIN_POINTS[method] observations use the vectorized
+    linear trend when fallback='linear', or are reported as failures when
+    fallback=None. A series that fails to fit is recorded in `failures` and
+    the rest of the batch continues. yhat_lower/yhat_upper bound each
+    forecast with the method's `interval` prediction interval.
+
+    With a ModelCache, each ARIMA/Prophet series is matched to its stored
+    model by fingerprint: unchanged series reuse it, series that only gained
+    days are updated incrementally (ARIMA re-estimates once `refit_every` new
+    days accumulated), and changed series are refit. `cache_report` counts
+    each outcome.
+    """
+    if method not in BATCH_METHODS:
+        raise ValueError(f"Unknown forecast method '{method}'. Use one of: {', '.join(BATCH_METHODS)}.")
+    if fallback not in (None, "linear"):
+        raise ValueError("fallback must be 'linear' or None.")
+    if periods < 1:
+        raise ValueError("periods must be at least 1.")
+    _check_interval(interval)
+    data = prepare_long(frame, series_col, date_col, value_col)
+    counts = data.groupby("series_id", sort=False).size()
+    failures = [(sid, method, "no valid observations") for sid in pd.unique(frame[series_col]) if sid not in counts.index]
+
+    enough = counts >= MIN_POINTS[method]
+    if method == "linear":
+        linear_ids = counts.index[enough]
+        model_ids = counts.index[:0]
+    else:
+        model_ids = counts.index[enough]
+        linear_ids = counts.index[~enough & (counts >= MIN_POINTS["linear"])] if fallback else counts.index[:0]
+    for sid in counts.index[~counts.index.isin(linear_ids) & ~counts.index.isin(model_ids)]:
+        failures.append((sid, method, f"needs at least {MIN_POINTS[method]} observations, has {counts[sid]}"))
+
+    parts = []
+    cache_report: Dict[str, Any] = {}
+    if len(linear_ids):
+        ids, dates, yhat, lower, upper = linear_batch(data[data["series_id"].isin(linear_ids)], periods, interval)
+        parts.append(_tidy(ids, dates, yhat, lower, upper, "linear"))
+    if len(model_ids):
+        subset = data[data["series_id"].isin(model_ids)]
+        groups = [(sid, group["date"].to_numpy(), group["sales"].to_numpy()) for sid, group in subset.groupby("series_id", sort=False)]
+        cached = cache.get_many(MODEL_KEYS[method](), model_ids) if cache is not None else {}
+        items, statuses = [], {}
+        for sid, dates, values in groups:
+            entry = cached.get(str(sid))
+            statuses[sid] = classify(entry, dates, values, refit_every, can_append=method == "arima")
+            items.append((sid, dates, values, statuses[sid], entry.state if entry is not None else None))
+        history = {sid: (dates, values) for sid, dates, values in groups}
+        fitted, updates = [], []
+        for sid, bands, error, state in _fit_parallel(method, items, periods, interval, workers or os.cpu_count() or 1, chunk_size):
+            if error is None:
+                fitted.append((sid, bands))
+                if cache is not None:
+                    dates, values = history[sid]
+                    updates.append(CachedModel(MODEL_KEYS[method](), str(sid), len(values), fingerprint(dates, values), state))
+            else:
+                failures.append((sid, method, error))
+        if cache is not None:
+            cache.put_many(updates)
+            cache_report = report(statuses.values())
+        last = {sid: dates[-1] for sid, dates, _ in groups}
+        if fitted:
+            ids = [sid for sid, _ in fitted]
+            dates = _future_dates(np.array([last[sid] for sid in ids], dtype="datetime64[ns]"), periods)
+            bands = np.stack([bands for _, bands in fitted], axis=1)  # (3, n_series, periods)
+            parts.append(_tidy(ids, dates, bands[0], bands[1], bands[2], method))
+
+    if parts:
+        forecasts = pd.concat(parts, ignore_index=True)
+    else:
+        empty = np.empty((0, periods))
+        forecasts = _tidy([], np.empty((0, periods), "datetime64[D]"), empty, empty, empty, method)
+    if len(forecasts):
+        forecasts = forecasts.sort_values(["series_id", "date"], kind="stable", ignore_index=True)
+    return BatchForecast(forecasts, pd.DataFrame(failures, columns=["series_id", "method", "error"]), cache_report)
+
+
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Sales Forecasting")
     parser.add_argument("--csv", required=True, type=str, help="Path to sales CSV file")
     parser.add_argument("--periods", type=int, default=7, help="Forecast periods (days)")
-    args = parser.parse_args()
+    parser.add_argument("--series_col", type=str, help="Batch mode: long-format CSV with this series id column")
+    parser.add_argument("--method", choices=BATCH_METHODS, default="linear", help="Batch mode: forecast method")
+    parser.add_argument("--workers", type=int, help="Batch mode: processes for ARIMA/Prophet (default: CPU count)")
+    parser.add_argument("--output", type=str, default="forecasts.csv", help="Batch mode: tidy forecast CSV")
+    parser.add_argument("--model_cache", type=str, help="SQLite file of fitted models reused across runs (ARIMA/Prophet)")
+    parser.add_argument("--refit_every", type=int, default=DEFAULT_REFIT_EVERY, help="New days absorbed by cached ARIMA parameters before re-estimating")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Prediction interval coverage for yhat_lower/yhat_upper")
+    parser.add_argument("--plot_dir", type=str, default=".", help="Directory for the <method>_forecast.png plots")
+    parser.add_argument("--no_plots", action="store_true", help="Print the forecasts only, without rendering plots")
+    args = parser.parse_args(argv)
+    cache = ModelCache(args.model_cache) if args.model_cache else None
+    if args.series_col:
+        frame = pd.read_csv(args.csv, dtype=str, keep_default_na=False)
+        result = forecast_batch(frame, args.periods, args.method, series_col=args.series_col, workers=args.workers, cache=cache, refit_every=args.refit_every, interval=args.interval)
+        result.forecasts.to_csv(args.output, index=False)
+        print(f"Forecast {result.forecasts['series_id'].nunique()} series to {args.output}; {len(result.failures)} failed.")
+        if result.cache_report:
+            print("Model cache: " + ", ".join(f"{key} {value}" for key, value in result.cache_report.items()))
+        for row in result.failures.head(10).itertuples(index=False):
+            print(f"  {row.series_id}: {row.error}")
+        return
     df = load_sales_data(args.csv)
-    print("Running Prophet forecast...")
-    try:
-        prophet_forecast, prophet_plot = forecast_prophet(df, args.periods)
-        print(f"Prophet forecast plot saved to {prophet_plot}")
-    except Exception as e:
-        print(f"Prophet error: {e}")
-    print("Running ARIMA forecast...")
-    try:
-        arima_forecast, arima_plot = forecast_arima(df, args.periods)
-        print(f"ARIMA forecast plot saved to {arima_plot}")
-    except Exception as e:
-        print(f"ARIMA error: {e}")
-    print("Running Linear Regression forecast...")
-    try:
-        lr_forecast, lr_plot = forecast_linear_regression(df, args.periods)
-        print(f"Linear Regression forecast plot saved to {lr_plot}")
-    except Exception as e:
-        print(f"Linear Regression error: {e}")
+    runs = [
+        ("Prophet", "prophet", lambda plot_to: forecast_prophet(df, args.periods, cache=cache, interval=args.interval, plot_to=plot_to)),
+        ("ARIMA", "arima", lambda plot_to: forecast_arima(df, args.periods, cache=cache, interval=args.interval, plot_to=plot_to)),
+        ("Linear Regression", "linear_regression", lambda plot_to: forecast_linear_regression(df, args.periods, interval=args.interval, plot_to=plot_to)),
+    ]
+    for label, name, run in runs:
+        print(f"Running {label} forecast...")
+        try:
+            forecast, plot_path = run(None if args.no_plots else os.path.join(args.plot_dir, f"{name}_forecast.png"))
+            print(forecast.to_string(index=False))
+            if plot_path:
+                print(f"{label} forecast plot saved to {plot_path}")
+        except Exception as e:
+            print(f"{label} error: {e}")
 
 if __name__ == "__main__":
     main()
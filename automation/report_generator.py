@@ -5,34 +5,31 @@ Monthly Business PDF Report Generator
 - Uses OpenAI to write narrative summaries
 - Combines with plots into PDF using reportlab
 - Robust error handling for OpenAI and file operations
+- pandas loads on first use; matplotlib and reportlab only when a plot or PDF is drawn
 """
-import openai
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils.config import OPENAI_API_KEY
-from utils.file_io import read_csv
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from typing import Optional
+from utils.lazy_import import lazy_import
+from utils.llm_cache import cached_chat_completion
+from typing import List, Optional
 import os
 import csv
 
-openai.api_key = OPENAI_API_KEY
+pd = lazy_import("pandas")
 
 SUMMARY_PROMPT = (
     "You are a business analyst. Given sales and sentiment data, write a narrative summary (e.g., 'Sales increased by 12%...')."
 )
 
-def load_data(sales_csv: str, sentiment_csv: Optional[str] = None) -> pd.DataFrame:
-    sales = pd.DataFrame(read_csv(sales_csv))
+def load_data(sales_csv: str, sentiment_csv: Optional[str] = None) -> "pd.DataFrame":
+    sales = pd.read_csv(sales_csv, dtype=str, keep_default_na=False)
     sales['date'] = pd.to_datetime(sales['date'])
     sales['sales'] = pd.to_numeric(sales['sales'])
     if sentiment_csv:
-        sentiment = pd.DataFrame(read_csv(sentiment_csv))
+        sentiment = pd.read_csv(sentiment_csv, dtype=str, keep_default_na=False)
         sales = sales.merge(sentiment, on='date', how='left')
     return sales
 
-def plot_sales(df: pd.DataFrame, out_path: str) -> None:
+def plot_sales(df: "pd.DataFrame", out_path: str) -> None:
+    import matplotlib.pyplot as plt
     plt.figure()
     plt.plot(df['date'], df['sales'], marker='o')
     plt.title('Sales Trend')
@@ -42,7 +39,7 @@ def plot_sales(df: pd.DataFrame, out_path: str) -> None:
     plt.savefig(out_path)
     plt.close()
 
-def summarize_with_openai(df: pd.DataFrame) -> str:
+def summarize_with_openai(df: "pd.DataFrame") -> str:
     # Ensure date column is datetime
     if not pd.api.types.is_datetime64_any_dtype(df['date']):
         df['date'] = pd.to_datetime(df['date'])
@@ -59,12 +56,8 @@ def summarize_with_openai(df: pd.DataFrame) -> str:
         {"role": "system", "content": SUMMARY_PROMPT},
         {"role": "user", "content": prompt}
     ]
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        max_tokens=200
-    )
-    return response.choices[0].message.content.strip()
+    content = cached_chat_completion("report_generator", "gpt-4o", messages, 200)
+    return content.strip()
 
 def load_testimonials(filepath: str = "data/sample_testimonials.csv", n: int = 3) -> list:
     try:
@@ -74,6 +67,8 @@ def load_testimonials(filepath: str = "data/sample_testimonials.csv", n: int = 3
         return []
 
 def generate_pdf_report(sales_csv: str, sentiment_csv: Optional[str], out_pdf: str) -> None:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
     df = load_data(sales_csv, sentiment_csv)
     plot_path = "sales_plot.png"
     plot_sales(df, plot_path)
@@ -98,13 +93,13 @@ def generate_pdf_report(sales_csv: str, sentiment_csv: Optional[str], out_pdf: s
     os.remove(plot_path)
     print(f"PDF report saved to {out_pdf}")
 
-def main():
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Monthly Business Report Generator")
     parser.add_argument("--sales_csv", type=str, default="data/sample_sales_month.csv", help="Sales CSV file")
     parser.add_argument("--sentiment_csv", type=str, help="Optional: customer sentiment CSV file")
     parser.add_argument("--out_pdf", type=str, default="business_report.pdf", help="Output PDF file")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     generate_pdf_report(args.sales_csv, args.sentiment_csv, args.out_pdf)
 
 if __name__ == "__main__":
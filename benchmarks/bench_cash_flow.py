@@ -0,0 +1,95 @@
+"""
+Benchmark: columnar cash flow / anomaly analysis (finance/cash_flow.py) vs. the original per-row loops
+- Generates a multi-year, multi-account export (default 1M rows) in a temp CSV
+- Before: csv.DictReader rows, strptime/float per row for cash flow, then a second pass with a fixed threshold
+- After: one pandas parse, groupby monthly totals and per-category MAD scores; then the chunked mode
+- Reports wall time, and with --memory the peak traced memory (tracing slows everything down)
+
+Usage:
+    python benchmarks/bench_cash_flow.py --rows 1000000 --chunksize 200000 [--memory]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from finance import cash_flow
+
+CATEGORIES = {"Meals": (10, 40), "Supplies": (20, 300), "Travel": (50, 900), "Rent": (2000, 2000), "Sales": (-3000, -100)}
+
+
+def write_export(path, rows, seed=1):
+    rng = random.Random(seed)
+    names = list(CATEGORIES)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Account", "Description", "Amount", "Category"])
+        for i in range(rows):
+            day = i * 5 * 365 // rows
+            date = datetime.fromordinal(datetime(2020, 1, 1).toordinal() + day).strftime("%Y-%m-%d")
+            category = rng.choice(names)
+            low, high = CATEGORIES[category]
+            amount = -rng.uniform(low, high) * (20 if rng.random() < 0.0005 else 1)
+            writer.writerow([date, f"ACCT-{i % 7}", f"{category} vendor", f"{amount:.2f}", category])
+
+
+def original(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        transactions = list(csv.DictReader(f))
+    summary = {}
+    for tx in transactions:
+        amount = float(tx.get("Amount", 0))
+        try:
+            month = datetime.strptime(tx.get("Date"), "%Y-%m-%d").strftime("%Y-%m")
+        except Exception:
+            month = "Unknown"
+        totals = summary.setdefault(month, {"inflow": 0.0, "outflow": 0.0})
+        totals["inflow" if amount >= 0 else "outflow"] += amount
+    anomalies = [tx for tx in transactions if abs(float(tx.get("Amount", 0))) >= 1000.0]
+    return len(summary), len(anomalies)
+
+
+def timed(label, fn, memory=False):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = ""
+    if memory:
+        peak = f"  peak {tracemalloc.get_traced_memory()[1] / 2**20:8.1f} MiB"
+        tracemalloc.stop()
+    print(f"{label:<34} {elapsed:7.2f} s{peak}  -> {result}")
+
+
+def main():
+    import argparse
+    import pandas as pd
+    parser = argparse.ArgumentParser(description="Cash flow and anomaly benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions to generate")
+    parser.add_argument("--chunksize", type=int, default=200_000, help="Rows per chunk for the chunked mode")
+    parser.add_argument("--window", type=int, default=50, help="Rolling window for the chunked rolling mode")
+    parser.add_argument("--memory", action="store_true", help="Also report peak traced memory")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "export.csv")
+    write_export(path, args.rows)
+    print(f"{args.rows} rows, {os.path.getsize(path) / 2**20:.0f} MiB CSV")
+
+    def summarize(report):
+        return len(report.monthly), len(report.anomalies)
+
+    timed("original (rows + fixed threshold)", lambda: original(path), args.memory)
+    timed("columnar (MAD per category)", lambda: summarize(cash_flow.analyze(pd.read_csv(path, dtype=str, keep_default_na=False))), args.memory)
+    timed("chunked (z-score, two passes)", lambda: summarize(cash_flow.analyze_csv(path, chunksize=args.chunksize)), args.memory)
+    timed(f"chunked (MAD, rolling {args.window})", lambda: summarize(cash_flow.analyze_csv(path, chunksize=args.chunksize, method="mad", window=args.window)), args.memory)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Load test: FAQ chatbot API against a stub LLM
+- Stub OpenAI server answers every chat completion after --llm-latency seconds
+- The chatbot app is served by a threaded WSGI server (same app gunicorn serves via customer_service/wsgi.py)
+- --clients concurrent clients post unique questions for --duration seconds
+- Reports sustained RPS, p50/p99 latency and how many requests were shed with 503
+
+Usage:
+    python benchmarks/bench_chatbot_load.py --clients 50 --duration 10 --llm-latency 0.5 --max-concurrency 32
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils import llm_cache, openai_client
+from utils.metrics import percentile
+
+
+def start_stub_llm(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            data = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "Stub answer."}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 5, "total_tokens": 105},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Chatbot API load test")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM response time in seconds")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="CHATBOT_MAX_CONCURRENCY for the app")
+    args = parser.parse_args()
+
+    os.environ["CHATBOT_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    stub = start_stub_llm(args.llm_latency)
+    openai_client.configure(api_key="sk-stub", base_url=f"http://127.0.0.1:{stub.server_address[1]}/v1", max_retries=0)
+    llm_cache.configure(enabled=False)
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from customer_service.wsgi import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/faq"
+
+    urllib.request.urlopen(urllib.request.Request(url, data=b'{"question": "warm up"}', headers={"Content-Type": "application/json"})).read()
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client(worker: int):
+        n = 0
+        while time.perf_counter() < deadline:
+            body = json.dumps({"question": f"Client {worker} question {n}: can I bring my dog?"}).encode("utf-8")
+            request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+                if status == 503:
+                    time.sleep(float(e.headers.get("Retry-After", 1)) / 10)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+            n += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+    stub.shutdown()
+
+    latencies.sort()
+    print(f"{args.clients} clients, {args.duration:.0f}s, stub LLM {args.llm_latency * 1000:.0f} ms, cap {args.max_concurrency}")
+    print(f"Status counts: {statuses}")
+    ideal = min(args.clients, args.max_concurrency) / args.llm_latency if args.llm_latency else float("inf")
+    print(f"Sustained RPS (200 OK): {len(latencies) / args.duration:.1f} (ideal {ideal:.1f})")
+    print(f"Latency p50 {percentile(latencies, 50):.0f} ms, p99 {percentile(latencies, 99):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: per-request context preparation in customer_service/chatbot.py
+- Synthetic data: --locations locations and --faqs FAQs written to a temp directory
+- Before: every FAQ and record pasted into the prompt on each request
+- After: top-k BM25 snippets from the local index
+- Reports context tokens and preparation latency per request, plus the cost of an incremental update
+
+Usage:
+    python benchmarks/bench_chatbot_prompt.py --locations 500 --faqs 2000
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from customer_service import chatbot
+from utils.llm_batch import estimate_tokens
+
+QUESTIONS = ["What are your business hours?", "Are you open on Thanksgiving?", "Where is the Location 42 store?", "What is your policy 17 about?"]
+
+
+def write_locations(path: str, count: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["location", "address", "phone", "hours"])
+        for i in range(count):
+            writer.writerow([f"Location {i}", f"{i} Main St, Springfield, IL", f"(217) 555-{i:04d}", "Mon-Fri 9am-5pm"])
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Chatbot context retrieval benchmark")
+    parser.add_argument("--locations", type=int, default=500, help="Number of synthetic locations")
+    parser.add_argument("--faqs", type=int, default=2000, help="Number of synthetic FAQs")
+    parser.add_argument("--requests", type=int, default=200, help="Requests to time")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        files = dict(chatbot.DATA_FILES)
+        files["locations"] = os.path.join(tmp_dir, "locations.csv")
+        write_locations(files["locations"], args.locations)
+        chatbot.DATA_FILES = files
+        chatbot.FAQS = chatbot.FAQS + [
+            {"question": f"What is policy {i} about?", "answer": f"Policy {i} covers topic {i} in detail."}
+            for i in range(args.faqs)
+        ]
+
+        def full_context():
+            records = [chatbot.format_faq(faq) for faq in chatbot.FAQS]
+            for name, path in chatbot.DATA_FILES.items():
+                records += [chatbot.FORMATTERS[name](row) for row in chatbot.load_csv_data(path)]
+            return "\n".join(records)
+
+        start = time.perf_counter()
+        for i in range(args.requests):
+            text = full_context()
+        before_ms = (time.perf_counter() - start) / args.requests * 1000
+        print(f"Before (everything in the prompt): ~{estimate_tokens(text)} tokens, {before_ms:.2f} ms per request")
+
+        start = time.perf_counter()
+        chatbot.get_index()
+        print(f"Initial index build: {len(chatbot.get_index())} snippets in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        tokens = 0
+        start = time.perf_counter()
+        for i in range(args.requests):
+            tokens += estimate_tokens(chatbot.get_context(QUESTIONS[i % len(QUESTIONS)]))
+        after_ms = (time.perf_counter() - start) / args.requests * 1000
+        print(f"After (top-{chatbot.TOP_K} retrieval): ~{tokens // args.requests} tokens, {after_ms:.2f} ms per request")
+
+        with open(files["locations"], "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(["New Branch", "1 New Rd", "(217) 555-9999", "Sat 9am-1pm"])
+        start = time.perf_counter()
+        chatbot._last_check = 0.0
+        chatbot.get_index()
+        print(f"Incremental update after one new row: {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: batch multi-series forecasting (analytics/sales_forecast.py forecast_batch)
+- Generates a long-format frame of --series daily series (SKU x location) of --days each
+- Linear: per-series sklearn LinearRegression loop (the old one-series-at-a-time path)
+  vs. the vectorized least-squares pass over all series
+- ARIMA: --arima-series series fitted sequentially vs. across a process pool
+- Daily refresh: the same series with one new day, refit from scratch vs. updated from the
+  model cache (analytics/model_cache.py), with the cache-hit report
+
+Usage:
+    python benchmarks/bench_forecast_batch.py --series 5000 --days 120 --arima-series 200 --workers 8
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from analytics import sales_forecast
+from analytics.model_cache import ModelCache
+
+
+def build_frame(series, days, seed=7):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days)
+    level = rng.uniform(50, 500, series)[:, None]
+    trend = rng.normal(0, 1, series)[:, None]
+    season = 10 * np.sin(2 * np.pi * np.arange(days) / 7)[None, :]
+    sales = level + trend * np.arange(days)[None, :] + season + rng.normal(0, 5, (series, days))
+    return pd.DataFrame({
+        "series_id": np.repeat([f"SKU{i:05d}@LOC{i % 13}" for i in range(series)], days),
+        "date": np.tile(dates.to_numpy(), series),
+        "sales": sales.reshape(-1),
+    })
+
+
+def per_series_linear(frame, periods):
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+    out = {}
+    for sid, group in frame.groupby("series_id", sort=False):
+        X = group["date"].map(pd.Timestamp.toordinal).to_numpy().reshape(-1, 1)
+        model = LinearRegression().fit(X, group["sales"].to_numpy())
+        last = group["date"].iloc[-1]
+        future = np.array([(last + pd.Timedelta(days=i)).toordinal() for i in range(1, periods + 1)]).reshape(-1, 1)
+        out[sid] = model.predict(future)
+    return len(out)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<38} {time.perf_counter() - start:8.2f} s  -> {result}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Batch forecasting benchmark")
+    parser.add_argument("--series", type=int, default=5000, help="Series for the linear comparison")
+    parser.add_argument("--days", type=int, default=120, help="Days of history per series")
+    parser.add_argument("--periods", type=int, default=14, help="Days to forecast")
+    parser.add_argument("--arima-series", dest="arima_series", type=int, default=200, help="Series for the ARIMA comparison (0 to skip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes for the parallel ARIMA run")
+    args = parser.parse_args()
+
+    # One extra day is held back to simulate the next daily refresh
+    full = build_frame(args.series, args.days + 1)
+    frame = full[full["date"] < full["date"].max()]
+    print(f"{args.series} series x {args.days} days = {len(frame)} rows")
+
+    def summarize(result):
+        return f"{result.forecasts['series_id'].nunique()} series, {len(result.failures)} failed"
+
+    timed("linear, sklearn per series", lambda: f"{per_series_linear(frame, args.periods)} series")
+    timed("linear, vectorized batch", lambda: summarize(sales_forecast.forecast_batch(frame, args.periods)))
+    if args.arima_series:
+        subset = frame[frame["series_id"].isin(frame["series_id"].unique()[:args.arima_series])]
+        timed("arima, sequential", lambda: summarize(sales_forecast.forecast_batch(subset, args.periods, "arima", workers=1)))
+        timed(f"arima, {args.workers} workers", lambda: summarize(sales_forecast.forecast_batch(subset, args.periods, "arima", workers=args.workers)))
+
+        cache = ModelCache(os.path.join(tempfile.mkdtemp(), "models.sqlite"))
+        sales_forecast.forecast_batch(subset, args.periods, "arima", workers=args.workers, cache=cache)
+        next_day = full[full["series_id"].isin(subset["series_id"].unique())]
+
+        def cached_refresh():
+            result = sales_forecast.forecast_batch(next_day, args.periods, "arima", workers=args.workers, cache=cache)
+            return f"{summarize(result)}; cache {result.cache_report}"
+
+        timed("next day, refit from scratch", lambda: summarize(sales_forecast.forecast_batch(next_day, args.periods, "arima", workers=args.workers)))
+        timed("next day, from model cache", cached_refresh)
+
+
+if __name__ == "__main__":
+    main()
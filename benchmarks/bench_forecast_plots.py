@@ -0,0 +1,68 @@
+"""
+Benchmark: repeated single-series forecasts in one process (analytics/sales_forecast.py)
+- Before: the old plotting pattern, a pyplot figure per call saved to a fixed PNG and never closed
+- After: forecast_series() numbers only, then forecast_linear_regression() rendering to a BytesIO
+- Reports wall time, figures left open in pyplot and resident memory growth (Linux)
+
+Usage:
+    python benchmarks/bench_forecast_plots.py --calls 500 --days 120
+"""
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from analytics import sales_forecast
+
+
+def build_series(days, seed=3):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"date": pd.date_range("2024-01-01", periods=days), "sales": 200 + np.arange(days) + rng.normal(0, 10, days)})
+
+
+def original(df, periods, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    forecast = sales_forecast.forecast_series(df, periods)
+    plt.figure()
+    plt.plot(df["date"], df["sales"], label="History")
+    plt.plot(forecast["date"], forecast["yhat"], label="Linear Regression Forecast")
+    plt.legend()
+    plt.savefig(path)
+
+
+def timed(label, fn, calls):
+    import matplotlib.pyplot as plt
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    grown = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024
+    print(f"{label:<34} {elapsed:7.2f} s  {1000 * elapsed / calls:6.1f} ms/call  open figures {len(plt.get_fignums()):5d}  peak RSS +{grown:6.0f} MiB")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Repeated forecast plotting benchmark")
+    parser.add_argument("--calls", type=int, default=500, help="Forecasts per variant")
+    parser.add_argument("--days", type=int, default=120, help="History length of the series")
+    parser.add_argument("--periods", type=int, default=7, help="Forecast periods (days)")
+    args = parser.parse_args()
+
+    df = build_series(args.days)
+    sales_forecast.forecast_series(df, args.periods)  # load pandas/scipy outside the timings
+    path = os.path.join(tempfile.mkdtemp(), "linear_regression_forecast.png")
+    timed("numbers only (forecast_series)", lambda: sales_forecast.forecast_series(df, args.periods), args.calls)
+    timed("Agg canvas to BytesIO", lambda: sales_forecast.forecast_linear_regression(df, args.periods, plot_to=io.BytesIO()), args.calls)
+    timed("original (pyplot, never closed)", lambda: original(df, args.periods, path), args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: import time and `--help` startup of every module CLI, with regression thresholds
+- Runs `python -X importtime -c "import <module>"` in a fresh interpreter (median of --repeat runs)
+  and reports the module's cumulative import time
+- Fails if a module imports one of its deferred heavy dependencies (pandas, matplotlib, ...) at load
+- Times `python -m <module> --help` wall clock, with OPENAI_API_KEY unset to check offline startup
+- Exits 1 when any budget is exceeded, so it can gate CI or a cron job
+
+Usage:
+    python benchmarks/bench_import_time.py --repeat 5 [--scale 1.5] [--module analytics.sales_forecast]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# module -> (import budget in ms, heavy modules that must not be loaded by the import)
+BUDGETS = {
+    "analytics.sales_forecast": (150, ("pandas", "numpy", "scipy", "matplotlib", "sklearn", "statsmodels", "prophet")),
+    "automation.report_generator": (150, ("pandas", "matplotlib", "reportlab", "openai")),
+    "automation.inventory_tracker": (150, ("pandas", "openai")),
+    "customer_service.chatbot": (500, ("pandas", "openai")),
+    "customer_service.sentiment_analysis": (150, ("pandas", "openai")),
+    "finance.expense_tracker": (150, ("pandas", "numpy", "openai", "pdfplumber")),
+    "marketing.email_generator": (150, ("pandas", "openai")),
+    "operations.appointment_scheduler": (150, ("ics", "openai")),
+    "operations.invoice_processor": (200, ("pytesseract", "pdf2image", "pdfplumber", "pandas")),
+    "operations.scheduling_engine": (150, ("pandas",)),
+    "smallbiz.cli": (100, ("pandas", "openai")),
+}
+HELP_BUDGET_MS = 1500  # python -m <module> --help, interpreter startup included
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    env.pop("OPENAI_API_KEY", None)
+    return env
+
+
+def import_profile(module):
+    """(cumulative import time of `module` in ms, set of modules it loaded) from one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-2000:]}")
+    total_us, loaded = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+
+def help_time(module):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", module, "--help"], cwd=ROOT, env=_env(), capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, result.returncode == 0
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="CLI import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (median reported)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines)")
+    parser.add_argument("--module", action="append", help="Only check this module (repeatable)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<38} {'import':>9} {'budget':>7} {'--help':>9}  eager heavy imports")
+    for module in args.module or BUDGETS:
+        budget, deferred = BUDGETS.get(module, (150, ()))
+        budget *= args.scale
+        runs = [import_profile(module) for _ in range(max(1, args.repeat))]
+        import_ms = statistics.median(ms for ms, _ in runs)
+        eager = sorted(name for name in deferred if name in runs[0][1])
+        help_ms, help_ok = help_time(module)
+        print(f"{module:<38} {import_ms:7.1f}ms {budget:5.0f}ms {help_ms:7.0f}ms  {', '.join(eager) or '-'}")
+        if import_ms > budget:
+            failures.append(f"{module}: import {import_ms:.1f}ms > {budget:.0f}ms")
+        if eager:
+            failures.append(f"{module}: imports {', '.join(eager)} at load")
+        if not help_ok:
+            failures.append(f"{module}: --help failed without OPENAI_API_KEY")
+        elif help_ms > HELP_BUDGET_MS * args.scale:
+            failures.append(f"{module}: --help {help_ms:.0f}ms > {HELP_BUDGET_MS * args.scale:.0f}ms")
+
+    if failures:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll modules within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: PDF text-layer fast path vs. always-OCR in operations/invoice_processor.py
+- Generates a mixed corpus of born-digital (reportlab) and scanned (image-only) PDF invoices
+- Times process_invoices with and without the text-layer fast path
+- Requires reportlab, pdfplumber and Pillow; the OCR baseline also needs tesseract and poppler
+
+Usage:
+    python benchmarks/bench_invoice_text_layer.py --digital 50 --scanned 10 --workers 4
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from operations import invoice_processor
+from utils.file_io import read_csv
+
+
+def make_digital_pdf(path: str, i: int) -> None:
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(path)
+    c.drawString(72, 750, f"Vendor: Digital Vendor {i}")
+    c.drawString(72, 730, "Date: 2024-03-01")
+    c.drawString(72, 710, f"Total Amount: ${i},250.00")
+    c.save()
+
+
+def make_scanned_pdf(path: str, i: int) -> None:
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", (1275, 1650), "white")
+    draw = ImageDraw.Draw(img)
+    for y, line in enumerate([f"Vendor: Scanned Vendor {i}", "Date: 2024-03-02", f"Total Amount: ${i}00.00"]):
+        draw.text((100, 100 + 60 * y), line, fill="black")
+    img.save(path, "PDF", resolution=150)
+
+
+def run(input_dir: str, text_layer: bool, workers: int) -> float:
+    out_csv = os.path.join(input_dir, f"out_{text_layer}.csv")
+    start = time.perf_counter()
+    invoice_processor.process_invoices(input_dir, out_csv, workers=workers, incremental=False, text_layer=text_layer)
+    elapsed = time.perf_counter() - start
+    methods = [row["method"] for row in read_csv(out_csv)]
+    print(f"  text_layer={text_layer}: {elapsed:.2f}s for {len(methods)} invoices "
+          f"({methods.count('text')} text, {methods.count('ocr')} ocr, {methods.count('mixed')} mixed)")
+    os.remove(out_csv)
+    return elapsed
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Invoice text-layer benchmark")
+    parser.add_argument("--digital", type=int, default=50, help="Born-digital PDFs in the corpus")
+    parser.add_argument("--scanned", type=int, default=10, help="Scanned (image-only) PDFs in the corpus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    ocr_available = bool(shutil.which("tesseract") and shutil.which("pdftoppm"))
+    with tempfile.TemporaryDirectory() as corpus:
+        for i in range(args.digital):
+            make_digital_pdf(os.path.join(corpus, f"digital_{i}.pdf"), i)
+        scanned = args.scanned if ocr_available else 0
+        for i in range(scanned):
+            make_scanned_pdf(os.path.join(corpus, f"scanned_{i}.pdf"), i)
+        if not ocr_available:
+            print("tesseract/poppler not found: skipping scanned PDFs and the OCR baseline.")
+        print(f"Corpus: {args.digital} born-digital + {scanned} scanned PDFs, {args.workers} workers")
+        fast = run(corpus, text_layer=True, workers=args.workers)
+        if ocr_available:
+            slow = run(corpus, text_layer=False, workers=args.workers)
+            print(f"Speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
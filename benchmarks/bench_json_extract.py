@@ -0,0 +1,83 @@
+"""
+Benchmark: utils/json_extract.py vs. the extract_json_from_response copies it replaced
+- Corpus of typical LLM outputs: clean JSON, fenced JSON, prose around JSON, arrays,
+  several objects, braces inside strings, truncated output and garbage
+- Reports per-call time and how many outputs each parser recovers with the expected value
+
+Usage:
+    python benchmarks/bench_json_extract.py --repeat 2000 --size 20
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.json_extract import extract_json
+
+
+def original_extract_json_from_response(response_content):
+    content = response_content.strip()
+    if content.startswith('```json'):
+        content = content[len('```json'):].strip()
+    if content.startswith('```'):
+        content = content[len('```'):].strip()
+    if content.endswith('```'):
+        content = content[:-3].strip()
+    start = content.find('{')
+    end = content.rfind('}')
+    if start != -1 and end != -1 and end > start:
+        content = content[start:end+1]
+    if content.count('{') > 0 and content.count('}') > 0:
+        last_brace = content.rfind('}')
+        content = content[:last_brace+1]
+    try:
+        return json.loads(content)
+    except Exception:
+        return None
+
+
+def build_corpus(size):
+    """(text, expected) pairs; size controls how many records each payload holds."""
+    obj = {"summary": "Restock " + ", ".join(f"item {i} (need {i * 3})" for i in range(size)), "email": "Dear supplier,\nPlease send {x} units."}
+    arr = [{"id": i, "sentiment": "positive", "reasoning": f"Review {i} praises [speed]."} for i in range(size)]
+    text = json.dumps(obj)
+    return [
+        (text, obj),
+        ("```json\n" + json.dumps(obj, indent=2) + "\n```", obj),
+        ("Sure! Here is the result:\n" + text + "\nLet me know if you need changes {or more}.", obj),
+        (json.dumps(arr), arr),
+        ("```json\n" + json.dumps(arr) + "\n```", arr),
+        ('Example: {"summary": "..."}\n' + text, obj),
+        (text.replace("\\n", "\n"), obj),
+        (text[:-20], None),
+        ("I'm sorry, I can't help with that.", None),
+    ]
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="JSON extraction benchmark")
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the corpus")
+    parser.add_argument("--size", type=int, default=20, help="Records per payload")
+    args = parser.parse_args()
+    corpus = build_corpus(args.size)
+
+    for name, parse in (("original", original_extract_json_from_response), ("json_extract", lambda t: extract_json(t, default=None))):
+        recovered = sum(1 for text, expected in corpus if expected is not None and parse(text) == expected)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for text, _ in corpus:
+                parse(text)
+        per_call_us = (time.perf_counter() - start) / (args.repeat * len(corpus)) * 1e6
+        print(f"{name:>12}: {per_call_us:7.1f} us per call, recovered {recovered}/{sum(1 for _, e in corpus if e is not None)} expected values")
+
+    for text, expected in corpus[:2]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            extract_json(text)
+        print(f"fast path ({'fenced' if text.startswith('```') else 'clean'}): {(time.perf_counter() - start) / args.repeat * 1e6:.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
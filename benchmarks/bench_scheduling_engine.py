@@ -0,0 +1,62 @@
+"""
+Benchmark: multi-resource first-available and bulk availability in operations/scheduling_engine.py
+- Builds hundreds of resources across locations with a year of bookings
+- Times first_available (target: sub-millisecond) and bulk_availability for all resources
+
+Usage:
+    python benchmarks/bench_scheduling_engine.py --resources 300 --bookings 100000
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from operations.scheduling_engine import Resource, SchedulingEngine, Service
+from utils.time_slots import parse_hours_spec
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Scheduling engine benchmark")
+    parser.add_argument("--resources", type=int, default=300, help="Number of staff/room resources")
+    parser.add_argument("--bookings", type=int, default=100000, help="Number of bookings over a year")
+    parser.add_argument("--queries", type=int, default=1000, help="first_available queries to time")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    services = [Service("Consultation", 30), Service("Repair", 90, 15), Service("Training", 60, 10)]
+    hours = [parse_hours_spec("Mon-Fri 8am-6pm; Sat 9am-3pm"), parse_hours_spec("Mon-Fri 9am-5pm")]
+    resources = [
+        Resource(f"r{i}", "staff", f"Location {i % 20}", frozenset(rng.sample([s.name for s in services], 2)), hours[i % 2])
+        for i in range(args.resources)
+    ]
+    engine = SchedulingEngine(resources, services)
+    first_day = datetime(2025, 1, 1).date()
+    start = time.perf_counter()
+    for _ in range(args.bookings):
+        b_start = rng.randrange(8 * 60, 17 * 60, 15)
+        engine.add_booking(
+            f"r{rng.randrange(args.resources)}",
+            str(first_day + timedelta(days=rng.randrange(365))),
+            f"{b_start // 60:02d}:{b_start % 60:02d}",
+            f"{(b_start + 60) // 60:02d}:{(b_start + 60) % 60:02d}",
+        )
+    print(f"Indexed {args.bookings} bookings for {args.resources} resources in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    for i in range(args.queries):
+        day = str(first_day + timedelta(days=i % 300))
+        engine.first_available(services[i % 3].name, n=5, start_date=day)
+    per_query = (time.perf_counter() - start) / args.queries * 1000
+    print(f"first_available(n=5): {per_query:.3f} ms per query")
+
+    start = time.perf_counter()
+    availability = engine.bulk_availability("Consultation", start_date="2025-06-02", days_ahead=7)
+    slots = sum(len(v) for v in availability.values())
+    print(f"bulk_availability: {len(availability)} resources x 7 days, {slots} slots in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
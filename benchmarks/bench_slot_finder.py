@@ -0,0 +1,87 @@
+"""
+Benchmark: interval-index slot finder vs. the original nested loop in operations/appointment_scheduler.py
+- Generates a year of bookings (default 100k) spread across the calendar
+- Times get_available_slots (index build + sweep) and the original O(days x slots x bookings) loop
+- Verifies both return identical slots
+
+Usage:
+    python benchmarks/bench_slot_finder.py --bookings 100000 --days 7
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from operations import appointment_scheduler
+
+
+def original_get_available_slots(working_hours, bookings, slot_minutes=30, days_ahead=7, start_date=None):
+    today = datetime.strptime(start_date, "%Y-%m-%d").date()
+    start_hour, end_hour = [datetime.strptime(h, "%H:%M").time() for h in working_hours]
+    slots = []
+    for day in range(days_ahead):
+        date = today + timedelta(days=day)
+        current = datetime.combine(date, start_hour)
+        end = datetime.combine(date, end_hour)
+        while current + timedelta(minutes=slot_minutes) <= end:
+            slot_start = current.time()
+            slot_end = (current + timedelta(minutes=slot_minutes)).time()
+            overlaps = []
+            for b in bookings:
+                if b['date'] == str(date):
+                    b_start = datetime.strptime(b['start_time'], "%H:%M").time()
+                    b_end = datetime.strptime(b['end_time'], "%H:%M").time()
+                    overlaps.append((slot_start < b_end) and (slot_end > b_start))
+            if not any(overlaps):
+                slots.append((str(date), slot_start.strftime("%H:%M"), slot_end.strftime("%H:%M")))
+            current += timedelta(minutes=slot_minutes)
+    return slots
+
+
+def make_bookings(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    first_day = datetime(2025, 1, 1).date()
+    bookings = []
+    for _ in range(n):
+        date = first_day + timedelta(days=rng.randrange(365))
+        start = rng.randrange(8 * 60, 18 * 60, 15)
+        end = start + rng.choice([15, 30, 45, 60])
+        bookings.append({
+            "date": str(date),
+            "start_time": f"{start // 60:02d}:{start % 60:02d}",
+            "end_time": f"{end // 60:02d}:{end % 60:02d}",
+        })
+    return bookings
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Slot finder benchmark")
+    parser.add_argument("--bookings", type=int, default=100000, help="Number of bookings")
+    parser.add_argument("--days", type=int, default=7, help="Days ahead to search")
+    parser.add_argument("--skip-original", action="store_true", help="Only time the indexed version")
+    args = parser.parse_args()
+
+    bookings = make_bookings(args.bookings)
+    query = dict(working_hours=("08:00", "19:00"), slot_minutes=15, days_ahead=args.days, start_date="2025-06-02")
+
+    start = time.perf_counter()
+    index = appointment_scheduler.BookingIndex(bookings)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    fast = appointment_scheduler.get_available_slots(bookings=index, **query)
+    sweep = time.perf_counter() - start
+    print(f"{args.bookings} bookings, {args.days} days: index build {build * 1000:.1f} ms, query {sweep * 1000:.2f} ms, {len(fast)} free slots")
+
+    if not args.skip_original:
+        start = time.perf_counter()
+        slow = original_get_available_slots(bookings=bookings, **query)
+        original = time.perf_counter() - start
+        assert slow == fast, "indexed slots differ from the original implementation"
+        print(f"original loop: {original:.2f} s -> speedup {original / (build + sweep):.0f}x (identical results)")
+
+
+if __name__ == "__main__":
+    main()
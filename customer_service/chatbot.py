@@ -3,15 +3,32 @@ FAQ Chatbot for Small Business Customer Service
 - CLI chatbot loop
 - Minimal Flask API endpoint
 - Loads FAQs, locations, promotions, holidays, testimonials
+- Records are kept in a local BM25 index; only the top-k snippets relevant to a question are sent
+- Index updated incrementally when the data CSVs change, or rebuilt on /faq/reload
+- Near-exact FAQ questions answered locally (customer_service/faq_matcher.py) without an LLM call
+- Optional conversation sessions (customer_service/session_store.py) with a token-budgeted history
+- Streaming answers: /faq/stream (Server-Sent Events) and --cli --stream; client disconnects cancel the upstream stream
+- Production serving via gunicorn (customer_service/wsgi.py): concurrency cap with 503 shedding, LLM timeout, /healthz
 - Robust error handling for OpenAI and Flask
 """
-import openai
-from flask import Flask, request, jsonify
-from typing import List, Dict
-from utils.config import OPENAI_API_KEY
+from contextlib import closing
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from customer_service.faq_matcher import FaqMatcher
+from customer_service.session_store import SessionStore, store_from_env
+from utils.config import get_env
+from utils.llm_batch import estimate_tokens
+from utils.llm_cache import cached_chat_completion, cached_chat_completion_stream
+from utils.metrics import LatencyRecorder
+from utils.text_search import BM25Index
+from utils import openai_client
 import csv
-
-openai.api_key = OPENAI_API_KEY
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
 
 def load_csv_data(filepath: str) -> list:
     try:
@@ -20,91 +37,404 @@ def load_csv_data(filepath: str) -> list:
     except Exception:
         return []
 
-LOCATIONS = load_csv_data('data/sample_locations.csv')
-PROMOTIONS = load_csv_data('data/sample_promotions.csv')
-HOLIDAYS = load_csv_data('data/sample_holidays.csv')
-TESTIMONIALS = load_csv_data('data/sample_testimonials.csv')
+DATA_FILES = {
+    "locations": 'data/sample_locations.csv',
+    "promotions": 'data/sample_promotions.csv',
+    "holidays": 'data/sample_holidays.csv',
+    "testimonials": 'data/sample_testimonials.csv',
+}
+DATA_CHECK_INTERVAL = 2.0  # seconds between mtime checks of DATA_FILES
+TOP_K = 8
+MAX_CANNED_ROWS = 20  # larger see_also sections go to the LLM with retrieval instead
+MAX_CONCURRENT_REQUESTS = int(get_env("CHATBOT_MAX_CONCURRENCY", "64"))  # per process; extra requests get 503
+LLM_TIMEOUT = float(get_env("CHATBOT_LLM_TIMEOUT", "20"))  # seconds per OpenAI attempt
+# Retries multiply LLM_TIMEOUT; with none, a request waits on OpenAI at most LLM_TIMEOUT
+LLM_MAX_RETRIES = int(get_env("CHATBOT_LLM_MAX_RETRIES", "0"))
 
 FAQS: List[Dict[str, str]] = [
-    {"question": "What are your business hours?", "answer": "We are open Monday to Friday, 9am to 6pm. See our locations for specific hours."},
-    {"question": "Where are you located?", "answer": "We have multiple locations. See below for details."},
-    {"question": "How can I contact support?", "answer": "Email support@business.com or call (555) 123-4567. For specific locations, see below."},
-    {"question": "Do you offer discounts?", "answer": "Yes! See our current promotions below."},
-    {"question": "Are you open on holidays?", "answer": "Holiday hours may vary. See below for details."},
+    {"question": "What are your business hours?", "answer": "We are open Monday to Friday, 9am to 6pm. See our locations for specific hours.", "see_also": "locations"},
+    {"question": "Where are you located?", "answer": "We have multiple locations. See below for details.", "see_also": "locations"},
+    {"question": "How can I contact support?", "answer": "Email support@business.com or call (555) 123-4567. For specific locations, see below.", "see_also": "locations"},
+    {"question": "Do you offer discounts?", "answer": "Yes! See our current promotions below.", "see_also": "promotions"},
+    {"question": "Are you open on holidays?", "answer": "Holiday hours may vary. See below for details.", "see_also": "holidays"},
     {"question": "What is your return policy?", "answer": "Returns are accepted within 30 days with receipt."},
     {"question": "How do I book an appointment?", "answer": "You can book online, by phone, or in person at any location."},
     {"question": "What payment methods do you accept?", "answer": "We accept Visa, MasterCard, PayPal, and Apple Pay."},
-    {"question": "Do you have customer testimonials?", "answer": "Yes! See below for what our customers say."},
-    {"question": "What promotions are running?", "answer": "See our current promotions below."}
+    {"question": "Do you have customer testimonials?", "answer": "Yes! See below for what our customers say.", "see_also": "testimonials"},
+    {"question": "What promotions are running?", "answer": "See our current promotions below.", "see_also": "promotions"}
 ]
 
-SYSTEM_PROMPT = "You are a helpful small business FAQ assistant. Answer only based on the provided FAQs."
+SYSTEM_PROMPT = (
+    "You are a helpful small business FAQ assistant. Answer only based on the provided FAQs "
+    "and business information. If they do not cover the question, say so."
+)
+
+
+def format_faq(faq: Dict[str, str]) -> str:
+    return f"Q: {faq['question']}\nA: {faq['answer']}"
+
+
+def format_location(l: Dict[str, str]) -> str:
+    return f"Location - {l['location']}: {l['address']} ({l['phone']}), Hours: {l['hours']}"
+
+
+def format_promotion(p: Dict[str, str]) -> str:
+    return f"Promotion - {p['promotion']}: {p['description']} (valid until {p['valid_until']})"
+
+
+def format_holiday(h: Dict[str, str]) -> str:
+    return f"Holiday Hours - {h['holiday']} ({h['date']}): {'Open ' + h['special_hours'] if h['is_open']=='Yes' else 'Closed'}"
+
+
+def format_testimonial(t: Dict[str, str]) -> str:
+    return f"Testimonial - {t['customer']}: '{t['quote']}' (Rating: {t['rating']}/5)"
+
+
+FORMATTERS: Dict[str, Callable[[Dict[str, str]], str]] = {
+    "locations": format_location,
+    "promotions": format_promotion,
+    "holidays": format_holiday,
+    "testimonials": format_testimonial,
+}
+
+_index = BM25Index()
+_index_lock = threading.Lock()
+_source_mtimes: Dict[str, Optional[int]] = {}
+_source_docs: Dict[str, Dict[str, str]] = {}
+_last_check = 0.0
+_matcher: Optional[FaqMatcher] = None
+_sessions: Optional[SessionStore] = None
+_latency = LatencyRecorder()
+_metrics_lock = threading.Lock()
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_metrics = {"requests": 0, "shed": 0, "index_updates": 0, "latency_ms": 0.0, "prompt_tokens": 0}
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _sync_source(name: str, texts: List[str]) -> bool:
+    """Make the index hold exactly `texts` for a source, touching only rows that changed."""
+    docs = {f"{name}:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}": text for text in texts}
+    old = _source_docs.get(name, {})
+    for doc_id in old.keys() - docs.keys():
+        _index.remove(doc_id)
+    for doc_id in docs.keys() - old.keys():
+        _index.add(doc_id, docs[doc_id])
+    _source_docs[name] = docs
+    return old.keys() != docs.keys()
+
+
+def _refresh_index(force: bool = False) -> int:
+    """Re-read sources whose CSV changed (or all when forced); returns how many were re-read."""
+    if "faqs" not in _source_docs or force:
+        _sync_source("faqs", [format_faq(faq) for faq in FAQS])
+    refreshed = 0
+    for name, path in DATA_FILES.items():
+        mtime = _mtime(path)
+        if not force and name in _source_mtimes and _source_mtimes[name] == mtime:
+            continue
+        texts = []
+        for row in load_csv_data(path):
+            try:
+                texts.append(FORMATTERS[name](row))
+            except KeyError:
+                continue
+        _sync_source(name, texts)
+        _source_mtimes[name] = mtime
+        refreshed += 1
+    if refreshed:
+        with _metrics_lock:
+            _metrics["index_updates"] += 1
+    return refreshed
+
+
+def reload_context() -> int:
+    """Re-read every data CSV into the index; returns the number of indexed snippets."""
+    global _last_check
+    with _index_lock:
+        _last_check = time.monotonic()
+        _refresh_index(force=True)
+        return len(_index)
 
 
-def get_faq_context() -> str:
-    """Format FAQs for LLM context."""
-    return "\n".join([f"Q: {faq['question']}\nA: {faq['answer']}" for faq in FAQS])
+def get_index() -> BM25Index:
+    """Return the snippet index, first applying changes to any data CSV (checked at most every DATA_CHECK_INTERVAL)."""
+    global _last_check
+    now = time.monotonic()
+    if _source_docs and now - _last_check < DATA_CHECK_INTERVAL:
+        return _index
+    with _index_lock:
+        _last_check = now
+        _refresh_index()
+        return _index
 
 
-def get_extra_context() -> str:
-    context = []
-    if LOCATIONS:
-        context.append("Locations:\n" + "\n".join([f"- {l['location']}: {l['address']} ({l['phone']}), Hours: {l['hours']}" for l in LOCATIONS]))
-    if PROMOTIONS:
-        context.append("Promotions:\n" + "\n".join([f"- {p['promotion']}: {p['description']} (valid until {p['valid_until']})" for p in PROMOTIONS]))
-    if HOLIDAYS:
-        context.append("Holiday Hours:\n" + "\n".join([f"- {h['holiday']} ({h['date']}): {'Open ' + h['special_hours'] if h['is_open']=='Yes' else 'Closed'}" for h in HOLIDAYS]))
-    if TESTIMONIALS:
-        context.append("Testimonials:\n" + "\n".join([f"- {t['customer']}: '{t['quote']}' (Rating: {t['rating']}/5)" for t in TESTIMONIALS]))
-    return "\n\n".join(context)
+def get_context(question: str, k: int = TOP_K) -> str:
+    """Top-k FAQ and business-data snippets for a question (the first k FAQs when nothing matches)."""
+    index = get_index()
+    with _index_lock:
+        snippets = [index.texts[doc_id] for doc_id, _ in index.search(question, k)]
+    if not snippets:
+        snippets = [format_faq(faq) for faq in FAQS[:k]]
+    return "\n".join(snippets)
 
 
-def ask_faq_bot(user_question: str) -> str:
-    """Query OpenAI with FAQ and extra context and user question."""
-    context = get_faq_context() + "\n\n" + get_extra_context()
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT + "\n" + context},
+def get_metrics() -> Dict[str, float]:
+    """Per-request averages for ask_faq_bot plus OpenAI token usage (including provider-cached prompt tokens)."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    requests_served = metrics["requests"]
+    return {
+        "requests": requests_served,
+        "shed": metrics["shed"],
+        "index_updates": metrics["index_updates"],
+        "indexed_snippets": len(_index),
+        "avg_latency_ms": metrics["latency_ms"] / requests_served if requests_served else 0.0,
+        "avg_prompt_tokens": metrics["prompt_tokens"] / requests_served if requests_served else 0.0,
+        "paths": _latency.snapshot(),
+        "sessions": get_sessions().get_stats(),
+        "usage": openai_client.get_usage(),
+    }
+
+
+def get_sessions() -> SessionStore:
+    global _sessions
+    if _sessions is None:
+        _sessions = store_from_env()
+    return _sessions
+
+
+def build_messages(user_question: str, history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+    """Messages for a question, after any session history. The static instructions go
+    first as their own system message so every request shares the same prefix for
+    provider-side prompt caching."""
+    history = history or []
+    # Follow-ups like "and on Saturday?" retrieve better together with the previous question
+    previous = next((m["content"] for m in reversed(history) if m["role"] == "user"), "")
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": "Relevant FAQs and business information:\n" + get_context(f"{previous} {user_question}".strip())},
+        *history,
         {"role": "user", "content": user_question}
     ]
+
+
+def remember(session_id: Optional[str], user_question: str, answer: str) -> None:
+    """Record a completed exchange in the session history (no-op without a session id)."""
+    if session_id:
+        sessions = get_sessions()
+        sessions.append(session_id, "user", user_question)
+        sessions.append(session_id, "assistant", answer)
+
+
+def _record_request(start: float, messages: List[Dict[str, str]]) -> None:
+    with _metrics_lock:
+        _metrics["requests"] += 1
+        _metrics["latency_ms"] += (time.perf_counter() - start) * 1000
+        _metrics["prompt_tokens"] += sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def ask_faq_bot(user_question: str, session_id: Optional[str] = None) -> str:
+    """Query OpenAI with the snippets relevant to the user question and the session history."""
+    start = time.perf_counter()
+    history = get_sessions().history(session_id) if session_id else None
+    messages = build_messages(user_question, history)
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=300
-        )
-        return response.choices[0].message.content.strip()
+        content = cached_chat_completion("chatbot", "gpt-4o", messages, 300, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES)
+        answer = content.strip()
+        remember(session_id, user_question, answer)
+        return answer
     except Exception as e:
         return f"Sorry, I couldn't process your request: {e}"
+    finally:
+        _record_request(start, messages)
+
+
+def stream_faq_bot(user_question: str, session_id: Optional[str] = None) -> Iterator[str]:
+    """Streaming ask_faq_bot: yield answer text as OpenAI generates it.
+
+    Closing the generator early (client gone) closes the upstream stream and
+    leaves the session history unchanged.
+    """
+    start = time.perf_counter()
+    history = get_sessions().history(session_id) if session_id else None
+    messages = build_messages(user_question, history)
+    first_token = True
+    parts = []
+    try:
+        with closing(cached_chat_completion_stream("chatbot", "gpt-4o", messages, 300, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES)) as stream:
+            for delta in stream:
+                if first_token:
+                    _latency.record("llm_first_token", (time.perf_counter() - start) * 1000)
+                    first_token = False
+                parts.append(delta)
+                yield delta
+        remember(session_id, user_question, "".join(parts).strip())
+    except Exception as e:
+        yield f"Sorry, I couldn't process your request: {e}"
+    finally:
+        _record_request(start, messages)
+
+
+def get_matcher() -> FaqMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = FaqMatcher(FAQS)
+    return _matcher
+
+
+def canned_answer(faq: Dict[str, str]) -> Optional[str]:
+    """The FAQ answer followed by the rows of its see_also data file, or None if that section is too large."""
+    source = faq.get("see_also")
+    if not source:
+        return faq["answer"]
+    get_index()
+    with _index_lock:
+        rows = list(_source_docs.get(source, {}).values())
+    if len(rows) > MAX_CANNED_ROWS:
+        return None
+    return "\n".join([faq["answer"]] + rows)
+
+
+def answer_question(user_question: str, session_id: Optional[str] = None) -> Tuple[str, str]:
+    """Answer from the matching canned FAQ when confident, otherwise ask the LLM.
+
+    Returns (answer, path) where path is 'exact', 'fuzzy' or 'llm'; per-path
+    counts and p50/p99 latency are reported by get_metrics().
+    """
+    start = time.perf_counter()
+    faq, _, path = get_matcher().match(user_question)
+    answer = canned_answer(faq) if faq else None
+    if answer is None:
+        path = "llm"
+        answer = ask_faq_bot(user_question, session_id)
+    else:
+        remember(session_id, user_question, answer)
+    _latency.record(path, (time.perf_counter() - start) * 1000)
+    return answer, path
+
+
+def stream_answer(user_question: str, session_id: Optional[str] = None) -> Tuple[str, Iterator[str]]:
+    """Like answer_question, but returns (path, chunks) so LLM answers can be shown as they stream."""
+    start = time.perf_counter()
+    faq, _, path = get_matcher().match(user_question)
+    answer = canned_answer(faq) if faq else None
+    if answer is not None:
+        remember(session_id, user_question, answer)
+        _latency.record(path, (time.perf_counter() - start) * 1000)
+        return path, iter([answer])
+
+    def chunks() -> Iterator[str]:
+        try:
+            yield from stream_faq_bot(user_question, session_id)
+        finally:
+            _latency.record("llm", (time.perf_counter() - start) * 1000)
 
+    return "llm", chunks()
 
-def cli_chatbot_loop():
+
+def cli_chatbot_loop(stream: bool = False):
     print("Welcome to the Small Business FAQ Chatbot! Type 'exit' to quit.")
+    session_id = uuid.uuid4().hex
     while True:
         user_input = input("You: ")
         if user_input.lower() in ("exit", "quit"):
             print("Goodbye!")
             break
-        answer = ask_faq_bot(user_input)
-        print(f"Bot: {answer}")
+        if stream:
+            print("Bot: ", end="", flush=True)
+            for chunk in stream_answer(user_input, session_id)[1]:
+                print(chunk, end="", flush=True)
+            print()
+        else:
+            answer, _ = answer_question(user_input, session_id)
+            print(f"Bot: {answer}")
 
 # Minimal Flask API
 app = Flask(__name__)
 
+@app.before_request
+def limit_concurrency():
+    """Shed load with 503 instead of queueing once MAX_CONCURRENT_REQUESTS are in flight."""
+    if request.path == "/healthz":
+        return None
+    if not _request_slots.acquire(blocking=False):
+        with _metrics_lock:
+            _metrics["shed"] += 1
+        return jsonify({"error": "Server is busy, please retry shortly."}), 503, {"Retry-After": "1"}
+    g.holds_request_slot = True
+    return None
+
+@app.teardown_request
+def release_request_slot(exc):
+    if g.pop("holds_request_slot", False):
+        _request_slots.release()
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok", "indexed_snippets": len(_index)})
+
 @app.route("/faq", methods=["POST"])
 def faq_api():
     data = request.get_json()
     question = data.get("question", "")
-    answer = ask_faq_bot(question)
-    return jsonify({"answer": answer})
+    session_id = data.get("session_id")
+    answer, path = answer_question(question, session_id)
+    response = {"answer": answer, "source": path}
+    if session_id:
+        response["session_id"] = session_id
+    return jsonify(response)
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route("/faq/stream", methods=["GET", "POST"])
+def faq_stream_api():
+    """Server-Sent Events: one `data: {"delta": ...}` event per chunk, then `event: done`.
+
+    If the client disconnects, the WSGI server closes this generator, which
+    closes the upstream OpenAI stream so no more tokens are generated.
+    """
+    params = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+    question = params.get("question", "")
+    path, chunks = stream_answer(question, params.get("session_id"))
+
+    def events() -> Iterator[str]:
+        try:
+            for chunk in chunks:
+                yield sse_event({"delta": chunk})
+            yield sse_event({"source": path}, event="done")
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers=headers)
+
+@app.route("/faq/reload", methods=["POST"])
+def faq_reload_api():
+    return jsonify({"reloaded": True, "indexed_snippets": reload_context()})
+
+@app.route("/faq/metrics", methods=["GET"])
+def faq_metrics_api():
+    return jsonify(get_metrics())
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Small Business FAQ Chatbot")
     parser.add_argument("--cli", action="store_true", help="Run CLI chatbot loop")
-    parser.add_argument("--api", action="store_true", help="Run Flask API server")
+    parser.add_argument("--api", action="store_true", help="Run Flask development server (see customer_service/wsgi.py for production)")
+    parser.add_argument("--stream", action="store_true", help="Print CLI answers as they are generated")
     args = parser.parse_args()
     if args.cli:
-        cli_chatbot_loop()
+        cli_chatbot_loop(stream=args.stream)
     elif args.api:
         app.run(host="0.0.0.0", port=5000)
     else:
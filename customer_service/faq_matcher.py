@@ -0,0 +1,67 @@
+"""
+Local FAQ matcher that answers near-exact questions without calling the LLM.
+- Questions normalized to stemmed content words (punctuation, case, filler words dropped)
+- Exact lookup by normalized-text hash, then difflib similarity against FAQ questions
+- Matches at or above the threshold are answered from the canned answer
+- A fuzzy match needs the same negation words as the FAQ question ("do you not offer refunds?"
+  is not "do you offer refunds?")
+"""
+import difflib
+from typing import Dict, List, Optional, Tuple
+from utils.config import get_env
+from utils.text_search import STOPWORDS, TOKEN_PATTERN, stem
+
+DEFAULT_THRESHOLD = 0.85
+FILLER_WORDS = {"hi", "hello", "hey", "please", "thanks", "thank", "u", "r", "ur", "whats", "wat", "pls", "plz", "ok"}
+# "t" is what is left of n't contractions ("don't" -> "don t")
+NEGATION_WORDS = {stem(word) for word in ("not", "no", "never", "nor", "none", "nothing", "without", "cannot", "t")}
+
+
+def normalize_question(text: str) -> str:
+    """'What are your business HOURS??' -> 'business hour'."""
+    tokens = TOKEN_PATTERN.findall((text or "").lower())
+    return " ".join(stem(token) for token in tokens if token not in STOPWORDS and token not in FILLER_WORDS)
+
+
+def negations(key: str) -> frozenset:
+    """Negation words in a normalize_question() key."""
+    return frozenset(token for token in key.split() if token in NEGATION_WORDS)
+
+
+class FaqMatcher:
+    """Match questions against a list of {'question', 'answer'} FAQs."""
+
+    def __init__(self, faqs: List[Dict[str, str]], threshold: Optional[float] = None):
+        self.faqs = faqs
+        self.threshold = threshold if threshold is not None else float(get_env("FAQ_MATCH_THRESHOLD", DEFAULT_THRESHOLD))
+        self.by_key: Dict[str, Dict[str, str]] = {}
+        for faq in faqs:
+            key = normalize_question(faq["question"])
+            if key:
+                self.by_key.setdefault(key, faq)
+        self.keys = list(self.by_key)
+        self.negations = {key: negations(key) for key in self.keys}
+
+    def match(self, question: str) -> Tuple[Optional[Dict[str, str]], float, Optional[str]]:
+        """Return (faq, score, path) with path 'exact' or 'fuzzy', or (None, best_score, None)."""
+        key = normalize_question(question)
+        if not key:
+            return None, 0.0, None
+        faq = self.by_key.get(key)
+        if faq is not None:
+            return faq, 1.0, "exact"
+        best_key, best_score = None, 0.0
+        negated = negations(key)
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for candidate in self.keys:
+            if self.negations[candidate] != negated:
+                continue  # similar wording, opposite question
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_key is not None and best_score >= self.threshold:
+            return self.by_key[best_key], best_score, "fuzzy"
+        return None, best_score, None
@@ -0,0 +1,28 @@
+"""
+gunicorn settings for customer_service.wsgi:app, overridable via environment variables.
+Keep threads strictly above CHATBOT_MAX_CONCURRENCY so shedding, not queueing, absorbs bursts:
+a gthread worker lets at most `threads` requests into Flask, so with threads <= the cap the
+503 path never fires and excess requests wait in the listen backlog instead.
+"""
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repo root, for utils.config
+from utils.config import get_env  # settings may come from .env
+
+bind = get_env("CHATBOT_BIND", "0.0.0.0:5000")
+workers = int(get_env("CHATBOT_WORKERS", min(4, multiprocessing.cpu_count())))
+worker_class = get_env("CHATBOT_WORKER_CLASS", "gthread")  # or "gevent" with gevent installed
+THREAD_HEADROOM = 16  # threads beyond the cap only answer 503, so they are cheap
+max_concurrency = int(get_env("CHATBOT_MAX_CONCURRENCY", "64"))
+threads = int(get_env("CHATBOT_THREADS", max_concurrency + THREAD_HEADROOM))
+if worker_class == "gthread" and threads <= max_concurrency:
+    print(f"[WARN] CHATBOT_THREADS={threads} is not above CHATBOT_MAX_CONCURRENCY={max_concurrency}; "
+          "bursts will queue instead of getting 503", file=sys.stderr)
+# Worker heartbeat: restarts a worker process that stops responding. With gthread it does not
+# cut off a slow request; CHATBOT_LLM_TIMEOUT and CHATBOT_LLM_MAX_RETRIES bound the OpenAI wait.
+timeout = int(get_env("CHATBOT_REQUEST_TIMEOUT", "30"))
+graceful_timeout = int(get_env("CHATBOT_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(get_env("CHATBOT_KEEPALIVE", "5"))
+preload_app = True
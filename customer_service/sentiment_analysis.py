@@ -3,14 +3,16 @@ Sentiment analysis for customer emails, messages, or reviews using OpenAI.
 - Classifies as positive, neutral, or negative with reasoning
 - Accepts single string or .csv batch
 - Outputs to terminal or .csv
+- Concurrent batch mode with rate limiting and retries for large CSVs
+- Packed mode that classifies many texts per request, with per-item fallback
+- CSVs are streamed in chunks and results appended as each chunk finishes, so memory stays flat
+- Structured outputs (JSON schema) with one repair call for unparseable replies
 - Robust error handling for OpenAI and file I/O
 """
-import openai
-from typing import List, Dict, Optional
-from utils.config import OPENAI_API_KEY
-from utils.file_io import read_csv, write_csv
-
-openai.api_key = OPENAI_API_KEY
+from typing import Callable, Iterator, List, Dict, Optional
+from utils.file_io import CsvAppender, iter_csv
+from utils.structured_output import OutputSchema, get_stats, structured_completion
+from utils.llm_batch import RateLimiter, estimate_tokens, run_batch
 
 SENTIMENT_PROMPT = (
     "You are a customer sentiment analysis assistant. "
@@ -19,27 +21,36 @@ SENTIMENT_PROMPT = (
     "Respond in JSON: {\"sentiment\": <sentiment>, \"reasoning\": <reasoning>}"
 )
 
-def extract_json_from_response(response_content: str):
-    """Extract JSON object from OpenAI response, stripping markdown/code block if present. No regex. Robust to malformed output."""
-    import json
-    content = response_content.strip()
-    if content.startswith('```json'):
-        content = content[len('```json'):].strip()
-    if content.startswith('```'):
-        content = content[len('```'):].strip()
-    if content.endswith('```'):
-        content = content[:-3].strip()
-    start = content.find('{')
-    end = content.rfind('}')
-    if start != -1 and end != -1 and end > start:
-        content = content[start:end+1]
-    if content.count('{') > 0 and content.count('}') > 0:
-        last_brace = content.rfind('}')
-        content = content[:last_brace+1]
-    try:
-        return json.loads(content)
-    except Exception:
-        return {"sentiment": "", "reasoning": ""}
+SENTIMENT_BATCH_PROMPT = (
+    "You are a customer sentiment analysis assistant. "
+    "Classify each numbered text below as positive, neutral, or negative. "
+    "Provide a one-sentence reasoning for each. "
+    "Respond in JSON with one object per text, in order: "
+    "{\"items\": [{\"id\": <number>, \"sentiment\": <sentiment>, \"reasoning\": <reasoning>}]}"
+)
+
+SENTIMENT_OUTPUT = OutputSchema("sentiment", {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative"]},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["sentiment", "reasoning"],
+    "additionalProperties": False,
+})
+# Malformed entries are tolerated here and retried one by one by analyze_csv
+SENTIMENT_BATCH_OUTPUT = OutputSchema("sentiment_batch", {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative"]},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["id", "sentiment", "reasoning"],
+    "additionalProperties": False,
+}, array=True, check=list)
+SENTIMENT_MAX_TOKENS = 100
+DEFAULT_CHUNK_ROWS = 1000  # rows read, classified and written per step in CSV mode
 
 def analyze_sentiment(text: str) -> Dict[str, str]:
     """Analyze sentiment of a single string using OpenAI."""
@@ -47,41 +58,166 @@ def analyze_sentiment(text: str) -> Dict[str, str]:
         {"role": "system", "content": SENTIMENT_PROMPT},
         {"role": "user", "content": text}
     ]
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        max_tokens=100
-    )
-    return extract_json_from_response(response.choices[0].message.content)
-
-def analyze_csv(input_csv: str, text_column: str = "text", output_csv: Optional[str] = None) -> List[Dict[str, str]]:
-    """Analyze sentiment for each row in a CSV file."""
-    rows = read_csv(input_csv)
+    result = structured_completion("sentiment_analysis", "gpt-4o", messages, SENTIMENT_OUTPUT, SENTIMENT_MAX_TOKENS)
+    return result.value if result.ok else {"sentiment": "", "reasoning": ""}
+
+def _sentiment_token_cost(text: str) -> int:
+    """Estimated prompt plus completion tokens for one sentiment request."""
+    return estimate_tokens(SENTIMENT_PROMPT + text) + SENTIMENT_MAX_TOKENS
+
+def _format_numbered(texts: List[str]) -> str:
+    """Render texts as a numbered list, one line per text."""
+    return "\n".join(f"{i}. {' '.join(t.split())}" for i, t in enumerate(texts, start=1))
+
+def analyze_sentiment_packed(texts: List[str]) -> List[Optional[Dict[str, str]]]:
+    """Classify several texts in a single OpenAI request.
+
+    Returns one result per input text, in order. Items whose id is missing
+    from the response or whose entry is malformed are returned as None so
+    the caller can retry just those.
+    """
+    if not texts:
+        return []
+    messages = [
+        {"role": "system", "content": SENTIMENT_BATCH_PROMPT},
+        {"role": "user", "content": _format_numbered(texts)}
+    ]
+    result = structured_completion("sentiment_analysis", "gpt-4o", messages, SENTIMENT_BATCH_OUTPUT, SENTIMENT_MAX_TOKENS * len(texts))
+    parsed = result.value if result.ok else []
+    results: List[Optional[Dict[str, str]]] = [None] * len(texts)
+    for entry in parsed:
+        if not isinstance(entry, dict) or not isinstance(entry.get("sentiment"), str):
+            continue
+        try:
+            idx = int(entry.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < len(texts) and results[idx] is None:
+            results[idx] = {"sentiment": entry["sentiment"], "reasoning": str(entry.get("reasoning", ""))}
+    return results
+
+def _packed_token_cost(texts: List[str]) -> int:
+    """Estimated prompt plus completion tokens for one packed request."""
+    return estimate_tokens(SENTIMENT_BATCH_PROMPT + _format_numbered(texts)) + SENTIMENT_MAX_TOKENS * len(texts)
+
+def _classify(texts: List[str], pack_size: int, batch_options: Dict) -> List[Dict[str, str]]:
+    """Classify texts in order, packed `pack_size` at a time with per-item retries for failed items."""
+    if pack_size <= 1:
+        return run_batch(analyze_sentiment, texts, token_estimator=_sentiment_token_cost, **batch_options)
+    packs = [texts[i:i + pack_size] for i in range(0, len(texts), pack_size)]
+    packed = run_batch(analyze_sentiment_packed, packs, token_estimator=_packed_token_cost, **batch_options)
+    sentiments = [result for pack in packed for result in pack]
+    failed = [i for i, result in enumerate(sentiments) if result is None]
+    if failed:
+        print(f"[WARN] {len(failed)} packed items failed to parse; retrying individually.")
+        retried = run_batch(analyze_sentiment, [texts[i] for i in failed], token_estimator=_sentiment_token_cost, **batch_options)
+        for i, result in zip(failed, retried):
+            sentiments[i] = result
+    return sentiments
+
+def iter_analyze_csv(
+    input_csv: str,
+    text_column: str = "text",
+    concurrency: int = 1,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_retries: int = 5,
+    pack_size: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[Dict[str, str]]:
+    """Yield each CSV row with its sentiment and reasoning added, in input order.
+
+    The file is read `chunk_size` rows at a time; each chunk is classified
+    (see analyze_csv) before the next is read, and the rate limiter is shared
+    across chunks. Only one chunk is held in memory.
+    """
+    limiter = RateLimiter(rpm=rpm, tpm=tpm) if (rpm or tpm) else None
+    batch_options = dict(concurrency=concurrency, rate_limiter=limiter, max_retries=max_retries)
+    for rows in iter_csv(input_csv, chunk_size=chunk_size):
+        texts = [row.get(text_column, "") for row in rows]
+        for row, result in zip(rows, _classify(texts, pack_size, batch_options)):
+            row.update(result)
+            yield row
+
+def analyze_csv(
+    input_csv: str,
+    text_column: str = "text",
+    output_csv: Optional[str] = None,
+    concurrency: int = 1,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    max_retries: int = 5,
+    pack_size: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    collect: bool = True,
+    on_row: Optional[Callable[[Dict[str, str]], None]] = None
+) -> List[Dict[str, str]]:
+    """Analyze sentiment for each row in a CSV file.
+
+    Rows are sent with up to `concurrency` requests in flight, throttled to
+    `rpm` requests and `tpm` tokens per minute. Rate-limit and server errors
+    are retried with jittered backoff. With `pack_size` > 1, texts are
+    classified `pack_size` at a time and only items that failed to parse are
+    re-sent individually. Output order matches input order. Rows are written
+    to `output_csv` as each chunk completes; pass collect=False to skip
+    building the returned list for files that do not fit in memory.
+    `on_row` is called with each row once it is written (e.g. for progress).
+    """
     results = []
-    for row in rows:
-        text = row.get(text_column, "")
-        result = analyze_sentiment(text)
-        row.update(result)
-        results.append(row)
-    if output_csv:
-        fieldnames = list(results[0].keys()) if results else []
-        write_csv(output_csv, results, fieldnames)
+    rows = iter_analyze_csv(input_csv, text_column, concurrency, rpm, tpm, max_retries, pack_size, chunk_size)
+    out = CsvAppender(output_csv, mode="w") if output_csv else None
+    try:
+        for row in rows:
+            if out:
+                out.write(row)
+            if collect:
+                results.append(row)
+            if on_row:
+                on_row(row)
+    finally:
+        if out:
+            out.close()
     return results
 
-def main():
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Customer Sentiment Analysis")
     parser.add_argument("--text", type=str, help="Single text to analyze")
     parser.add_argument("--csv", type=str, help="Path to input CSV file")
     parser.add_argument("--output", type=str, help="Path to output CSV file (optional)")
-    args = parser.parse_args()
+    parser.add_argument("--text_column", type=str, default="text", help="CSV column containing the text")
+    parser.add_argument("--concurrency", type=int, default=1, help="Max concurrent OpenAI requests for --csv")
+    parser.add_argument("--rpm", type=float, help="Max OpenAI requests per minute (optional)")
+    parser.add_argument("--tpm", type=float, help="Max OpenAI tokens per minute (optional)")
+    parser.add_argument("--pack_size", type=int, default=1, help="Texts classified per OpenAI request for --csv")
+    parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_ROWS, help="CSV rows read and written per step")
+    args = parser.parse_args(argv)
 
     if args.text:
         result = analyze_sentiment(args.text)
         print(f"Sentiment: {result['sentiment']}\nReasoning: {result['reasoning']}")
     elif args.csv:
-        results = analyze_csv(args.csv, output_csv=args.output)
-        print(f"Processed {len(results)} rows.")
+        processed = 0
+
+        def count(row):
+            nonlocal processed
+            processed += 1
+
+        analyze_csv(
+            args.csv,
+            text_column=args.text_column,
+            output_csv=args.output,
+            concurrency=args.concurrency,
+            rpm=args.rpm,
+            tpm=args.tpm,
+            pack_size=args.pack_size,
+            chunk_size=args.chunk_size,
+            collect=False,
+            on_row=count
+        )
+        print(f"Processed {processed} rows.")
+        for task, stats in get_stats().items():
+            print(f"{task}: {stats['requests']} requests, valid-parse rate {stats['valid_parse_rate']}, {stats['repair_calls']} repair calls")
         if args.output:
             print(f"Results saved to {args.output}")
     else:
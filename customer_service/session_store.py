@@ -0,0 +1,278 @@
+"""
+Conversation sessions for the FAQ chatbot with bounded memory.
+- In-process LRU of sessions keyed by session id, optionally backed by SQLite (shared across workers)
+- Each session keeps a token-budgeted rolling window of recent turns
+- Turns pushed out of the window are folded into a compact summary, a batch at a time
+- Per-session caps, idle eviction and a global token budget keep total RAM fixed
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.config import get_env
+from utils.llm_batch import estimate_tokens
+
+DEFAULT_WINDOW_TOKENS = 800
+DEFAULT_SUMMARY_TOKENS = 200
+DEFAULT_MAX_SESSIONS = 5000
+DEFAULT_MAX_TOTAL_TOKENS = 2_000_000
+DEFAULT_IDLE_SECONDS = 1800
+
+Turn = Tuple[str, str, int]  # (role, content, tokens)
+Summarizer = Callable[[str, List[Turn], int], str]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens (estimate_tokens' 4 characters per token)."""
+    max_chars = max(0, max_tokens - 1) * 4
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+
+def extractive_summary(summary: str, turns: List[Turn], max_tokens: int) -> str:
+    """Default summarizer: keep the first sentence of each old turn, newest last, within max_tokens."""
+    lines = [summary] if summary else []
+    for role, content, _ in turns:
+        first = content.strip().split("\n", 1)[0]
+        sentence = first.split(". ", 1)[0].rstrip(".")
+        lines.append(f"{'Customer' if role == 'user' else 'Assistant'}: {sentence}.")
+    text = "\n".join(lines)
+    max_chars = max(0, max_tokens - 1) * 4
+    # Drop the oldest material first
+    return text if len(text) <= max_chars else "..." + text[-max_chars:].lstrip()
+
+
+@dataclass
+class Session:
+    session_id: str
+    turns: List[Turn] = field(default_factory=list)
+    summary: str = ""
+    last_active: float = 0.0
+    version: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(t[2] for t in self.turns)
+
+    def to_json(self) -> str:
+        return json.dumps({"turns": self.turns, "summary": self.summary, "last_active": self.last_active})
+
+    @classmethod
+    def from_json(cls, session_id: str, data: str, version: int) -> "Session":
+        raw = json.loads(data)
+        turns = [(role, content, tokens) for role, content, tokens in raw.get("turns", [])]
+        return cls(session_id, turns, raw.get("summary", ""), raw.get("last_active", 0.0), version)
+
+
+class SQLiteSessionBackend:
+    """Durable session rows so sessions survive restarts and are shared between worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_active REAL NOT NULL, version INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions (last_active)")
+        self.conn.commit()
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, session_id: str) -> Optional[Session]:
+        with self.lock:
+            row = self.conn.execute("SELECT data, version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return Session.from_json(session_id, row[0], row[1]) if row else None
+
+    def save(self, session: Session) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, last_active, version) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.to_json(), session.last_active, session.version),
+            )
+            self.conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self.conn.commit()
+
+    def purge_idle(self, cutoff: float) -> int:
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM sessions WHERE last_active < ?", (cutoff,))
+            self.conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class SessionStore:
+    """LRU of chat sessions with token-budgeted history.
+
+    Each session holds at most `window_tokens` of recent turns plus a summary
+    of at most `summary_tokens`; older turns are compacted once the window
+    overflows by `compact_tokens`, so summarization runs per batch rather than
+    per turn. Sessions idle longer than `idle_seconds` are dropped, and the
+    least recently used sessions are evicted from memory while there are more
+    than `max_sessions` or more than `max_total_tokens` held in total. With a
+    backend, every change is written through and evicted sessions reload on
+    their next request.
+    """
+
+    def __init__(
+        self,
+        window_tokens: int = DEFAULT_WINDOW_TOKENS,
+        summary_tokens: int = DEFAULT_SUMMARY_TOKENS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_total_tokens: int = DEFAULT_MAX_TOTAL_TOKENS,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        compact_tokens: Optional[int] = None,
+        summarizer: Summarizer = extractive_summary,
+        backend: Optional[SQLiteSessionBackend] = None,
+    ):
+        self.window_tokens = window_tokens
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self.max_total_tokens = max_total_tokens
+        self.idle_seconds = idle_seconds
+        self.compact_tokens = compact_tokens if compact_tokens is not None else window_tokens // 4
+        self.summarizer = summarizer
+        self.backend = backend
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.total_tokens = 0
+        self.lock = threading.Lock()
+        self.stats = {"evicted_lru": 0, "evicted_idle": 0, "compactions": 0}
+
+    def _get(self, session_id: str, now: float, create: bool = True) -> Optional[Session]:
+        session = self.sessions.get(session_id)
+        if self.backend is not None:
+            stored_version = self.backend.version(session_id)
+            if stored_version is None and session is not None and session.version:
+                # Written through before, so another worker cleared or purged it
+                self.total_tokens -= session.tokens
+                del self.sessions[session_id]
+                session = None
+            elif stored_version is not None and (session is None or session.version < stored_version):
+                if session is not None:
+                    self.total_tokens -= session.tokens
+                session = self.backend.load(session_id)
+                self.sessions[session_id] = session
+                self.total_tokens += session.tokens
+        if session is not None and now - session.last_active > self.idle_seconds:
+            self._drop(session_id)
+            self.stats["evicted_idle"] += 1
+            session = None
+        if session is None:
+            if not create:
+                return None
+            session = Session(session_id, last_active=now)
+            self.sessions[session_id] = session
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def _drop(self, session_id: str) -> None:
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.total_tokens -= session.tokens
+        if self.backend is not None:
+            self.backend.delete(session_id)
+
+    def _evict(self, now: float) -> None:
+        # The front of the LRU holds the least recently active sessions
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_active > self.idle_seconds:
+                self._drop(session_id)
+                self.stats["evicted_idle"] += 1
+            elif len(self.sessions) > self.max_sessions or self.total_tokens > self.max_total_tokens:
+                # Only leaves memory; with a backend the session reloads on its next request
+                self.sessions.pop(session_id)
+                self.total_tokens -= session.tokens
+                self.stats["evicted_lru"] += 1
+            else:
+                break
+
+    def _compact(self, session: Session) -> None:
+        window = sum(t[2] for t in session.turns)
+        if window <= self.window_tokens + self.compact_tokens:
+            return
+        overflow = []
+        while session.turns and window > self.window_tokens:
+            turn = session.turns.pop(0)
+            window -= turn[2]
+            overflow.append(turn)
+        session.summary = self.summarizer(session.summary, overflow, self.summary_tokens)
+        self.stats["compactions"] += 1
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        """Add a turn, compacting old turns and evicting sessions as needed."""
+        now = time.time()
+        content = truncate_to_tokens(content, self.window_tokens)
+        with self.lock:
+            session = self._get(session_id, now)
+            self.total_tokens -= session.tokens
+            session.turns.append((role, content, estimate_tokens(content)))
+            session.last_active = now
+            session.version += 1
+            self._compact(session)
+            self.total_tokens += session.tokens
+            if self.backend is not None:
+                self.backend.save(session)
+            self._evict(now)
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """Chat messages for a session: the summary (if any) followed by the rolling window.
+
+        Read-only for unknown ids: nothing is stored until the first append().
+        """
+        now = time.time()
+        with self.lock:
+            session = self._get(session_id, now, create=False)
+            if session is None:
+                return []
+            self._evict(now)  # a session loaded from the backend counts against the limits too
+            messages = []
+            if session.summary:
+                messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + session.summary})
+            messages.extend({"role": role, "content": content} for role, content, _ in session.turns)
+            return messages
+
+    def clear(self, session_id: str) -> None:
+        with self.lock:
+            self._drop(session_id)
+
+    def purge_idle(self) -> None:
+        """Drop idle sessions from memory and the backend (call periodically or let appends do it)."""
+        now = time.time()
+        with self.lock:
+            self._evict(now)
+            if self.backend is not None:
+                self.backend.purge_idle(now - self.idle_seconds)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"sessions": len(self.sessions), "total_tokens": self.total_tokens, **self.stats}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+
+def store_from_env() -> SessionStore:
+    """Build a SessionStore from CHATBOT_SESSION_* environment variables."""
+    db_path = get_env("CHATBOT_SESSION_DB")
+    return SessionStore(
+        window_tokens=int(get_env("CHATBOT_SESSION_WINDOW_TOKENS", DEFAULT_WINDOW_TOKENS)),
+        summary_tokens=int(get_env("CHATBOT_SESSION_SUMMARY_TOKENS", DEFAULT_SUMMARY_TOKENS)),
+        max_sessions=int(get_env("CHATBOT_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+        max_total_tokens=int(get_env("CHATBOT_SESSION_MEMORY_TOKENS", DEFAULT_MAX_TOTAL_TOKENS)),
+        idle_seconds=float(get_env("CHATBOT_SESSION_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+        backend=SQLiteSessionBackend(db_path) if db_path else None,
+    )
@@ -0,0 +1,18 @@
+"""
+Production entry point for the FAQ chatbot API.
+
+Run with gunicorn using threaded workers; each thread blocks on its own OpenAI
+call while the shared pooled client keeps connections warm:
+
+    gunicorn -c customer_service/gunicorn_conf.py customer_service.wsgi:app
+
+Per-process concurrency is capped by CHATBOT_MAX_CONCURRENCY (excess requests
+get 503 with Retry-After), each OpenAI call is bounded by CHATBOT_LLM_TIMEOUT,
+and /healthz answers without touching the LLM for load balancer checks.
+"""
+from customer_service.chatbot import app, get_index
+
+# Build the retrieval index before the first request (and before forking with --preload)
+get_index()
+
+__all__ = ["app"]
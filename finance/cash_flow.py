@@ -0,0 +1,236 @@
+"""
+Columnar cash flow and anomaly analysis for transaction exports.
+- Dates and amounts parsed once per column with pandas, not per row
+- Monthly inflow/outflow via a single groupby
+- Statistical anomalies per category: robust z-score (median/MAD) or z-score (mean/std),
+  over the whole history or a trailing rolling window
+- Chunked CSV mode with flat memory: mergeable per-month and per-category totals,
+  and rolling windows carried across chunk boundaries
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+UNKNOWN_MONTH = "Unknown"
+DEFAULT_CATEGORY = "Uncategorized"
+METHODS = ("mad", "zscore")
+DEFAULT_Z_THRESHOLD = 3.5
+MIN_HISTORY = 5  # transactions a category needs before it is scored
+MAD_SCALE = 1.4826  # MAD -> standard deviation for normal data
+MEAN_AD_SCALE = 1.2533  # mean absolute deviation -> standard deviation, used when MAD is 0
+
+
+@dataclass
+class CashFlowReport:
+    monthly: pd.DataFrame  # index month ('YYYY-MM' or 'Unknown'), columns inflow, outflow, net, count
+    anomalies: pd.DataFrame  # the flagged rows plus anomaly_score and anomaly_reason
+
+    def monthly_dict(self) -> Dict[str, Dict[str, float]]:
+        return {month: {"inflow": float(row.inflow), "outflow": float(row.outflow)} for month, row in self.monthly.iterrows()}
+
+
+def prepare(frame: pd.DataFrame, date_field: str = "Date", amount_field: str = "Amount", category_field: str = "Category") -> pd.DataFrame:
+    """Add parsed _date, _month, _amount and _category columns (one vectorized pass per column).
+
+    Unparseable dates fall into the 'Unknown' month; unparseable amounts become NaN and are ignored.
+    """
+    frame = frame.copy()
+    dates = pd.to_datetime(frame[date_field], format="%Y-%m-%d", errors="coerce") if date_field in frame else pd.Series(pd.NaT, index=frame.index)
+    raw = frame[amount_field] if amount_field in frame else pd.Series(np.nan, index=frame.index)
+    amounts = pd.to_numeric(raw, errors="coerce")
+    if pd.api.types.is_string_dtype(raw) or raw.dtype == object:
+        # Only rows that did not parse pay for the '$1,234.50' clean-up
+        missing = amounts.isna()
+        if missing.any():
+            cleaned = raw[missing].astype(str).str.replace(r"[$,\s]", "", regex=True)
+            amounts[missing] = pd.to_numeric(cleaned, errors="coerce")
+    # strftime per row is slow; format each distinct month once instead
+    keys = dates.dt.year * 100 + dates.dt.month
+    labels = {key: f"{int(key) // 100:04d}-{int(key) % 100:02d}" for key in keys.dropna().unique()}
+    frame["_date"] = dates
+    frame["_month"] = keys.map(labels).fillna(UNKNOWN_MONTH)
+    frame["_amount"] = amounts
+    if category_field in frame:
+        frame["_category"] = frame[category_field].fillna(DEFAULT_CATEGORY).astype(str).replace("", DEFAULT_CATEGORY)
+    else:
+        # Uncategorized exports: compare income with income and spending with spending
+        frame["_category"] = np.where(frame["_amount"] >= 0, "Inflow", "Outflow")
+    return frame
+
+
+def monthly_totals(frame: pd.DataFrame) -> pd.DataFrame:
+    """Inflow (sum of positive amounts), outflow (sum of negative amounts), net and count per month."""
+    amount = frame["_amount"]
+    parts = pd.DataFrame({
+        "month": frame["_month"],
+        "inflow": amount.clip(lower=0),
+        "outflow": amount.clip(upper=0),
+        "count": amount.notna().astype(int),
+    })
+    monthly = parts.groupby("month", sort=True)[["inflow", "outflow", "count"]].sum()
+    monthly["net"] = monthly["inflow"] + monthly["outflow"]
+    return monthly[["inflow", "outflow", "net", "count"]]
+
+
+def _merge_monthly(total: Optional[pd.DataFrame], part: pd.DataFrame) -> pd.DataFrame:
+    return part if total is None else total.add(part, fill_value=0)
+
+
+def _robust_spread(deviation: pd.Series, groups: pd.Series, window: Optional[int] = None) -> pd.Series:
+    """MAD of the deviations as a standard-deviation estimate, falling back to the mean absolute deviation when MAD is 0."""
+    by_group = deviation.abs().groupby(groups)
+    if window is None:
+        mad, mean_ad = by_group.transform("median"), by_group.transform("mean")
+    else:
+        rolling = by_group.rolling(window, min_periods=1)
+        mad = rolling.median().reset_index(level=0, drop=True).reindex(deviation.index)
+        mean_ad = rolling.mean().reset_index(level=0, drop=True).reindex(deviation.index)
+    mad, mean_ad = mad * MAD_SCALE, mean_ad * MEAN_AD_SCALE
+    return mad.where(mad > 0, mean_ad)
+
+
+def _to_scores(deviation: pd.Series, spread: pd.Series, count: pd.Series) -> pd.Series:
+    scores = deviation / spread.where(spread > 0)
+    # Any deviation from a perfectly constant history is an outlier
+    constant = (spread.fillna(0) == 0) & (deviation.abs() > 1e-9)
+    scores = scores.where(~constant, np.sign(deviation) * np.inf)
+    return scores.where(count >= MIN_HISTORY)
+
+
+def score(frame: pd.DataFrame, method: str = "mad", window: Optional[int] = None) -> pd.Series:
+    """Anomaly score per row: deviation from the category's centre in (robust) standard deviations.
+
+    Without `window` each category's whole history is the reference. With
+    `window`, the reference is the previous `window` transactions of the same
+    category in date order (the row itself excluded). Rows whose reference has
+    fewer than MIN_HISTORY amounts score NaN.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown anomaly method '{method}'. Use one of: {', '.join(METHODS)}.")
+    if window is None:
+        amount, groups = frame["_amount"], frame["_category"]
+        by_group = amount.groupby(groups)
+        count = by_group.transform("count")
+        if method == "mad":
+            deviation = amount - by_group.transform("median")
+            spread = _robust_spread(deviation, groups)
+        else:
+            deviation = amount - by_group.transform("mean")
+            spread = by_group.transform("std")
+        return _to_scores(deviation, spread, count)
+
+    ordered = frame.sort_values("_date", kind="stable")
+    amount, groups = ordered["_amount"], ordered["_category"]
+    history = amount.groupby(groups).shift(1)
+    rolling = history.groupby(groups).rolling(window, min_periods=1)
+
+    def per_row(series: pd.Series) -> pd.Series:
+        return series.reset_index(level=0, drop=True).reindex(ordered.index)
+
+    count = per_row(rolling.count())
+    if method == "mad":
+        center = per_row(rolling.median())
+        # Trailing spread: rolling MAD of past amounts around the running median
+        spread = _robust_spread(history - center, groups, window)
+    else:
+        center = per_row(rolling.mean())
+        spread = per_row(rolling.std())
+    return _to_scores(amount - center, spread, count).reindex(frame.index)
+
+
+def flag(frame: pd.DataFrame, scores: pd.Series, z_threshold: float = DEFAULT_Z_THRESHOLD, threshold: Optional[float] = None) -> pd.DataFrame:
+    """Rows with |score| >= z_threshold, or |amount| >= threshold when an absolute threshold is given."""
+    statistical = (scores.abs() >= z_threshold).fillna(False)
+    mask = statistical
+    if threshold is not None:
+        mask = mask | (frame["_amount"].abs() >= threshold)
+    flagged = frame[mask].copy()
+    flagged["anomaly_score"] = scores[mask]
+    flagged["anomaly_reason"] = np.where(statistical[mask], "statistical", "threshold")
+    return flagged
+
+
+def analyze(
+    frame: pd.DataFrame,
+    date_field: str = "Date",
+    amount_field: str = "Amount",
+    category_field: str = "Category",
+    method: str = "mad",
+    window: Optional[int] = None,
+    z_threshold: float = DEFAULT_Z_THRESHOLD,
+    threshold: Optional[float] = None,
+) -> CashFlowReport:
+    """Monthly totals and anomalies from one parse of an in-memory frame."""
+    prepared = prepare(frame, date_field, amount_field, category_field)
+    flagged = flag(prepared, score(prepared, method, window), z_threshold, threshold)
+    return CashFlowReport(monthly_totals(prepared), _public(flagged))
+
+
+def _public(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.drop(columns=["_date", "_month", "_amount", "_category"])
+
+
+def _read_chunks(path: str, chunksize: int, **read_options) -> Iterable[pd.DataFrame]:
+    return pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False, **read_options)
+
+
+def analyze_csv(
+    path: str,
+    chunksize: int = 100_000,
+    date_field: str = "Date",
+    amount_field: str = "Amount",
+    category_field: str = "Category",
+    method: str = "zscore",
+    window: Optional[int] = None,
+    z_threshold: float = DEFAULT_Z_THRESHOLD,
+    threshold: Optional[float] = None,
+) -> CashFlowReport:
+    """Chunked analyze() for CSVs larger than memory; only totals, carried windows and flagged rows are kept.
+
+    With `window`, one pass: each category's last `window` rows are carried
+    into the next chunk, so rows should be in date order across the file (as
+    bank exports are). Without `window`, two passes: the first accumulates
+    per-category count/sum/sum of squares, the second scores against those
+    totals. That global mode only supports method='zscore', because a median
+    cannot be merged across chunks.
+    """
+    if window is None and method != "zscore":
+        raise ValueError("Chunked analysis over the whole history needs method='zscore'; pass window=... to use 'mad'.")
+    monthly = None
+    flagged = []
+    if window is not None:
+        carry = None
+        for chunk in _read_chunks(path, chunksize):
+            prepared = prepare(chunk, date_field, amount_field, category_field)
+            monthly = _merge_monthly(monthly, monthly_totals(prepared))
+            prepared["_new"] = True
+            combined = prepared if carry is None else pd.concat([carry, prepared], ignore_index=True)
+            combined_scores = score(combined, method, window)
+            new = combined["_new"].to_numpy()
+            flagged.append(flag(combined[new], combined_scores[new], z_threshold, threshold).drop(columns="_new"))
+            ordered = combined.sort_values("_date", kind="stable")
+            carry = ordered.groupby("_category", sort=False).tail(window).assign(_new=False)
+    else:
+        stats = None
+        for chunk in _read_chunks(path, chunksize):
+            prepared = prepare(chunk, date_field, amount_field, category_field)
+            monthly = _merge_monthly(monthly, monthly_totals(prepared))
+            amount = prepared["_amount"]
+            part = pd.DataFrame({"n": amount.notna().astype(int), "s": amount, "ss": amount ** 2, "_category": prepared["_category"]})
+            part = part.groupby("_category")[["n", "s", "ss"]].sum()
+            stats = part if stats is None else stats.add(part, fill_value=0)
+        if stats is not None:
+            mean = stats["s"] / stats["n"]
+            std = np.sqrt(((stats["ss"] - stats["n"] * mean ** 2) / (stats["n"] - 1)).clip(lower=0))
+            for chunk in _read_chunks(path, chunksize):
+                prepared = prepare(chunk, date_field, amount_field, category_field)
+                groups = prepared["_category"]
+                deviation = prepared["_amount"] - groups.map(mean)
+                scores = _to_scores(deviation, groups.map(std), groups.map(stats["n"]))
+                flagged.append(flag(prepared, scores, z_threshold, threshold))
+    if monthly is None:
+        monthly = pd.DataFrame(columns=["inflow", "outflow", "net", "count"])
+    monthly["count"] = monthly["count"].astype(int)
+    anomalies = pd.concat(flagged, ignore_index=True) if flagged else pd.DataFrame()
+    return CashFlowReport(monthly.sort_index(), _public(anomalies) if len(anomalies.columns) else anomalies)
@@ -1,30 +1,30 @@
 """
 AI-powered Expense Tracker for Small Businesses
 - Reads CSV or PDF bank/credit card transactions
-- Categorizes expenses using OpenAI
-- Produces monthly cash flow summaries and highlights anomalies
+- Categorizes expenses using OpenAI, with learned per-merchant rules so each merchant is only sent once
+- Produces monthly cash flow summaries and flags statistical anomalies per category (columnar, optionally chunked)
 - Can export to QuickBooks/Xero CSV formats
+- pandas, the cash flow module, OpenAI and pdfplumber load on first use
 """
 import csv
-import os
-from datetime import datetime
 from typing import List, Dict, Optional
+from utils.config import get_env
+from utils.lazy_import import lazy_import
+from utils.llm_cache import cached_chat_completion
+from finance.merchant_rules import MerchantRules, normalize_description
 
-try:
-    import openai
-except ImportError:
-    openai = None
+pd = lazy_import("pandas")
+cash_flow = lazy_import("finance.cash_flow")
+openai = lazy_import("openai")
+pdfplumber = lazy_import("pdfplumber")
 
-try:
-    import pdfplumber
-except ImportError:
-    pdfplumber = None
+CATEGORIES = ["Office", "Marketing", "Supplies", "Travel", "Meals", "Utilities", "Rent", "Payroll", "Taxes", "Other"]
+DEFAULT_RULES_PATH = "merchant_rules.json"
 
 class ExpenseTracker:
-    def __init__(self, openai_api_key: Optional[str] = None):
-        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-        if openai and self.openai_api_key:
-            openai.api_key = self.openai_api_key
+    def __init__(self, openai_api_key: Optional[str] = None, rules_path: Optional[str] = None):
+        self.openai_api_key = openai_api_key or get_env("OPENAI_API_KEY")
+        self.rules = MerchantRules(rules_path or get_env("MERCHANT_RULES_PATH", DEFAULT_RULES_PATH))
 
     def read_csv(self, filepath: str) -> List[Dict]:
         with open(filepath, newline='', encoding='utf-8') as f:
@@ -41,52 +41,102 @@ class ExpenseTracker:
             return text
 
     def categorize_expenses(self, transactions: List[Dict]) -> List[Dict]:
-        if not openai:
-            raise ImportError("openai is required for AI categorization.")
+        """Categorize transactions, recording the path used in 'Category_Source'.
+
+        Descriptions are normalized to a merchant key and matched against the
+        learned exact rules ('rule_exact'), then explicit prefix rules
+        ('rule_prefix'). OpenAI is called once per merchant not seen before
+        ('llm'); valid answers are learned and persisted so later runs skip
+        the call entirely.
+        """
+        unseen: Dict[str, List[Dict]] = {}
         for tx in transactions:
             description = tx.get('Description') or tx.get('details') or ''
-            prompt = f"Categorize this expense: '{description}'. Categories: Office, Marketing, Supplies, Travel, Meals, Utilities, Rent, Payroll, Taxes, Other. Respond with only the category."
+            merchant = normalize_description(description)
+            category, source = self.rules.lookup(merchant)
+            if category:
+                tx['Category'] = category
+                tx['Category_Source'] = source
+            else:
+                unseen.setdefault(merchant or description, []).append(tx)
+        if unseen and not openai:
+            raise ImportError("openai is required for AI categorization.")
+        for merchant, txs in unseen.items():
+            description = txs[0].get('Description') or txs[0].get('details') or ''
+            prompt = f"Categorize this expense: '{description}'. Categories: {', '.join(CATEGORIES)}. Respond with only the category."
             try:
-                response = openai.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=10,
+                content = cached_chat_completion(
+                    "expense_tracker",
+                    "gpt-4o",
+                    [{"role": "user", "content": prompt}],
+                    10,
+                    api_key=self.openai_api_key,
                 )
-                category = response.choices[0].message.content.strip()
-                tx['Category'] = category
+                category = content.strip()
+                if category in CATEGORIES and normalize_description(description):
+                    self.rules.learn(merchant, category)
+                for tx in txs:
+                    tx['Category'] = category
+                    tx['Category_Source'] = 'llm'
             except Exception as e:
-                tx['Category'] = 'Uncategorized'
-                tx['AI_Error'] = str(e)
+                for tx in txs:
+                    tx['Category'] = 'Uncategorized'
+                    tx['Category_Source'] = 'error'
+                    tx['AI_Error'] = str(e)
+        if self.rules.dirty:
+            try:
+                self.rules.save()
+            except OSError as e:
+                print(f"[WARN] Could not save merchant rules: {e}")
         return transactions
 
     def monthly_cash_flow(self, transactions: List[Dict], date_field: str = 'Date', amount_field: str = 'Amount') -> Dict[str, Dict[str, float]]:
-        summary = {}
-        for tx in transactions:
-            date_str = tx.get(date_field)
-            amount = float(tx.get(amount_field, 0))
-            try:
-                month = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
-            except Exception:
-                month = 'Unknown'
-            if month not in summary:
-                summary[month] = {'inflow': 0.0, 'outflow': 0.0}
-            if amount >= 0:
-                summary[month]['inflow'] += amount
-            else:
-                summary[month]['outflow'] += amount
-        return summary
+        """Inflow/outflow per 'YYYY-MM' month ('Unknown' for unparseable dates), computed column-wise."""
+        frame = cash_flow.prepare(pd.DataFrame.from_records(transactions), date_field, amount_field)
+        return cash_flow.CashFlowReport(cash_flow.monthly_totals(frame), pd.DataFrame()).monthly_dict()
 
-    def detect_anomalies(self, transactions: List[Dict], threshold: float = 1000.0) -> List[Dict]:
+    def detect_anomalies(
+        self,
+        transactions: List[Dict],
+        threshold: Optional[float] = None,
+        method: str = "mad",
+        window: Optional[int] = None,
+        z_threshold: Optional[float] = None,
+        category_field: str = 'Category',
+    ) -> List[Dict]:
+        """Transactions that are outliers within their category (see finance/cash_flow.py).
+
+        Each category is scored by robust z-score ('mad') or z-score
+        ('zscore'), against its whole history or the previous `window`
+        transactions. `threshold` additionally flags any |amount| at or above
+        it. `z_threshold` defaults to cash_flow.DEFAULT_Z_THRESHOLD. Returns
+        copies of the flagged transactions with 'Anomaly_Score' and
+        'Anomaly_Reason' added; `transactions` is left unchanged.
+        """
+        if z_threshold is None:
+            z_threshold = cash_flow.DEFAULT_Z_THRESHOLD
+        frame = cash_flow.prepare(pd.DataFrame.from_records(transactions), category_field=category_field)
+        flagged = cash_flow.flag(frame, cash_flow.score(frame, method, window), z_threshold, threshold)
         anomalies = []
-        for tx in transactions:
-            try:
-                amount = abs(float(tx.get('Amount', 0)))
-                if amount >= threshold:
-                    anomalies.append(tx)
-            except Exception:
-                continue
+        for position, anomaly_score, reason in zip(flagged.index, flagged["anomaly_score"], flagged["anomaly_reason"]):
+            tx = dict(transactions[position])
+            tx['Anomaly_Score'] = None if pd.isna(anomaly_score) else round(float(anomaly_score), 2)
+            tx['Anomaly_Reason'] = reason
+            anomalies.append(tx)
         return anomalies
 
+    def cash_flow_report(self, source, chunksize: Optional[int] = None, **options) -> "cash_flow.CashFlowReport":
+        """Monthly totals and anomalies from one parse of a CSV path or list of transactions.
+
+        With `chunksize`, a CSV is streamed in chunks of that many rows so memory
+        stays flat on exports larger than RAM (see cash_flow.analyze_csv).
+        """
+        if isinstance(source, str):
+            if chunksize:
+                return cash_flow.analyze_csv(source, chunksize=chunksize, **options)
+            return cash_flow.analyze(pd.read_csv(source, dtype=str, keep_default_na=False), **options)
+        return cash_flow.analyze(pd.DataFrame.from_records(source), **options)
+
     def export_to_quickbooks_csv(self, transactions: List[Dict], filepath: str):
         fields = ['Date', 'Description', 'Amount', 'Category']
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
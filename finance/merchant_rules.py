@@ -0,0 +1,107 @@
+"""
+Merchant normalization and learned categorization rules for the Expense Tracker.
+- Normalizes bank descriptions (strips store numbers, dates, card suffixes, reference codes)
+- Exact and token-prefix trie lookups over normalized merchant names
+- Rules are learned from past AI answers (exact merchants only) or added as prefix rules, and persisted to JSON
+"""
+import os
+import re
+from typing import Dict, Optional, Tuple
+from utils.file_io import read_json, write_json
+
+DATE_PATTERN = re.compile(r"\b\d{1,4}[/-]\d{1,2}(?:[/-]\d{2,4})?\b")
+CARD_PATTERN = re.compile(r"\b(?:CARD|ACCT|ENDING IN|XX+|\*{2,})\s*\d{2,4}\b|(?:X{2,}|\*{2,})\d{2,4}")
+REFERENCE_PATTERN = re.compile(r"\*\s*[A-Z0-9]*\d[A-Z0-9]*")
+STORE_NUMBER_PATTERN = re.compile(r"(?:#|\bNO\.?|\bSTORE|\bSTR)\s*\d+\b|(?<!\S)[A-Z]{0,2}-?\d+(?!\S)")
+PUNCTUATION_PATTERN = re.compile(r"[^A-Z0-9&' -]+")
+LEADING_NOISE = {"POS", "PURCHASE", "DEBIT", "CREDIT", "CARD", "CHECKCARD", "ACH", "RECURRING", "SQ", "TST"}
+
+MIN_PREFIX_CHARS = 4
+
+
+def normalize_description(description: str) -> str:
+    """Reduce a raw bank description to a stable merchant key, e.g. 'SHELL OIL 1234 06/01' -> 'SHELL OIL'."""
+    text = (description or "").upper()
+    for pattern in (DATE_PATTERN, CARD_PATTERN, REFERENCE_PATTERN, STORE_NUMBER_PATTERN):
+        text = pattern.sub(" ", text)
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    tokens = [token.strip("-'") for token in text.split() if token.strip("-'")]
+    while len(tokens) > 1 and tokens[0] in LEADING_NOISE:
+        tokens.pop(0)
+    return " ".join(tokens)
+
+
+class MerchantRules:
+    """Exact and prefix-trie lookup table from normalized merchant to category."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.exact: Dict[str, str] = {}
+        self.prefix: Dict[str, str] = {}
+        self.trie: Dict[str, dict] = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        data = read_json(path)
+        for merchant, category in data.get("exact", {}).items():
+            self._add(merchant, category, exact=True)
+        for merchant, category in data.get("prefix", {}).items():
+            self._add(merchant, category, exact=False)
+        self.dirty = False
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        write_json(path, {"exact": self.exact, "prefix": self.prefix})
+        self.dirty = False
+
+    def _add(self, merchant: str, category: str, exact: bool) -> None:
+        self.dirty = True
+        if exact:
+            self.exact[merchant] = category
+            return
+        self.prefix[merchant] = category
+        node = self.trie
+        for token in merchant.split():
+            node = node.setdefault(token, {})
+        node[""] = category
+
+    def learn(self, merchant: str, category: str) -> None:
+        """Remember an answer for exactly this normalized merchant.
+
+        Not used as a prefix: 'AMAZON' being Supplies says nothing about 'AMAZON WEB SERVICES'.
+        """
+        if merchant and self.exact.get(merchant) != category:
+            self._add(merchant, category, exact=True)
+
+    def add_prefix_rule(self, prefix: str, category: str) -> None:
+        """Add a rule matching every merchant whose normalized name starts with `prefix`."""
+        prefix = normalize_description(prefix)
+        if prefix:
+            self._add(prefix, category, exact=False)
+
+    def lookup(self, merchant: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (category, source) where source is 'rule_exact', 'rule_prefix' or None."""
+        if not merchant:
+            return None, None
+        if merchant in self.exact:
+            return self.exact[merchant], "rule_exact"
+        node = self.trie
+        best = None
+        matched = []
+        for token in merchant.split():
+            node = node.get(token)
+            if node is None:
+                break
+            matched.append(token)
+            if "" in node and len(" ".join(matched)) >= MIN_PREFIX_CHARS:
+                best = node[""]
+        if best is not None:
+            return best, "rule_prefix"
+        return None, None
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.prefix)
@@ -3,16 +3,14 @@ Marketing Email Generator using OpenAI
 - Generates subject, plain text, and HTML email body
 - Inputs: business_type, offer_description, tone
 - Saves .txt and .html files
+- Structured outputs (JSON schema) with one repair call for unparseable replies
 - Robust error handling and debug logging for OpenAI API calls
 """
-import openai
-from typing import Tuple
-from utils.config import OPENAI_API_KEY
+from typing import List, Optional, Tuple
+from utils.structured_output import OutputSchema, structured_completion
 import csv
 import os
 
-openai.api_key = OPENAI_API_KEY
-
 EMAIL_PROMPT = (
     "You are a marketing email assistant. "
     "Given a business type, offer description, and tone, generate: "
@@ -21,32 +19,12 @@ EMAIL_PROMPT = (
     "3. An HTML email body. "
     "Respond in JSON: {\"subject\": <subject>, \"plain\": <plain>, \"html\": <html>}"
 )
-
-def extract_json_from_response(response_content: str):
-    """Extract JSON object from OpenAI response, stripping markdown/code block if present. No regex. Robust to malformed output."""
-    import json
-    content = response_content.strip()
-    # Remove code block markers if present
-    if content.startswith('```json'):
-        content = content[len('```json'):].strip()
-    if content.startswith('```'):
-        content = content[len('```'):].strip()
-    if content.endswith('```'):
-        content = content[:-3].strip()
-    # Find the first '{' and last '}'
-    start = content.find('{')
-    end = content.rfind('}')
-    if start != -1 and end != -1 and end > start:
-        content = content[start:end+1]
-    # Defensive: truncate at last closing brace if extra text follows
-    if content.count('{') > 0 and content.count('}') > 0:
-        last_brace = content.rfind('}')
-        content = content[:last_brace+1]
-    try:
-        return json.loads(content)
-    except Exception:
-        # Fallback: return minimal valid structure
-        return {"subject": "", "plain": "", "html": ""}
+EMAIL_OUTPUT = OutputSchema("marketing_email", {
+    "type": "object",
+    "properties": {"subject": {"type": "string"}, "plain": {"type": "string"}, "html": {"type": "string"}},
+    "required": ["subject", "plain", "html"],
+    "additionalProperties": False,
+})
 
 def generate_email(business_type: str, offer_description: str, tone: str) -> Tuple[str, str, str]:
     """Generate subject, plain text, and HTML email using OpenAI. Logs errors and raw responses for debugging."""
@@ -60,16 +38,11 @@ def generate_email(business_type: str, offer_description: str, tone: str) -> Tup
         {"role": "user", "content": prompt}
     ]
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=500
-        )
-        raw_content = response.choices[0].message.content
-        print("[DEBUG] OpenAI raw response:", raw_content)
-        result = extract_json_from_response(raw_content)
-        if not result["subject"] or not result["plain"] or not result["html"]:
-            print("[ERROR] OpenAI response missing expected fields:", result)
+        parsed = structured_completion("email_generator", "gpt-4o", messages, EMAIL_OUTPUT, 500)
+        print("[DEBUG] OpenAI parsed response:", parsed.values)
+        result = parsed.value if parsed.ok else {"subject": "", "plain": "", "html": ""}
+        if not parsed.ok or not result["subject"] or not result["plain"] or not result["html"]:
+            print("[ERROR] OpenAI response missing expected fields:", parsed.error or result)
         return result["subject"], result["plain"], result["html"]
     except Exception as e:
         print(f"[ERROR] OpenAI API call failed: {e}")
@@ -91,7 +64,7 @@ def load_promotions(filepath: str = "data/sample_promotions.csv") -> list:
     except Exception:
         return []
 
-def main():
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Marketing Email Generator")
     parser.add_argument("--business_type", required=True, type=str, help="Type of business")
@@ -99,7 +72,7 @@ def main():
     parser.add_argument("--tone", required=True, type=str, help="Email tone (e.g., friendly, formal)")
     parser.add_argument("--promotion", action="store_true", help="Use a current promotion from sample_promotions.csv")
     parser.add_argument("--out_dir", type=str, default="generated_emails", help="Output directory")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     offer_description = args.offer_description
     if args.promotion:
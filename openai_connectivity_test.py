@@ -2,15 +2,12 @@
 Minimal OpenAI GPT-4o connectivity and key test.
 Run this script to verify your API key, network, and model access.
 """
-import openai
-import os
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from utils.openai_client import chat_completion
 
 try:
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": "Say hello"}],
+    response = chat_completion(
+        "gpt-4o",
+        [{"role": "user", "content": "Say hello"}],
         max_tokens=10
     )
     print("[SUCCESS] OpenAI GPT-4o response:")
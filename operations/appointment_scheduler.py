@@ -5,15 +5,13 @@ Appointment Scheduler for Small Business
 - Uses OpenAI to format human-friendly responses
 - Exports .ics calendar invites
 - Robust to malformed bookings and flexible slot logic
+- Bookings are indexed per date as merged intervals; free slots come from a sweep over gaps
 """
-import openai
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-from utils.config import OPENAI_API_KEY
+from typing import List, Dict, Optional, Tuple, Union
 from utils.file_io import read_csv, read_json
-from ics import Calendar, Event
-
-openai.api_key = OPENAI_API_KEY
+from utils.llm_cache import cached_chat_completion
+from utils.time_slots import format_hhmm, free_windows, merge_intervals, parse_hhmm
 
 def load_bookings(path: str) -> List[Dict[str, str]]:
     """Load bookings from CSV or JSON."""
@@ -24,37 +22,65 @@ def load_bookings(path: str) -> List[Dict[str, str]]:
     else:
         raise ValueError("Unsupported file type for bookings.")
 
+class BookingIndex:
+    """Bookings grouped by date, parsed once per date into merged, sorted (start, end) minute intervals.
+
+    Build it once and pass it to get_available_slots() in place of the
+    bookings list to reuse the parsed intervals across queries.
+    """
+
+    def __init__(self, bookings: List[Dict[str, str]]):
+        self._raw: Dict[str, List[Dict[str, str]]] = {}
+        for b in bookings:
+            self._raw.setdefault(b['date'], []).append(b)
+        self._parsed: Dict[str, Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]] = {}
+
+    def intervals(self, date: str) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Return (merged intervals, degenerate bookings) for a 'YYYY-MM-DD' date.
+
+        Degenerate bookings (end <= start) cannot be merged as intervals and are
+        checked per slot with the original overlap test.
+        """
+        if date not in self._parsed:
+            spans = []
+            degenerate = []
+            for b in self._raw.get(date, []):
+                b_start, b_end = parse_hhmm(b['start_time']), parse_hhmm(b['end_time'])
+                (spans if b_start < b_end else degenerate).append((b_start, b_end))
+            self._parsed[date] = (merge_intervals(spans), degenerate)
+        return self._parsed[date]
+
 def get_available_slots(
     working_hours: Tuple[str, str],
-    bookings: List[Dict[str, str]],
+    bookings: Union[List[Dict[str, str]], BookingIndex],
     slot_minutes: int = 30,
     days_ahead: int = 7,
     start_date: str = None
 ) -> List[Tuple[str, str, str]]:
-    """Suggest available slots for the next 7 days. Optionally specify start_date as 'YYYY-MM-DD'."""
+    """Suggest available slots for the next 7 days. Optionally specify start_date as 'YYYY-MM-DD'.
+
+    Slots are laid on a grid from the start of working hours. Free slots come
+    from a sweep over the gaps between each day's merged bookings, so cost is
+    proportional to bookings on the requested days plus slots returned.
+    """
     if start_date:
         today = datetime.strptime(start_date, "%Y-%m-%d").date()
     else:
         today = datetime.now().date()
-    start_hour, end_hour = [datetime.strptime(h, "%H:%M").time() for h in working_hours]
+    day_start, day_end = [parse_hhmm(h) for h in working_hours]
+    index = bookings if isinstance(bookings, BookingIndex) else BookingIndex(bookings)
     slots = []
     for day in range(days_ahead):
-        date = today + timedelta(days=day)
-        current = datetime.combine(date, start_hour)
-        end = datetime.combine(date, end_hour)
-        while current + timedelta(minutes=slot_minutes) <= end:
-            slot_start = current.time()
-            slot_end = (current + timedelta(minutes=slot_minutes)).time()
-            overlaps = []
-            for b in bookings:
-                if b['date'] == str(date):
-                    b_start = datetime.strptime(b['start_time'], "%H:%M").time()
-                    b_end = datetime.strptime(b['end_time'], "%H:%M").time()
-                    overlap = (slot_start < b_end) and (slot_end > b_start)
-                    overlaps.append(overlap)
-            if not any(overlaps):
-                slots.append((str(date), slot_start.strftime("%H:%M"), slot_end.strftime("%H:%M")))
-            current += timedelta(minutes=slot_minutes)
+        date = str(today + timedelta(days=day))
+        merged, degenerate = index.intervals(date)
+        for w_start, w_end in free_windows(merged, day_start, day_end):
+            offset = (w_start - day_start) % slot_minutes
+            current = w_start if offset == 0 else w_start + slot_minutes - offset
+            while current + slot_minutes <= w_end:
+                slot_end = current + slot_minutes
+                if not any(current < b_end and slot_end > b_start for b_start, b_end in degenerate):
+                    slots.append((date, format_hhmm(current), format_hhmm(slot_end)))
+                current += slot_minutes
     return slots
 
 def format_slots_human(slots: List[Tuple[str, str, str]]) -> str:
@@ -65,15 +91,12 @@ def format_slots_human(slots: List[Tuple[str, str, str]]) -> str:
         {"role": "system", "content": "You are a helpful assistant."},
         {"role": "user", "content": prompt}
     ]
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        max_tokens=200
-    )
-    return response.choices[0].message.content.strip()
+    content = cached_chat_completion("appointment_scheduler", "gpt-4o", messages, 200)
+    return content.strip()
 
 def export_ics(slots: List[Tuple[str, str, str]], out_path: str) -> None:
     """Export available slots as .ics calendar invites."""
+    from ics import Calendar, Event
     cal = Calendar()
     for d, s, e in slots:
         event = Event()
@@ -84,13 +107,13 @@ def export_ics(slots: List[Tuple[str, str, str]], out_path: str) -> None:
     with open(out_path, 'w', encoding='utf-8') as f:
         f.writelines(cal)
 
-def main():
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Appointment Scheduler")
     parser.add_argument("--working_hours", type=str, default="09:00-17:00", help="Working hours (e.g., 09:00-17:00)")
     parser.add_argument("--bookings", type=str, default="data/sample_bookings.csv", help="Bookings CSV or JSON file")
     parser.add_argument("--ics", type=str, help="Export available slots to .ics file")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     wh = tuple(args.working_hours.split("-"))
     bookings = load_bookings(args.bookings)
     slots = get_available_slots(wh, bookings)
@@ -0,0 +1,77 @@
+"""
+Fingerprint manifest for incremental invoice processing.
+- JSONL file with one entry per invoice: path, size, mtime, SHA-256 and extracted fields
+- Unchanged files (same size and mtime, or same content hash) reuse their cached fields
+- Entries are appended as invoices complete and compacted at the end of a run
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional
+from utils.file_io import iter_jsonl
+
+
+def file_sha256(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InvoiceManifest:
+    """Append-only JSONL manifest keyed on absolute file path (last entry wins)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            # Malformed lines (e.g. a write cut short by a crash) are skipped
+            for entry in iter_jsonl(path, errors="coerce"):
+                try:
+                    self.entries[entry["path"]] = entry
+                except (KeyError, TypeError):
+                    continue
+
+    def lookup(self, filepath: str) -> Optional[Dict[str, str]]:
+        """Return cached fields if the file is unchanged since it was recorded, else None."""
+        key = os.path.abspath(filepath)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stat = os.stat(filepath)
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return dict(entry["fields"])
+        if entry["size"] == stat.st_size and entry["sha256"] == file_sha256(filepath):
+            # Touched but identical content: refresh the stat so the next run skips hashing
+            self._append({**entry, "mtime_ns": stat.st_mtime_ns})
+            return dict(entry["fields"])
+        return None
+
+    def record(self, filepath: str, fields: Dict[str, str]) -> None:
+        """Fingerprint a processed file and append its extracted fields."""
+        stat = os.stat(filepath)
+        self._append({
+            "path": os.path.abspath(filepath),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(filepath),
+            "fields": {k: v for k, v in fields.items() if k != "filename"},
+        })
+
+    def _append(self, entry: Dict) -> None:
+        self.entries[entry["path"]] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def compact(self, keep_paths: Optional[Iterable[str]] = None) -> None:
+        """Rewrite the manifest with one entry per file, dropping files no longer present."""
+        if keep_paths is not None:
+            keep = {os.path.abspath(p) for p in keep_paths}
+            self.entries = {k: v for k, v in self.entries.items() if k in keep}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
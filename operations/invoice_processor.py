@@ -1,14 +1,32 @@
 """
 Invoice Processor using OCR (pytesseract) for images and PDFs in data/invoices/
 Extracts Vendor, Date, Total Amount and writes output to structured CSV.
+- Parallel OCR across files and PDF pages with a process pool
+- PDF pages are rasterized one at a time to keep memory bounded
+- Rows are written to the CSV incrementally as invoices complete
+- Incremental reruns: a fingerprint manifest skips files already processed
+- Born-digital PDF pages use the embedded text layer; OCR only runs on pages without one
 - Robust to malformed input and missing fields
+- OCR and PDF libraries load on first use, so --help and manifest-only runs start fast
 """
-import pytesseract
-from pdf2image import convert_from_path
 import os
 import re
-from typing import Dict
-from utils.file_io import write_csv
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from operations.invoice_manifest import InvoiceManifest
+from utils.file_io import CsvAppender
+from utils.lazy_import import lazy_import
+
+pytesseract = lazy_import("pytesseract")
+pdf2image = lazy_import("pdf2image")
+pdfplumber = lazy_import("pdfplumber")
+
+def convert_from_path(*args, **kwargs):
+    return pdf2image.convert_from_path(*args, **kwargs)
+
+def pdfinfo_from_path(*args, **kwargs):
+    return pdf2image.pdfinfo_from_path(*args, **kwargs)
 
 def extract_fields(text: str) -> Dict[str, str]:
     """Extract vendor, date, and total amount from invoice text using robust line-by-line parsing. Preserves original formatting."""
@@ -34,46 +52,261 @@ def extract_fields(text: str) -> Dict[str, str]:
                 fields["total_amount"] = value
     return fields
 
-def process_invoice_file(filepath: str) -> Dict[str, str]:
-    """Process a single invoice file (image, PDF, or text)."""
+INVOICE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf", ".txt")
+FIELDNAMES = ["filename", "vendor", "date", "total_amount", "method"]
+MIN_TEXT_LAYER_CHARS = 20
+
+def pdf_page_count(filepath: str) -> int:
+    """Return the number of pages in a PDF without rasterizing it."""
+    try:
+        return int(pdfinfo_from_path(filepath)["Pages"])
+    except Exception:
+        if not pdfplumber:
+            raise
+        with pdfplumber.open(filepath) as pdf:
+            return len(pdf.pages)
+
+def ocr_page(filepath: str, page: Optional[int] = None) -> str:
+    """OCR one unit of work: a whole image/text file, or a single 1-based PDF page.
+
+    PDF pages are rasterized one at a time (first_page/last_page) so memory
+    stays bounded to a single page image per worker.
+    """
     ext = os.path.splitext(filepath)[1].lower()
-    text = ""
     if ext in [".png", ".jpg", ".jpeg"]:
-        text = pytesseract.image_to_string(filepath)
+        return pytesseract.image_to_string(filepath)
     elif ext == ".pdf":
-        images = convert_from_path(filepath)
-        for img in images:
+        text = ""
+        for img in convert_from_path(filepath, first_page=page, last_page=page):
             text += pytesseract.image_to_string(img)
+        return text
     elif ext == ".txt":
         with open(filepath, "r", encoding="utf-8") as f:
-            text = f.read()
+            return f.read()
     else:
         raise ValueError(f"Unsupported file type: {ext}")
-    return extract_fields(text)
 
-def process_invoices(input_dir: str, output_csv: str) -> None:
-    """Process all invoice files in a directory and write results to CSV."""
-    results = []
-    for fname in os.listdir(input_dir):
-        if fname.lower().endswith((".png", ".jpg", ".jpeg", ".pdf", ".txt")):
-            fpath = os.path.join(input_dir, fname)
-            fields = process_invoice_file(fpath)
-            fields["filename"] = fname
-            results.append(fields)
-    if results:
-        fieldnames = ["filename", "vendor", "date", "total_amount"]
-        write_csv(output_csv, results, fieldnames)
-        print(f"Processed {len(results)} invoices. Results saved to {output_csv}")
-    else:
+def is_usable_text(text: Optional[str]) -> bool:
+    """Heuristic check that an embedded text layer is real text rather than empty or garbage."""
+    if not text:
+        return False
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_LAYER_CHARS or "(cid:" in stripped:
+        return False
+    printable = sum(1 for c in stripped if c.isprintable() or c.isspace())
+    alnum = sum(1 for c in stripped if c.isalnum())
+    return printable / len(stripped) >= 0.95 and alnum / len(stripped) >= 0.5
+
+def pdf_text_layer(filepath: str, page: int) -> Optional[str]:
+    """Return the embedded text of a 1-based PDF page, or None if missing or unusable."""
+    if not pdfplumber:
+        return None
+    try:
+        with pdfplumber.open(filepath, pages=[page]) as pdf:
+            text = pdf.pages[0].extract_text() if pdf.pages else None
+    except Exception:
+        return None
+    return text if is_usable_text(text) else None
+
+def read_page(filepath: str, page: Optional[int] = None, text_layer: bool = True) -> Tuple[str, str]:
+    """Return (text, method) for one unit of work, where method is 'text' or 'ocr'.
+
+    PDF pages try the embedded text layer first and fall back to OCR only
+    when it is empty or garbage. Text files are read directly.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".txt":
+        return ocr_page(filepath, page), "text"
+    if ext == ".pdf" and text_layer:
+        text = pdf_text_layer(filepath, page)
+        if text is not None:
+            return text + "\n", "text"
+    return ocr_page(filepath, page), "ocr"
+
+def combine_methods(methods) -> str:
+    """Collapse per-page methods into one row tag: 'text', 'ocr' or 'mixed'."""
+    unique = set(methods)
+    return unique.pop() if len(unique) == 1 else "mixed"
+
+def file_tasks(filepath: str) -> List[Tuple[str, Optional[int]]]:
+    """Split a file into (filepath, page) OCR tasks; page is None for single-unit files."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".pdf":
+        return [(filepath, page) for page in range(1, pdf_page_count(filepath) + 1)]
+    if ext not in [".png", ".jpg", ".jpeg", ".txt"]:
+        raise ValueError(f"Unsupported file type: {ext}")
+    return [(filepath, None)]
+
+def process_invoice_file(filepath: str, text_layer: bool = True) -> Dict[str, str]:
+    """Process a single invoice file (image, PDF, or text)."""
+    pages = [read_page(path, page, text_layer) for path, page in file_tasks(filepath)]
+    fields = extract_fields("".join(text for text, _ in pages))
+    fields["method"] = combine_methods(method for _, method in pages)
+    return fields
+
+class _InlineExecutor:
+    """Executor stand-in that runs tasks in the calling process (workers=1)."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+def default_manifest_path(output_csv: str) -> str:
+    """Manifest stored next to the output CSV, e.g. invoices_processed.manifest.jsonl."""
+    return os.path.splitext(output_csv)[0] + ".manifest.jsonl"
+
+def process_invoices(
+    input_dir: str,
+    output_csv: str,
+    workers: Optional[int] = None,
+    max_pages_in_flight: Optional[int] = None,
+    manifest_path: Optional[str] = None,
+    incremental: bool = True,
+    force: bool = False,
+    since: Optional[datetime] = None,
+    text_layer: bool = True
+) -> None:
+    """Process all invoice files in a directory and write results to CSV.
+
+    Files and PDF pages are OCR'd in parallel on a process pool of `workers`
+    processes (default: CPU count). At most `max_pages_in_flight` pages are
+    queued at once (default: 2 x workers), which bounds memory. Each invoice
+    row is appended to the CSV as soon as all of its pages are done.
+
+    With `incremental`, a manifest (default: next to `output_csv`) records each
+    file's size, mtime, content hash and extracted fields. Unchanged files reuse
+    their cached row and only new or changed files are OCR'd. `force`
+    reprocesses everything; `since` reprocesses files modified on or after it.
+
+    PDF pages with a usable embedded text layer skip OCR unless `text_layer`
+    is False. Each row's `method` column is 'text', 'ocr' or 'mixed'.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pages_in_flight = max(1, max_pages_in_flight or 2 * workers)
+    fnames = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(INVOICE_EXTENSIONS))
+    if not fnames:
         print("No invoice files found.")
+        return
+    manifest = InvoiceManifest(manifest_path or default_manifest_path(output_csv)) if incremental else None
+    pending: Dict[str, Dict] = {}
+    to_process = []
+    cached_rows = []
+    for fname in fnames:
+        fpath = os.path.join(input_dir, fname)
+        fields = None
+        if manifest and not force:
+            if since is None or datetime.fromtimestamp(os.path.getmtime(fpath)) < since:
+                fields = manifest.lookup(fpath)
+        if fields is None:
+            to_process.append(fname)
+        else:
+            fields["filename"] = fname
+            cached_rows.append(fields)
+
+    def tasks():
+        nonlocal failed
+        for fname in to_process:
+            fpath = os.path.join(input_dir, fname)
+            try:
+                units = file_tasks(fpath)
+            except Exception as e:
+                print(f"[ERROR] Could not read {fname}: {e}")
+                failed += 1
+                continue
+            if not units:
+                # No page would ever complete it, so it must fail here rather than stay pending
+                print(f"[ERROR] {fname} has no pages.")
+                failed += 1
+                continue
+            pending[fname] = {"remaining": len(units), "pages": {}, "failed": False}
+            for index, (path, page) in enumerate(units):
+                yield fname, index, path, page
+
+    failed = 0
+    # Flushed per row so a crash mid-run keeps every finished invoice
+    out = CsvAppender(output_csv, FIELDNAMES, mode="w", flush_every=1)
+    emit = out.write
+
+    for fields in cached_rows:
+        emit(fields)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else _InlineExecutor()
+    try:
+        task_iter = tasks()
+        in_flight = {}
+        while True:
+            for fname, index, path, page in task_iter:
+                in_flight[executor.submit(read_page, path, page, text_layer)] = (fname, index)
+                if len(in_flight) >= max_pages_in_flight:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                fname, index = in_flight.pop(future)
+                state = pending[fname]
+                try:
+                    state["pages"][index] = future.result()
+                except Exception as e:
+                    if not state["failed"]:
+                        print(f"[ERROR] OCR failed for {fname}: {e}")
+                    state["failed"] = True
+                state["remaining"] -= 1
+                if state["remaining"]:
+                    continue
+                del pending[fname]
+                if state["failed"]:
+                    failed += 1
+                    continue
+                pages = [state["pages"][i] for i in sorted(state["pages"])]
+                fields = extract_fields("".join(text for text, _ in pages))
+                fields["method"] = combine_methods(method for _, method in pages)
+                if manifest:
+                    manifest.record(os.path.join(input_dir, fname), fields)
+                fields["filename"] = fname
+                emit(fields)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        out.close()
+        if manifest:
+            manifest.compact(os.path.join(input_dir, f) for f in fnames)
+    written = out.rows_written
+    if written:
+        print(f"Processed {written} invoices ({written - len(cached_rows)} new, {len(cached_rows)} cached). Results saved to {output_csv}")
+    if failed:
+        print(f"[WARN] {failed} invoices failed and were skipped.")
 
-def main():
+def main(argv: Optional[List[str]] = None):
     import argparse
     parser = argparse.ArgumentParser(description="Invoice Processor")
     parser.add_argument("--input_dir", type=str, default="data/invoices", help="Directory with invoice files")
     parser.add_argument("--output_csv", type=str, default="invoices_processed.csv", help="Output CSV file")
-    args = parser.parse_args()
-    process_invoices(args.input_dir, args.output_csv)
+    parser.add_argument("--workers", type=int, help="OCR worker processes (default: CPU count)")
+    parser.add_argument("--max-pages-in-flight", dest="max_pages_in_flight", type=int, help="Max pages queued for OCR at once (default: 2 x workers)")
+    parser.add_argument("--manifest", type=str, help="Fingerprint manifest path (default: next to --output_csv)")
+    parser.add_argument("--no-manifest", dest="no_manifest", action="store_true", help="Disable incremental processing")
+    parser.add_argument("--force", action="store_true", help="Reprocess every file, ignoring the manifest")
+    parser.add_argument("--since", type=str, help="Reprocess files modified on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--no-text-layer", dest="no_text_layer", action="store_true", help="Always OCR PDFs, ignoring embedded text")
+    args = parser.parse_args(argv)
+    since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+    process_invoices(
+        args.input_dir,
+        args.output_csv,
+        workers=args.workers,
+        max_pages_in_flight=args.max_pages_in_flight,
+        manifest_path=args.manifest,
+        incremental=not args.no_manifest,
+        force=args.force,
+        since=since,
+        text_layer=not args.no_text_layer
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+"""
+Multi-resource Scheduling Engine for Small Business
+- Staff members and rooms at multiple locations, each with their own opening hours
+- Holiday closures and special hours (data/sample_holidays.csv)
+- Variable service durations and buffers between appointments
+- Bookings indexed by resource and date as merged intervals
+- "First N free slots for service S across any qualified resource" and bulk availability
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime, timedelta
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from utils.file_io import iter_csv, read_csv
+from utils.time_slots import format_hhmm, free_windows, merge_intervals, parse_hhmm, parse_hours_spec, parse_time_range
+
+Hours = Dict[int, List[Tuple[int, int]]]
+
+
+@dataclass(frozen=True)
+class Service:
+    name: str
+    duration_minutes: int
+    buffer_minutes: int = 0
+
+
+@dataclass
+class Resource:
+    resource_id: str
+    kind: str = "staff"
+    location: str = ""
+    services: FrozenSet[str] = frozenset()
+    hours: Hours = field(default_factory=dict)
+
+    def can_perform(self, service: str) -> bool:
+        """A resource with no listed services is qualified for every service."""
+        return not self.services or service in self.services
+
+
+def load_location_hours(path: str = "data/sample_locations.csv") -> Dict[str, Hours]:
+    """Map each location to its weekly opening hours."""
+    return {row["location"]: parse_hours_spec(row["hours"]) for row in read_csv(path)}
+
+
+def load_services(path: str = "data/sample_services.csv") -> List[Service]:
+    return [
+        Service(row["service"], int(row["duration_minutes"]), int(row.get("buffer_minutes") or 0))
+        for row in read_csv(path)
+    ]
+
+
+def load_resources(path: str = "data/sample_resources.csv", location_hours: Optional[Dict[str, Hours]] = None) -> List[Resource]:
+    """Load resources; a blank `hours` column falls back to the resource's location hours."""
+    location_hours = location_hours or {}
+    resources = []
+    for row in read_csv(path):
+        spec = (row.get("hours") or "").strip()
+        hours = parse_hours_spec(spec) if spec else location_hours.get(row.get("location", ""), {})
+        services = frozenset(s.strip() for s in (row.get("services") or "").split("|") if s.strip())
+        resources.append(Resource(row["resource_id"], row.get("kind") or "staff", row.get("location", ""), services, hours))
+    return resources
+
+
+class SchedulingEngine:
+    """Availability index over many resources.
+
+    Bookings are stored per resource and date as merged, sorted minute
+    intervals, so a free-slot query only touches the bookings of the
+    resources and days it asks about.
+    """
+
+    def __init__(self, resources: List[Resource], services: List[Service], holidays: Optional[List[Dict[str, str]]] = None, step_minutes: int = 15):
+        self.resources = {r.resource_id: r for r in resources}
+        self.services = {s.name: s for s in services}
+        self.step_minutes = step_minutes
+        self.busy: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+        self.closures: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+        self._qualified: Dict[str, List[Resource]] = {}
+        for h in holidays or []:
+            self.add_holiday(h["date"], h.get("is_open", "No"), h.get("special_hours", ""), h.get("location", ""))
+
+    def add_holiday(self, date: str, is_open: str = "No", special_hours: str = "", location: str = "") -> None:
+        """Close a date (or restrict it to special hours) for one location, or all when location is blank."""
+        window = parse_time_range(special_hours) if is_open.strip().lower() == "yes" and special_hours else None
+        if is_open.strip().lower() == "yes" and window is None:
+            return
+        self.closures[(location or "*", date)] = window
+
+    def add_booking(self, resource_id: str, date: str, start_time: str, end_time: str) -> None:
+        start, end = parse_hhmm(start_time), parse_hhmm(end_time)
+        if end <= start:
+            raise ValueError(f"Booking must end after it starts: {start_time}-{end_time}")
+        day = self.busy.setdefault(resource_id, {})
+        day[date] = merge_intervals(day.get(date, []) + [(start, end)])
+
+    def load_bookings(self, bookings: Iterable[Dict[str, str]]) -> int:
+        """Add bookings with resource_id/date/start_time/end_time; returns how many malformed rows were skipped."""
+        skipped = 0
+        for b in bookings:
+            try:
+                self.add_booking(b["resource_id"], b["date"], b["start_time"], b["end_time"])
+            except (KeyError, ValueError, AttributeError):
+                skipped += 1
+        return skipped
+
+    def qualified_resources(self, service: str, location: Optional[str] = None) -> List[Resource]:
+        if service not in self._qualified:
+            self._qualified[service] = [r for r in self.resources.values() if r.can_perform(service)]
+        resources = self._qualified[service]
+        return [r for r in resources if r.location == location] if location else resources
+
+    def opening_windows(self, resource: Resource, day: Date) -> List[Tuple[int, int]]:
+        """Opening hours for a resource on a date after holiday closures and special hours."""
+        windows = resource.hours.get(day.weekday(), [])
+        date = str(day)
+        for key in ((resource.location, date), ("*", date)):
+            if key in self.closures:
+                special = self.closures[key]
+                if special is None:
+                    return []
+                windows = [(max(s, special[0]), min(e, special[1])) for s, e in windows if min(e, special[1]) > max(s, special[0])]
+        return windows
+
+    def iter_free_slots(self, resource: Resource, day: Date, service: Service) -> Iterator[int]:
+        """Yield start minutes (ascending) where `service` fits on `resource`, honoring buffers."""
+        windows = self.opening_windows(resource, day)
+        if not windows:
+            return
+        buffer = service.buffer_minutes
+        busy = self.busy.get(resource.resource_id, {}).get(str(day), [])
+        if buffer and busy:
+            busy = merge_intervals([(s - buffer, e + buffer) for s, e in busy])
+        step = self.step_minutes
+        for open_start, open_end in windows:
+            for w_start, w_end in free_windows(busy, open_start, open_end):
+                offset = (w_start - open_start) % step
+                current = w_start if offset == 0 else w_start + step - offset
+                while current + service.duration_minutes <= w_end:
+                    yield current
+                    current += step
+
+    def _tagged_slots(self, resource: Resource, day: Date, service: Service) -> Iterator[Tuple[int, str]]:
+        for start in self.iter_free_slots(resource, day, service):
+            yield start, resource.resource_id
+
+    def first_available(
+        self,
+        service: str,
+        n: int = 5,
+        start_date: Optional[str] = None,
+        days_ahead: int = 14,
+        location: Optional[str] = None
+    ) -> List[Tuple[str, str, str, str]]:
+        """Earliest `n` (date, start, end, resource_id) slots for a service across all qualified resources."""
+        svc = self.services[service]
+        resources = self.qualified_resources(service, location)
+        first_day = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else datetime.now().date()
+        results: List[Tuple[str, str, str, str]] = []
+        for offset in range(days_ahead):
+            day = first_day + timedelta(days=offset)
+            streams = [self._tagged_slots(r, day, svc) for r in resources]
+            for start, resource_id in islice(heapq.merge(*streams), n - len(results)):
+                results.append((str(day), format_hhmm(start), format_hhmm(start + svc.duration_minutes), resource_id))
+            if len(results) >= n:
+                break
+        return results
+
+    def bulk_availability(
+        self,
+        service: str,
+        start_date: Optional[str] = None,
+        days_ahead: int = 7,
+        resource_ids: Optional[List[str]] = None
+    ) -> Dict[str, List[Tuple[str, str, str]]]:
+        """All free (date, start, end) slots per resource for a service over a date range."""
+        svc = self.services[service]
+        if resource_ids is None:
+            resources = self.qualified_resources(service)
+        else:
+            resources = [self.resources[rid] for rid in resource_ids]
+        first_day = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else datetime.now().date()
+        days = [first_day + timedelta(days=offset) for offset in range(days_ahead)]
+        availability = {}
+        for r in resources:
+            availability[r.resource_id] = [
+                (str(day), format_hhmm(start), format_hhmm(start + svc.duration_minutes))
+                for day in days
+                for start in self.iter_free_slots(r, day, svc)
+            ]
+        return availability
+
+
+def build_engine(
+    resources_csv: str = "data/sample_resources.csv",
+    services_csv: str = "data/sample_services.csv",
+    locations_csv: str = "data/sample_locations.csv",
+    holidays_csv: Optional[str] = "data/sample_holidays.csv",
+    bookings_csv: Optional[str] = None,
+    step_minutes: int = 15
+) -> SchedulingEngine:
+    """Build an engine from the sample-data CSV layout."""
+    resources = load_resources(resources_csv, load_location_hours(locations_csv))
+    holidays = read_csv(holidays_csv) if holidays_csv else []
+    engine = SchedulingEngine(resources, load_services(services_csv), holidays, step_minutes)
+    if bookings_csv:
+        skipped = engine.load_bookings(iter_csv(bookings_csv))
+        if skipped:
+            print(f"[WARN] Skipped {skipped} malformed bookings.")
+    return engine
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Multi-resource Scheduling Engine")
+    parser.add_argument("--service", required=True, type=str, help="Service name (see data/sample_services.csv)")
+    parser.add_argument("--n", type=int, default=5, help="Number of slots to suggest")
+    parser.add_argument("--start_date", type=str, help="First date to search (YYYY-MM-DD, default today)")
+    parser.add_argument("--days_ahead", type=int, default=14, help="Days to search")
+    parser.add_argument("--location", type=str, help="Restrict to one location")
+    parser.add_argument("--resources", type=str, default="data/sample_resources.csv", help="Resources CSV")
+    parser.add_argument("--services", type=str, default="data/sample_services.csv", help="Services CSV")
+    parser.add_argument("--locations", type=str, default="data/sample_locations.csv", help="Locations CSV")
+    parser.add_argument("--holidays", type=str, default="data/sample_holidays.csv", help="Holidays CSV")
+    parser.add_argument("--bookings", type=str, default="data/sample_resource_bookings.csv", help="Bookings CSV with resource_id")
+    args = parser.parse_args(argv)
+    engine = build_engine(args.resources, args.services, args.locations, args.holidays, args.bookings)
+    slots = engine.first_available(args.service, args.n, args.start_date, args.days_ahead, args.location)
+    if not slots:
+        print("No available slots found.")
+    for d, s, e, rid in slots:
+        print(f"{d} {s}-{e} with {rid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+smallbiz package
+Single command-line entry point for every tool, plus a long-lived worker that keeps them warm.
+"""
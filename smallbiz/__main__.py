@@ -0,0 +1,4 @@
+import sys
+from smallbiz.cli import main
+
+sys.exit(main())
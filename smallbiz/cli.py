@@ -0,0 +1,162 @@
+"""
+Unified `smallbiz` command line.
+- `python -m smallbiz <tool> [args...]` runs any tool's own CLI (same flags as running the module)
+- `python -m smallbiz worker --socket PATH | --queue DIR` starts a warm worker (see smallbiz/worker.py)
+- `python -m smallbiz submit ...` sends a job to a worker; `status` asks a socket worker for its counters
+- Tools are imported only when dispatched, so `smallbiz --help` stays fast
+"""
+import importlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Tool:
+    module: str
+    description: str
+    warm: Tuple[str, ...] = ()  # heavy modules a worker preloads for this tool
+
+
+TOOLS: Dict[str, Tool] = {
+    "invoice_processor": Tool("operations.invoice_processor", "OCR invoices into a CSV", ("pytesseract", "pdf2image", "pdfplumber")),
+    "sentiment_analysis": Tool("customer_service.sentiment_analysis", "Classify customer texts", ("openai",)),
+    "inventory_tracker": Tool("automation.inventory_tracker", "Restock list and supplier email", ("openai",)),
+    "report_generator": Tool("automation.report_generator", "Monthly PDF business report", ("pandas", "matplotlib.pyplot", "reportlab.pdfgen.canvas", "openai")),
+    "sales_forecast": Tool("analytics.sales_forecast", "Forecast sales from a CSV", ("pandas", "numpy", "scipy.stats", "matplotlib.backends.backend_agg", "statsmodels.tsa.arima.model")),
+    "email_generator": Tool("marketing.email_generator", "Draft a marketing email", ("openai",)),
+    "appointment_scheduler": Tool("operations.appointment_scheduler", "Suggest appointment slots", ("ics", "openai")),
+    "scheduling_engine": Tool("operations.scheduling_engine", "Multi-resource scheduling"),
+}
+
+
+def get_tool(name: str) -> Tool:
+    tool = TOOLS.get(name)
+    if tool is None:
+        raise ValueError(f"Unknown tool '{name}'. Use one of: {', '.join(TOOLS)}.")
+    return tool
+
+
+def run_tool(name: str, argv: Optional[List[str]] = None) -> int:
+    """Run a tool's main(argv) in this process and return its exit code.
+
+    argparse errors and --help (SystemExit) become exit codes; other
+    exceptions propagate to the caller.
+    """
+    module = importlib.import_module(get_tool(name).module)
+    prog = sys.argv[0]
+    sys.argv[0] = f"smallbiz {name}"  # argparse builds usage lines from argv[0]
+    try:
+        code = module.main(list(argv or []))
+    except SystemExit as e:
+        code = e.code
+    finally:
+        sys.argv[0] = prog
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _tool_list() -> str:
+    return "\n".join(f"  {name:<22} {tool.description}" for name, tool in TOOLS.items())
+
+
+def _add_target(parser) -> None:
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--socket", type=str, help="Unix socket path of the worker")
+    target.add_argument("--queue", type=str, help="File queue directory of the worker")
+
+
+def _submit(args) -> int:
+    from smallbiz.worker import FileQueue, Job, request_socket
+
+    job = Job(tool=args.tool, args=args.tool_args, cwd=args.cwd, timeout=args.timeout)
+    get_tool(job.tool)
+    if args.queue:
+        queue = FileQueue(args.queue)
+        queue.submit(job)
+        if not args.wait:
+            print(f"Queued job {job.id} ({job.tool}) in {args.queue}")
+            return 0
+        result = queue.wait_result(job.id)
+    else:
+        result = request_socket(args.socket, job.to_dict())
+    sys.stdout.write(result.get("output", ""))
+    if result.get("error"):
+        print(f"[{job.tool}] {result['error']}", file=sys.stderr)
+    return int(result.get("exit_code", 1))
+
+
+def _status(args) -> int:
+    from smallbiz.worker import request_socket
+    print(json.dumps(request_socket(args.socket, {"command": "status"}), indent=2))
+    return 0
+
+
+def _worker(args) -> int:
+    from smallbiz.worker import FileQueue, Worker
+
+    worker = Worker(isolation=args.isolation, default_timeout=args.timeout)
+    worker.warm_up(args.tools.split(",") if args.tools else None)
+    if args.queue:
+        worker.serve_queue(FileQueue(args.queue), poll_seconds=args.poll)
+    else:
+        worker.serve_socket(args.socket)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in TOOLS:
+        return run_tool(argv[0], argv[1:])
+
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="smallbiz",
+        description="Small business tools. Run `smallbiz <tool> --help` for a tool's own options.",
+        epilog="tools:\n" + _tool_list(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", metavar="<tool> | list | worker | submit | status")
+    commands.add_parser("list", help="List the available tools")
+
+    worker = commands.add_parser("worker", help="Run a long-lived worker that keeps tools imported and clients warm")
+    _add_target(worker)
+    worker.add_argument("--isolation", choices=("fork", "inline"), help="fork: each job in a child process (default where available); inline: in-process with captured output")
+    worker.add_argument("--tools", type=str, help="Comma-separated tools to preload (default: all)")
+    worker.add_argument("--timeout", type=float, help="Default per-job timeout in seconds (fork isolation)")
+    worker.add_argument("--poll", type=float, default=1.0, help="Queue polling interval in seconds")
+
+    submit = commands.add_parser("submit", help="Send one job to a worker and print its output")
+    _add_target(submit)
+    submit.add_argument("--cwd", type=str, help="Working directory for the job (default: current directory)")
+    submit.add_argument("--timeout", type=float, help="Job timeout in seconds")
+    submit.add_argument("--no-wait", dest="wait", action="store_false", help="Queue only: return once the job is queued")
+    submit.add_argument("tool", choices=list(TOOLS), metavar="tool", help="Tool to run")
+    submit.add_argument("tool_args", nargs=argparse.REMAINDER, help="Arguments passed to the tool")
+
+    status = commands.add_parser("status", help="Show a socket worker's job counters")
+    status.add_argument("--socket", type=str, required=True, help="Unix socket path of the worker")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        print(_tool_list())
+        return 0
+    if args.command == "worker":
+        return _worker(args)
+    if args.command == "submit":
+        args.cwd = os.path.abspath(args.cwd or os.getcwd())
+        return _submit(args)
+    if args.command == "status":
+        return _status(args)
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Long-lived worker that runs smallbiz tool jobs without paying startup cost per job.
+- Tool modules and their heavy libraries are imported once; the pooled OpenAI client is built once
+- Jobs arrive over a local Unix socket (one JSON line in, one JSON result line out)
+  or through a directory file queue (incoming/ -> running/ -> done/)
+- Per-job isolation: 'fork' runs each job in a child forked from the warm worker, so crashes,
+  sys.exit, chdir and module-level state never leak into the next job; 'inline' runs jobs in the
+  worker itself with captured output, reusing live keep-alive connections
+- Jobs run one at a time, in arrival order; results carry exit code, output and duration
+"""
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from smallbiz.cli import TOOLS, get_tool, run_tool
+
+ISOLATION_MODES = ("fork", "inline")
+MAX_OUTPUT_CHARS = 64_000  # tail of a job's output kept in its result
+TIMEOUT_EXIT_CODE = 124
+
+
+@dataclass
+class Job:
+    tool: str
+    args: List[str] = field(default_factory=list)
+    cwd: Optional[str] = None
+    timeout: Optional[float] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        if not isinstance(data, dict) or not isinstance(data.get("tool"), str):
+            raise ValueError("A job needs a 'tool' name.")
+        args = data.get("args") or []
+        if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+            raise ValueError("Job 'args' must be a list of strings.")
+        get_tool(data["tool"])
+        job = cls(tool=data["tool"], args=args, cwd=data.get("cwd"), timeout=data.get("timeout"))
+        if data.get("id"):
+            job.id = str(data["id"])
+        return job
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class JobResult:
+    id: str
+    tool: str
+    exit_code: int
+    output: str = ""
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _execute(job: Job) -> int:
+    """Run the job in the current process; any exception becomes exit code 1 with its traceback on stderr."""
+    previous = os.getcwd()
+    try:
+        if job.cwd:
+            os.chdir(job.cwd)
+        return run_tool(job.tool, job.args)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        os.chdir(previous)
+
+
+def _child(job: Job, log_path: str) -> None:
+    # Both the Python streams and fds 1/2 (C extensions, subprocesses) go to the job log
+    fd = os.open(log_path, os.O_WRONLY | os.O_TRUNC)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    sys.stdout = sys.stderr = open(fd, "w", encoding="utf-8", errors="replace", buffering=1)
+    code = _execute(job)
+    sys.stdout.flush()
+    os._exit(code & 0xFF)
+
+
+def _tail(text: str) -> str:
+    return text if len(text) <= MAX_OUTPUT_CHARS else "...\n" + text[-MAX_OUTPUT_CHARS:]
+
+
+class Worker:
+    """Runs jobs one at a time against warm, already-imported tools."""
+
+    def __init__(self, isolation: Optional[str] = None, default_timeout: Optional[float] = None):
+        if isolation is None:
+            isolation = "fork" if "fork" in multiprocessing.get_all_start_methods() else "inline"
+        if isolation not in ISOLATION_MODES:
+            raise ValueError(f"Unknown isolation '{isolation}'. Use one of: {', '.join(ISOLATION_MODES)}.")
+        if isolation == "fork" and "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("fork isolation is not available on this platform; use 'inline'.")
+        self.isolation = isolation
+        self.default_timeout = default_timeout
+        self._lock = threading.Lock()
+        self._stats = {"jobs": 0, "succeeded": 0, "failed": 0, "timed_out": 0}
+        self.started = time.time()
+        self.warm_up_ms = 0.0
+
+    def warm_up(self, tools: Optional[Iterable[str]] = None) -> List[str]:
+        """Import the tools and their heavy dependencies and build the OpenAI client; returns what was loaded."""
+        start = time.perf_counter()
+        loaded = []
+        for name in tools or TOOLS:
+            tool = get_tool(name)
+            for module in (tool.module,) + tool.warm:
+                try:
+                    # Touching an attribute also executes modules that were lazily imported
+                    importlib.import_module(module).__name__
+                    loaded.append(module)
+                except ImportError:
+                    pass
+        from utils import openai_client
+        from utils.config import get_openai_api_key
+        if get_openai_api_key(required=False):
+            openai_client.get_client()
+            loaded.append("openai client")
+        self.warm_up_ms = (time.perf_counter() - start) * 1000
+        return loaded
+
+    def run(self, job: Job) -> JobResult:
+        """Run one job with the configured isolation and record its outcome."""
+        with self._lock:
+            start = time.perf_counter()
+            if self.isolation == "fork":
+                code, output, error = self._run_forked(job)
+            else:
+                code, output, error = self._run_inline(job)
+            result = JobResult(job.id, job.tool, code, _tail(output), error, round((time.perf_counter() - start) * 1000, 1))
+            self._stats["jobs"] += 1
+            self._stats["succeeded" if result.ok else "failed"] += 1
+            if code == TIMEOUT_EXIT_CODE and error:
+                self._stats["timed_out"] += 1
+            return result
+
+    def _run_inline(self, job: Job) -> Tuple[int, str, Optional[str]]:
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+            code = _execute(job)
+        return code, buffer.getvalue(), None if code == 0 else f"exit code {code}"
+
+    def _run_forked(self, job: Job) -> Tuple[int, str, Optional[str]]:
+        timeout = job.timeout or self.default_timeout
+        fd, log_path = tempfile.mkstemp(prefix=f"smallbiz-{job.id}-", suffix=".log")
+        os.close(fd)
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            process = multiprocessing.get_context("fork").Process(target=_child, args=(job, log_path), daemon=False)
+            process.start()
+            process.join(timeout)
+            error = None
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                code, error = TIMEOUT_EXIT_CODE, f"timed out after {timeout:g}s"
+            else:
+                code = process.exitcode
+                if code < 0:
+                    error = f"killed by signal {-code}"
+                    code = 128 - code
+                elif code:
+                    error = f"exit code {code}"
+            with open(log_path, encoding="utf-8", errors="replace") as f:
+                output = f.read()
+            return code, output, error
+        finally:
+            os.remove(log_path)
+
+    def handle(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request: a job, or {"command": "status"}."""
+        if payload.get("command") == "status":
+            return self.status()
+        try:
+            job = Job.from_dict(payload)
+        except ValueError as e:
+            return JobResult(str(payload.get("id", "")), str(payload.get("tool", "")), 2, error=str(e)).to_dict()
+        return self.run(job).to_dict()
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self._stats, isolation=self.isolation, uptime_s=round(time.time() - self.started, 1), warm_up_ms=round(self.warm_up_ms, 1))
+
+    def serve_socket(self, path: str) -> None:
+        """Serve jobs on a Unix socket until SIGTERM/SIGINT or a {"command": "shutdown"} request."""
+        if os.path.exists(path):
+            os.remove(path)
+        worker = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    payload = json.loads(line)
+                except ValueError:
+                    payload = None
+                if not isinstance(payload, dict):
+                    reply = {"exit_code": 2, "error": "expected one JSON object per line"}
+                elif payload.get("command") == "shutdown":
+                    reply = {"ok": True}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    reply = worker.handle(payload)
+                self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        in_main = threading.current_thread() is threading.main_thread()
+        if in_main:
+            previous = signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+        print(f"smallbiz worker ({self.isolation}) listening on {path}, warm-up {self.warm_up_ms:.0f} ms")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if in_main:
+                signal.signal(signal.SIGTERM, previous)
+            server.server_close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def serve_queue(self, queue: "FileQueue", poll_seconds: float = 1.0, stop: Optional[threading.Event] = None, once: bool = False) -> int:
+        """Process queued jobs in submission order until stopped (or, with `once`, until the queue is empty).
+
+        Returns the number of jobs processed.
+        """
+        stop = stop or threading.Event()
+        in_main = threading.current_thread() is threading.main_thread()
+        previous = signal.signal(signal.SIGTERM, lambda *_: stop.set()) if in_main else None
+        if not once:
+            print(f"smallbiz worker ({self.isolation}) watching {queue.directory}, warm-up {self.warm_up_ms:.0f} ms")
+        processed = 0
+        try:
+            while not stop.is_set():
+                claimed = queue.claim()
+                if claimed is None:
+                    if once:
+                        break
+                    stop.wait(poll_seconds)
+                    continue
+                path, payload = claimed
+                queue.complete(path, self.handle(payload) if payload is not None else
+                               {"id": os.path.basename(path), "exit_code": 2, "error": "unreadable job file"})
+                processed += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if in_main:
+                signal.signal(signal.SIGTERM, previous)
+        return processed
+
+
+class FileQueue:
+    """Directory-backed job queue: incoming/ (submitted), running/ (claimed) and done/ (results).
+
+    Files are written to a temporary name and renamed into place, and
+    claimed by renaming into running/, so several workers and submitters can
+    share a queue safely on one filesystem.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.incoming = os.path.join(directory, "incoming")
+        self.running = os.path.join(directory, "running")
+        self.done = os.path.join(directory, "done")
+        for path in (self.incoming, self.running, self.done):
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _write(path: str, data: Dict[str, Any]) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def submit(self, job: Job) -> str:
+        # Time-prefixed names keep jobs in submission order
+        path = os.path.join(self.incoming, f"{time.time_ns():020d}-{job.id}.json")
+        self._write(path, job.to_dict())
+        return path
+
+    def claim(self) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Move the oldest job to running/ and return (path, payload); payload is None if unreadable."""
+        for name in sorted(n for n in os.listdir(self.incoming) if n.endswith(".json")):
+            target = os.path.join(self.running, name)
+            try:
+                os.rename(os.path.join(self.incoming, name), target)
+            except FileNotFoundError:
+                continue  # another worker claimed it
+            try:
+                with open(target, encoding="utf-8") as f:
+                    return target, json.load(f)
+            except ValueError:
+                return target, None
+        return None
+
+    def complete(self, path: str, result: Dict[str, Any]) -> None:
+        job_id = result.get("id") or os.path.basename(path)
+        self._write(os.path.join(self.done, f"{job_id}.json"), result)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.done, f"{job_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def wait_result(self, job_id: str, poll_seconds: float = 0.2, timeout: Optional[float] = None) -> Dict[str, Any]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = self.result(job_id)
+            if result is not None:
+                return result
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"No result for job {job_id} after {timeout:g}s.")
+            time.sleep(poll_seconds)
+
+
+def request_socket(path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one request to a socket worker and return its JSON reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError(f"No reply from worker at {path}.")
+    return json.loads(line)
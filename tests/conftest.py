@@ -1,7 +1,133 @@
 import pytest
 import time
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.config import load_env
+
+# Modules no longer load .env at import; load it before collection so skip conditions such as
+# the component tests' OPENAI_API_KEY check see keys kept in .env
+load_env()
 
 @pytest.fixture(autouse=True)
 def sleep_between_tests():
     yield
     time.sleep(1)  # Sleep for 1 second between tests to avoid rate limits
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path):
+    """Give every test its own empty LLM response cache."""
+    from utils import llm_cache
+    llm_cache.reset()
+    llm_cache.configure(path=str(tmp_path / "llm_cache.sqlite"))
+    yield llm_cache
+    llm_cache.reset()
+
+
+def chat_completion_payload(content: str) -> dict:
+    """Minimal OpenAI chat completion response body."""
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+    }
+
+
+def chat_completion_chunk(content: str) -> dict:
+    """One streamed chat completion chunk carrying a content delta."""
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+
+
+class FakeOpenAIServer:
+    """Local HTTP server speaking the chat completions API.
+
+    Set `responder` to a callable taking the parsed request body and returning
+    `(status_code, payload_dict)`, or `(200, [chunk, ...])` to stream the chunks
+    as server-sent events `stream_delay` seconds apart. Every request body is
+    recorded in `requests`; streams cut short by the client count in `aborted`.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.aborted = 0
+        self.stream_delay = 0.0
+        self.lock = threading.Lock()
+        self.responder = lambda body: (200, chat_completion_payload("{}"))
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server.lock:
+                    server.requests.append(body)
+                status, payload = server.responder(body)
+                if isinstance(payload, list):
+                    self.stream(payload)
+                    return
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def stream(self, chunks):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for chunk in chunks + ["[DONE]"]:
+                        time.sleep(server.stream_delay)
+                        data = chunk if isinstance(chunk, str) else json.dumps(chunk)
+                        self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    with server.lock:
+                        server.aborted += 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @staticmethod
+    def completion(content: str) -> dict:
+        return chat_completion_payload(content)
+
+    @staticmethod
+    def chunks(*parts: str) -> list:
+        return [chat_completion_chunk(part) for part in parts]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_openai_server():
+    """Run a FakeOpenAIServer and point the shared OpenAI client at it."""
+    from utils import openai_client
+    server = FakeOpenAIServer()
+    server.start()
+    openai_client.configure(api_key="sk-test", base_url=server.url, max_retries=0)
+    yield server
+    openai_client.reset()
+    server.stop()
@@ -13,3 +13,47 @@ def test_get_available_slots():
     slots = appointment_scheduler.get_available_slots(working_hours, bookings, slot_minutes=30, days_ahead=1)
     assert isinstance(slots, list)
     assert all(len(slot) == 3 for slot in slots)
+
+def reference_slots(working_hours, bookings, slot_minutes, days_ahead, start_date):
+    """The original O(days x slots x bookings) implementation, kept as an oracle."""
+    from datetime import datetime, timedelta
+    today = datetime.strptime(start_date, "%Y-%m-%d").date()
+    start_hour, end_hour = [datetime.strptime(h, "%H:%M").time() for h in working_hours]
+    slots = []
+    for day in range(days_ahead):
+        date = today + timedelta(days=day)
+        current = datetime.combine(date, start_hour)
+        end = datetime.combine(date, end_hour)
+        while current + timedelta(minutes=slot_minutes) <= end:
+            slot_start = current.time()
+            slot_end = (current + timedelta(minutes=slot_minutes)).time()
+            overlaps = []
+            for b in bookings:
+                if b['date'] == str(date):
+                    b_start = datetime.strptime(b['start_time'], "%H:%M").time()
+                    b_end = datetime.strptime(b['end_time'], "%H:%M").time()
+                    overlaps.append((slot_start < b_end) and (slot_end > b_start))
+            if not any(overlaps):
+                slots.append((str(date), slot_start.strftime("%H:%M"), slot_end.strftime("%H:%M")))
+            current += timedelta(minutes=slot_minutes)
+    return slots
+
+def test_get_available_slots_matches_reference_on_random_bookings():
+    import random
+    rng = random.Random(42)
+    bookings = []
+    for _ in range(400):
+        day = rng.randint(1, 10)
+        start = rng.randint(6 * 60, 20 * 60)
+        length = rng.choice([0, 5, 15, 30, 45, 60, 90, -30])
+        end = min(max(start + length, 0), 23 * 60 + 59)
+        bookings.append({
+            "date": f"2024-06-{day:02d}",
+            "start_time": f"{start // 60:02d}:{start % 60:02d}",
+            "end_time": f"{end // 60:02d}:{end % 60:02d}",
+        })
+    for working_hours, slot_minutes in [(("09:00", "17:00"), 30), (("08:15", "18:40"), 25), (("07:00", "12:00"), 60)]:
+        expected = reference_slots(working_hours, bookings, slot_minutes, 10, "2024-06-01")
+        index = appointment_scheduler.BookingIndex(bookings)
+        assert appointment_scheduler.get_available_slots(working_hours, bookings, slot_minutes, 10, "2024-06-01") == expected
+        assert appointment_scheduler.get_available_slots(working_hours, index, slot_minutes, 10, "2024-06-01") == expected
@@ -1,6 +1,7 @@
 """
 Test for customer_service/chatbot.py
 """
+import json
 import pytest
 from customer_service import chatbot
 
@@ -11,3 +12,203 @@ def test_ask_faq_bot(monkeypatch):
     )
     answer = chatbot.ask_faq_bot("What are your business hours?")
     assert "Monday to Friday" in answer
+
+
+@pytest.fixture
+def chatbot_data(tmp_path, monkeypatch):
+    """Point the chatbot at copies of the sample CSVs, with a fresh index checked on every request."""
+    import shutil
+    from customer_service.session_store import SessionStore
+    from utils.text_search import BM25Index
+    files = {}
+    for name, path in chatbot.DATA_FILES.items():
+        files[name] = str(tmp_path / path.split("/")[-1])
+        shutil.copy(path, files[name])
+    monkeypatch.setattr(chatbot, "DATA_FILES", files)
+    monkeypatch.setattr(chatbot, "DATA_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(chatbot, "_index", BM25Index())
+    monkeypatch.setattr(chatbot, "_source_docs", {})
+    monkeypatch.setattr(chatbot, "_source_mtimes", {})
+    monkeypatch.setattr(chatbot, "_sessions", SessionStore())
+    return files
+
+
+def test_only_relevant_snippets_are_sent(chatbot_data, fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("We are closed."))
+    chatbot.ask_faq_bot("Are you open on Thanksgiving?")
+    chatbot.ask_faq_bot("Do you offer discounts?")
+    first, second = fake_openai_server.requests
+    # Static instructions are an identical first message for prompt-prefix caching
+    assert first["messages"][0] == second["messages"][0] == {"role": "system", "content": chatbot.SYSTEM_PROMPT}
+    assert "Thanksgiving (2025-11-27): Closed" in first["messages"][1]["content"]
+    assert "Testimonial" not in first["messages"][1]["content"]
+    assert "Veterans Discount" in second["messages"][1]["content"]
+    assert first["messages"][1]["content"].count("\n") <= chatbot.TOP_K
+
+
+def test_index_updates_incrementally_when_csv_changes(chatbot_data, monkeypatch):
+    import os
+    assert "Flash Sale" not in chatbot.get_context("flash sale")
+    added = []
+    original_add = chatbot._index.add
+    monkeypatch.setattr(chatbot._index, "add", lambda doc_id, text: (added.append(text), original_add(doc_id, text)))
+    with open(chatbot_data["promotions"], "a", encoding="utf-8") as f:
+        f.write("Flash Sale,Half off everything,2030-01-01\n")
+    stat = os.stat(chatbot_data["promotions"])
+    os.utime(chatbot_data["promotions"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert chatbot.get_context("flash sale").startswith("Promotion - Flash Sale")
+    assert added == ["Promotion - Flash Sale: Half off everything (valid until 2030-01-01)"]
+
+
+def test_follow_up_questions_include_session_history(chatbot_data, fake_openai_server):
+    answers = iter(["Yes, we honor a Veterans Discount.", "It is 10% off."])
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion(next(answers)))
+    client = chatbot.app.test_client()
+    first = client.post("/faq", json={"question": "Any deals for veterans?", "session_id": "abc"}).get_json()
+    second = client.post("/faq", json={"question": "How much is it?", "session_id": "abc"}).get_json()
+    assert first["session_id"] == second["session_id"] == "abc"
+    assert second["answer"] == "It is 10% off."
+    messages = fake_openai_server.requests[1]["messages"]
+    assert messages[2:] == [
+        {"role": "user", "content": "Any deals for veterans?"},
+        {"role": "assistant", "content": "Yes, we honor a Veterans Discount."},
+        {"role": "user", "content": "How much is it?"},
+    ]
+    # The previous question steers retrieval for the follow-up
+    assert "Veterans Discount" in messages[1]["content"]
+    # Requests without a session id stay stateless
+    client.post("/faq", json={"question": "How much is it?"})
+    assert len(fake_openai_server.requests[2]["messages"]) == 3
+
+
+def test_reload_endpoint(chatbot_data):
+    response = chatbot.app.test_client().post("/faq/reload")
+    payload = response.get_json()
+    assert payload["reloaded"] is True
+    assert payload["indexed_snippets"] == len(chatbot._index) > len(chatbot.FAQS)
+
+
+def test_answer_question_short_circuits_known_faqs(chatbot_data, fake_openai_server, monkeypatch):
+    from utils.metrics import LatencyRecorder
+    monkeypatch.setattr(chatbot, "_latency", LatencyRecorder())
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("Ask in store."))
+    answer, path = chatbot.answer_question("What payment methods do you accept?")
+    assert (answer, path) == ("We accept Visa, MasterCard, PayPal, and Apple Pay.", "exact")
+    answer, path = chatbot.answer_question("Are you opn on holidays?")
+    assert path == "fuzzy" and "Thanksgiving (2025-11-27): Closed" in answer
+    assert fake_openai_server.requests == []
+    answer, path = chatbot.answer_question("Can I bring my dog?")
+    assert (answer, path) == ("Ask in store.", "llm")
+    assert len(fake_openai_server.requests) == 1
+    paths = chatbot.get_metrics()["paths"]
+    assert {name: stats["count"] for name, stats in paths.items()} == {"exact": 1, "fuzzy": 1, "llm": 1}
+    assert paths["llm"]["p99_ms"] >= paths["llm"]["p50_ms"] > 0
+
+
+def test_healthz_and_concurrency_shedding(chatbot_data, monkeypatch):
+    import threading
+    client = chatbot.app.test_client()
+    assert client.get("/healthz").get_json()["status"] == "ok"
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(chatbot, "_request_slots", slots)
+    monkeypatch.setattr(chatbot, "answer_question", lambda q, session_id=None: ("ok", "exact"))
+    assert client.post("/faq", json={"question": "hours"}).status_code == 200
+    slots.acquire()  # simulate a request already in flight
+    response = client.post("/faq", json={"question": "hours"})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    assert client.get("/healthz").status_code == 200
+    slots.release()
+    assert client.post("/faq", json={"question": "hours"}).status_code == 200
+
+
+def test_shipped_gunicorn_defaults_shed_with_503(chatbot_data, monkeypatch):
+    import importlib.util
+    import os
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    for name in ("CHATBOT_THREADS", "CHATBOT_MAX_CONCURRENCY", "CHATBOT_WORKER_CLASS"):
+        monkeypatch.delenv(name, raising=False)
+    path = os.path.join(os.path.dirname(chatbot.__file__), "gunicorn_conf.py")
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    cap = conf.max_concurrency
+    assert conf.threads > cap == chatbot.MAX_CONCURRENT_REQUESTS
+    monkeypatch.setattr(chatbot, "_request_slots", threading.BoundedSemaphore(cap))
+    release = threading.Event()
+    monkeypatch.setattr(chatbot, "answer_question",
+                        lambda q, session_id=None: release.wait(10) and ("ok", "exact"))
+
+    def post():
+        return chatbot.app.test_client().post("/faq", json={"question": "hours"}).status_code
+
+    # A gthread worker runs at most `threads` requests in the app at once: fill every thread
+    with ThreadPoolExecutor(max_workers=conf.threads) as pool:
+        futures = [pool.submit(post) for _ in range(conf.threads)]
+        deadline = time.monotonic() + 10
+        while sum(f.done() for f in futures) < conf.threads - cap and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        codes = [f.result() for f in futures]
+    assert codes.count(503) == conf.threads - cap
+    assert codes.count(200) == cap
+
+
+def test_llm_timeout_returns_apology(chatbot_data, fake_openai_server, monkeypatch):
+    import time
+
+    def slow(body):
+        time.sleep(1)
+        return 200, fake_openai_server.completion("late")
+
+    fake_openai_server.responder = slow
+    monkeypatch.setattr(chatbot, "LLM_TIMEOUT", 0.2)
+    start = time.perf_counter()
+    answer = chatbot.ask_faq_bot("Can I bring my dog?")
+    assert answer.startswith("Sorry, I couldn't process your request")
+    assert time.perf_counter() - start < 1
+
+
+def read_sse(response):
+    """Parse (event, data) pairs from a streamed SSE response."""
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
+
+
+def test_faq_stream_sends_deltas_then_done(chatbot_data, fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.chunks("Dogs ", "are ", "welcome."))
+    client = chatbot.app.test_client()
+    events = read_sse(client.get("/faq/stream", query_string={"question": "Can I bring my dog?"}))
+    assert [data["delta"] for event, data in events[:-1]] == ["Dogs ", "are ", "welcome."]
+    assert events[-1] == ("done", {"source": "llm"})
+    assert fake_openai_server.requests[0]["stream"] is True
+    # The completed stream was cached and is replayed as a single chunk
+    events = read_sse(client.post("/faq/stream", json={"question": "Can I bring my dog?"}))
+    assert events[0][1] == {"delta": "Dogs are welcome."}
+    assert len(fake_openai_server.requests) == 1
+    # Canned FAQ answers stream without calling the LLM
+    events = read_sse(client.get("/faq/stream", query_string={"question": "What is your return policy?"}))
+    assert events[-1] == ("done", {"source": "exact"})
+
+
+def test_faq_stream_disconnect_cancels_upstream(chatbot_data, fake_openai_server):
+    import time
+    fake_openai_server.stream_delay = 0.1
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.chunks(*["token "] * 30))
+    response = chatbot.app.test_client().get("/faq/stream", query_string={"question": "Tell me a long story"}, buffered=False)
+    chunks = response.iter_encoded()
+    assert b"token" in next(chunks)
+    response.close()  # what the WSGI server does when the client goes away
+    deadline = time.time() + 3
+    while not fake_openai_server.aborted and time.time() < deadline:
+        time.sleep(0.05)
+    assert fake_openai_server.aborted == 1
+    # An interrupted stream is not cached
+    fake_openai_server.stream_delay = 0
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("Once upon a time."))
+    assert chatbot.ask_faq_bot("Tell me a long story") == "Once upon a time."
+    assert len(fake_openai_server.requests) == 2
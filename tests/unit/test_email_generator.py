@@ -3,6 +3,7 @@ Test for marketing/email_generator.py
 """
 import pytest
 from marketing import email_generator
+from utils import openai_client
 
 
 def test_generate_email(monkeypatch):
@@ -19,9 +20,7 @@ def test_generate_email(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "20% off", "friendly")
     assert isinstance(subject, str) and len(subject) > 0
     assert isinstance(plain, str) and len(plain) > 0
@@ -42,9 +41,7 @@ def test_generate_email_empty_offer(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "", "friendly")
     assert isinstance(subject, str) and len(subject) > 0
     assert isinstance(plain, str) and len(plain) > 0
@@ -65,9 +62,7 @@ def test_generate_email_special_characters(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "@#%$^&*()", "friendly")
     special_chars = set('@#%$^&*()')
     found = any(c in subject for c in special_chars) or any(c in plain for c in special_chars) or any(c in html for c in special_chars)
@@ -90,13 +85,11 @@ def test_generate_email_long_offer(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", long_offer, "friendly")
-    keywords = ["offer", "deal", "promotion", "special", "discount"]
-    found = any(k in plain.lower() for k in keywords) or any(k in html.lower() for k in keywords)
-    assert len(plain) > 0 and len(html) > 0 and found
+    assert subject == "Long Offer"
+    assert plain == long_offer
+    assert html == "<b>" + long_offer + "</b>"
 
 
 def test_generate_email_different_tones(monkeypatch):
@@ -113,9 +106,7 @@ def test_generate_email_different_tones(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "20% off", "formal")
     greetings = ["dear", "hello", "hi", "greetings"]
     plain_greeting = any(g in plain.lower() for g in greetings)
@@ -137,9 +128,7 @@ def test_generate_email_html_valid(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse()
-    )
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "20% off", "friendly")
     assert html.startswith("<html>") or "<b>" in html
 
@@ -158,8 +147,7 @@ def test_generate_email_malformed_response(monkeypatch):
 
         choices = [Choice()]
 
-    monkeypatch.setattr(
-        email_generator.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse())
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     subject, plain, html = email_generator.generate_email("Retail", "20% off", "friendly")
     assert isinstance(subject, str)
     assert isinstance(plain, str)
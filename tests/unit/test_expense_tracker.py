@@ -38,3 +38,103 @@ def test_export_to_quickbooks_csv(tmp_path):
     with open(out) as f:
         lines = f.readlines()
     assert lines[0].startswith('Date,Description,Amount,Category')
+
+def test_categorize_expenses_calls_llm_once_per_merchant(tmp_path, monkeypatch):
+    from finance import expense_tracker
+    prompts = []
+
+    def fake_completion(module, model, messages, max_tokens, **kwargs):
+        prompts.append(messages[0]["content"])
+        return "Travel" if "SHELL" in messages[0]["content"] else "Supplies"
+
+    monkeypatch.setattr(expense_tracker, "cached_chat_completion", fake_completion)
+    rules_path = tmp_path / "rules.json"
+    txs = [
+        {"Date": "2025-06-01", "Description": "SHELL OIL 1234", "Amount": "-40.00"},
+        {"Date": "2025-06-02", "Description": "SHELL OIL 5678 06/02", "Amount": "-35.00"},
+        {"Date": "2025-06-03", "Description": "Office Depot #12", "Amount": "-20.00"},
+    ]
+    result = ExpenseTracker(rules_path=str(rules_path)).categorize_expenses(txs)
+    assert len(prompts) == 2
+    assert [tx["Category"] for tx in result] == ["Travel", "Travel", "Supplies"]
+    assert all(tx["Category_Source"] == "llm" for tx in result)
+
+    # A fresh tracker reuses the persisted rules without calling OpenAI
+    prompts.clear()
+    again = [
+        {"Date": "2025-07-01", "Description": "SHELL OIL 9999", "Amount": "-50.00"},
+        {"Date": "2025-07-02", "Description": "OFFICE DEPOT #77 STAPLES AISLE", "Amount": "-10.00"},
+    ]
+    result = ExpenseTracker(rules_path=str(rules_path)).categorize_expenses(again)
+    # Learned answers are exact-only: a longer name needs its own answer or an explicit prefix rule
+    assert len(prompts) == 1 and "STAPLES AISLE" in prompts[0]
+    assert [tx["Category_Source"] for tx in result] == ["rule_exact", "llm"]
+    prompts.clear()
+    tracker = ExpenseTracker(rules_path=str(rules_path))
+    tracker.rules.add_prefix_rule("OFFICE DEPOT", "Supplies")
+    result = tracker.categorize_expenses([{"Date": "2025-07-03", "Description": "OFFICE DEPOT ONLINE", "Amount": "-5.00"}])
+    assert prompts == []
+    assert (result[0]["Category"], result[0]["Category_Source"]) == ("Supplies", "rule_prefix")
+
+def _categorized_transactions(n_months=24, seed=7):
+    import random
+    rng = random.Random(seed)
+    txs = []
+    for month in range(n_months):
+        year, mon = 2023 + month // 12, month % 12 + 1
+        txs.append({"Date": f"{year}-{mon:02d}-01", "Description": "Landlord", "Amount": "-2000.00", "Category": "Rent"})
+        for day in range(2, 22):
+            txs.append({"Date": f"{year}-{mon:02d}-{day:02d}", "Description": "Cafe", "Amount": f"{-rng.uniform(10, 20):.2f}", "Category": "Meals"})
+    return txs
+
+def test_detect_anomalies_is_per_category():
+    txs = _categorized_transactions()
+    txs.append({"Date": "2024-03-15", "Description": "Catering", "Amount": "-450.00", "Category": "Meals"})
+    anomalies = ExpenseTracker().detect_anomalies(txs)
+    # A 450 meal stands out among ~15 meals; the 2000 monthly rent is normal for Rent
+    assert [tx["Description"] for tx in anomalies] == ["Catering"]
+    assert anomalies[0]["Anomaly_Reason"] == "statistical" and anomalies[0]["Anomaly_Score"] < -10
+    assert [tx["Description"] for tx in ExpenseTracker().detect_anomalies(txs, method="zscore")] == ["Catering"]
+    assert not any("Anomaly_Score" in tx for tx in txs)  # the caller's rows are not modified
+
+def test_detect_anomalies_rolling_window_follows_level_shifts():
+    txs = [{"Date": f"2025-01-{d:02d}", "Description": "Cafe", "Amount": "-15.00", "Category": "Meals"} for d in range(1, 21)]
+    txs += [{"Date": f"2025-02-{d:02d}", "Description": "Team lunch", "Amount": f"-{150 + d % 3}.00", "Category": "Meals"} for d in range(1, 21)]
+    tracker = ExpenseTracker()
+    whole_history = tracker.detect_anomalies([dict(tx) for tx in txs], z_threshold=3)
+    rolling = tracker.detect_anomalies([dict(tx) for tx in txs], window=5, z_threshold=3)
+    # Against a trailing window only the first few lunches after the jump are unusual
+    assert 0 < len(rolling) <= 5 and all(tx["Date"] <= "2025-02-05" for tx in rolling)
+    assert len(whole_history) != len(rolling)
+
+def test_monthly_cash_flow_handles_bad_rows():
+    txs = [
+        {"Date": "2025-01-05", "Amount": "100.00"},
+        {"Date": "2025-01-09", "Amount": "$1,200.50"},
+        {"Date": "2025-01-10", "Amount": "-40"},
+        {"Date": "not a date", "Amount": "-5"},
+        {"Date": "2025-02-01", "Amount": "n/a"},
+    ]
+    summary = ExpenseTracker().monthly_cash_flow(txs)
+    assert summary["2025-01"] == {"inflow": 1300.5, "outflow": -40.0}
+    assert summary["Unknown"] == {"inflow": 0.0, "outflow": -5.0}
+    assert summary["2025-02"] == {"inflow": 0.0, "outflow": 0.0}
+
+def test_chunked_report_matches_in_memory(tmp_path):
+    import csv
+    txs = _categorized_transactions(n_months=12)
+    txs.insert(100, {"Date": txs[100]["Date"], "Description": "Catering", "Amount": "-450.00", "Category": "Meals"})
+    path = tmp_path / "bank.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["Date", "Description", "Amount", "Category"])
+        writer.writeheader()
+        writer.writerows(txs)
+    tracker = ExpenseTracker()
+    for options in ({"method": "mad", "window": 30}, {"method": "zscore", "window": 30}, {"method": "zscore"}):
+        in_memory = tracker.cash_flow_report(str(path), **options)
+        chunked = tracker.cash_flow_report(str(path), chunksize=37, **options)
+        assert chunked.monthly.round(6).equals(in_memory.monthly.round(6))
+        assert list(chunked.anomalies["Description"]) == list(in_memory.anomalies["Description"])
+        assert "Catering" in set(in_memory.anomalies["Description"])
+    with pytest.raises(ValueError):
+        tracker.cash_flow_report(str(path), chunksize=37, method="mad")
@@ -0,0 +1,44 @@
+"""
+Test for customer_service/faq_matcher.py
+"""
+from customer_service.faq_matcher import FaqMatcher, normalize_question
+
+FAQS = [
+    {"question": "What are your business hours?", "answer": "9 to 6."},
+    {"question": "Do you offer discounts?", "answer": "Yes."},
+    {"question": "What is your return policy?", "answer": "30 days."},
+]
+
+
+def test_normalize_question():
+    assert normalize_question("What are your business HOURS??") == "business hour"
+    assert normalize_question("hey, what r ur business hours please") == "business hour"
+    assert normalize_question("") == ""
+
+
+def test_exact_and_fuzzy_matches():
+    matcher = FaqMatcher(FAQS, threshold=0.85)
+    faq, score, path = matcher.match("business hours?")
+    assert (faq["answer"], score, path) == ("9 to 6.", 1.0, "exact")
+    faq, score, path = matcher.match("What are your busness hours")
+    assert path == "fuzzy" and faq["answer"] == "9 to 6." and 0.85 <= score < 1.0
+
+
+def test_below_threshold_falls_through():
+    matcher = FaqMatcher(FAQS, threshold=0.85)
+    assert matcher.match("Do you offer refunds?")[2] is None
+    assert matcher.match("What is your return policy for sale items?")[0] is None
+    assert matcher.match("hello") == (None, 0.0, None)
+    assert FaqMatcher(FAQS, threshold=0.5).match("Do you offer refunds?")[2] == "fuzzy"
+
+
+def test_negated_question_does_not_fuzzy_match_the_positive_faq():
+    faqs = FAQS + [
+        {"question": "What payment methods do you accept?", "answer": "Visa, Mastercard, PayPal."},
+        {"question": "Do you offer refunds?", "answer": "Yes, within 30 days."},
+    ]
+    matcher = FaqMatcher(faqs, threshold=0.85)
+    assert matcher.match("What payment methods do you not accept?")[0] is None
+    assert matcher.match("Do you not offer refunds?")[0] is None
+    assert matcher.match("Don't you offer refunds?")[0] is None
+    assert matcher.match("Do you ofer refunds?")[0]["answer"] == "Yes, within 30 days."
@@ -14,3 +14,33 @@ def test_csv_io():
         read = file_io.read_csv(tmp.name)
         assert read == [{"a": "1", "b": "2"}, {"a": "3", "b": "4"}]
     os.remove(tmp.name)
+
+def test_iter_csv_chunks_and_types(tmp_path):
+    path = tmp_path / "stock.csv"
+    path.write_text("item,stock,price\nTape,3,1.5\nGlue,,2\nPens,x,0.5\n")
+    chunks = list(file_io.iter_csv(str(path), chunk_size=2, types={"stock": int, "price": float}, errors="coerce"))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0][0] == {"item": "Tape", "stock": 3, "price": 1.5}
+    assert chunks[0][1]["stock"] is None and chunks[1][0]["stock"] is None
+    with pytest.raises(ValueError, match="stock"):
+        list(file_io.iter_csv(str(path), types={"stock": int}))
+
+def test_iter_jsonl_skips_blank_and_malformed_lines(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"id": "1"}\n\n{"id": "2"}\n{"id": "3", "trunc\n')
+    assert list(file_io.iter_jsonl(str(path), types={"id": int}, errors="coerce")) == [{"id": 1}, {"id": 2}]
+    with pytest.raises(ValueError, match=":4:"):
+        list(file_io.iter_jsonl(str(path)))
+
+def test_csv_appender_is_lazy_and_reuses_header(tmp_path):
+    path = tmp_path / "out.csv"
+    with file_io.CsvAppender(str(path)) as out:
+        pass
+    assert not path.exists()
+    with file_io.CsvAppender(str(path), flush_every=1) as out:
+        out.write({"a": 1, "b": 2})
+        assert path.read_text().splitlines() == ["a,b", "1,2"]
+    with file_io.CsvAppender(str(path), fieldnames=["b", "c"]) as out:
+        out.write_rows([{"b": 4, "a": 3, "c": 9}, {"a": 5}])
+    assert path.read_text().splitlines() == ["a,b", "1,2", "3,4", "5,"]
+    assert out.rows_written == 2
@@ -1,8 +1,10 @@
 """
 Test for operations/invoice_processor.py
 """
+import os
 import pytest
 from operations import invoice_processor
+from utils.file_io import read_csv
 
 def test_extract_fields():
     text = "Vendor: Acme Supplies\nDate: 2024-01-15\nTotal Amount: $1,250.00"
@@ -10,3 +12,103 @@ def test_extract_fields():
     assert fields["vendor"] == "Acme Supplies"
     assert fields["date"] == "2024-01-15"
     assert fields["total_amount"] == "1,250.00"
+
+def test_process_invoices_parallel_txt(tmp_path):
+    for i in range(6):
+        (tmp_path / f"inv_{i}.txt").write_text(f"Vendor: Vendor {i}\nDate: 2024-01-0{i + 1}\nTotal Amount: ${i}00.00\n")
+    (tmp_path / "notes.md").write_text("ignored")
+    out = tmp_path / "out.csv"
+    invoice_processor.process_invoices(str(tmp_path), str(out), workers=2, max_pages_in_flight=2)
+    rows = read_csv(str(out))
+    assert sorted(r["filename"] for r in rows) == [f"inv_{i}.txt" for i in range(6)]
+    assert {r["vendor"] for r in rows} == {f"Vendor {i}" for i in range(6)}
+
+def test_pdf_pages_are_rasterized_one_at_a_time(tmp_path, monkeypatch):
+    requested = []
+
+    def fake_convert(path, first_page=None, last_page=None):
+        requested.append((first_page, last_page))
+        return [f"page{first_page}"]
+
+    texts = {"page1": "Vendor: Acme\n", "page2": "Date: 2024-01-15\n", "page3": "Total Amount: $5.00\n"}
+    monkeypatch.setattr(invoice_processor, "pdf_page_count", lambda path: 3)
+    monkeypatch.setattr(invoice_processor, "convert_from_path", fake_convert)
+    monkeypatch.setattr(invoice_processor.pytesseract, "image_to_string", lambda img: texts[img])
+    (tmp_path / "scan.pdf").write_bytes(b"%PDF-1.4")
+    out = tmp_path / "out.csv"
+    invoice_processor.process_invoices(str(tmp_path), str(out), workers=1)
+    assert sorted(requested) == [(1, 1), (2, 2), (3, 3)]
+    assert read_csv(str(out)) == [{"filename": "scan.pdf", "vendor": "Acme", "date": "2024-01-15", "total_amount": "5.00", "method": "ocr"}]
+
+def test_pdf_without_pages_is_reported_as_failed(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(invoice_processor, "pdf_page_count", lambda path: 0)
+    (tmp_path / "empty.pdf").write_bytes(b"%PDF-1.4")
+    (tmp_path / "inv.txt").write_text("Vendor: Acme\n")
+    out = tmp_path / "out.csv"
+    invoice_processor.process_invoices(str(tmp_path), str(out), workers=1)
+    assert [r["filename"] for r in read_csv(str(out))] == ["inv.txt"]
+    output = capsys.readouterr().out
+    assert "empty.pdf has no pages" in output and "1 invoices failed" in output
+
+def test_process_invoices_incremental_manifest(tmp_path, monkeypatch):
+    invoices = tmp_path / "invoices"
+    invoices.mkdir()
+    for i in range(3):
+        (invoices / f"inv_{i}.txt").write_text(f"Vendor: Vendor {i}\nTotal Amount: $10.00\n")
+    out = tmp_path / "out.csv"
+    processed = []
+    real_ocr_page = invoice_processor.ocr_page
+
+    def counting_ocr_page(path, page=None):
+        processed.append(os.path.basename(path))
+        return real_ocr_page(path, page)
+
+    monkeypatch.setattr(invoice_processor, "ocr_page", counting_ocr_page)
+    invoice_processor.process_invoices(str(invoices), str(out), workers=1)
+    assert sorted(processed) == ["inv_0.txt", "inv_1.txt", "inv_2.txt"]
+    assert (tmp_path / "out.manifest.jsonl").exists()
+
+    processed.clear()
+    (invoices / "inv_1.txt").write_text("Vendor: Changed Vendor\nTotal Amount: $99.00\n")
+    (invoices / "inv_3.txt").write_text("Vendor: New Vendor\n")
+    invoice_processor.process_invoices(str(invoices), str(out), workers=1)
+    assert sorted(processed) == ["inv_1.txt", "inv_3.txt"]
+    rows = {r["filename"]: r for r in read_csv(str(out))}
+    assert len(rows) == 4
+    assert rows["inv_0.txt"]["vendor"] == "Vendor 0"
+    assert rows["inv_1.txt"]["vendor"] == "Changed Vendor"
+
+    processed.clear()
+    invoice_processor.process_invoices(str(invoices), str(out), workers=1, force=True)
+    assert len(processed) == 4
+
+def test_text_layer_fast_path_skips_ocr_for_born_digital_pages(tmp_path, monkeypatch):
+    pytest.importorskip("pdfplumber")
+    canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+    pdf_path = tmp_path / "digital.pdf"
+    c = canvas.Canvas(str(pdf_path))
+    c.drawString(72, 750, "Vendor: Digital Supplies Co")
+    c.drawString(72, 730, "Date: 2024-03-01")
+    c.drawString(72, 710, "Total Amount: $2,500.00")
+    c.showPage()
+    c.showPage()  # blank second page has no text layer
+    c.save()
+    ocr_calls = []
+
+    def fake_ocr_page(path, page=None):
+        ocr_calls.append(page)
+        return ""
+
+    monkeypatch.setattr(invoice_processor, "pdf_page_count", lambda path: 2)
+    monkeypatch.setattr(invoice_processor, "ocr_page", fake_ocr_page)
+    fields = invoice_processor.process_invoice_file(str(pdf_path))
+    assert fields["vendor"] == "Digital Supplies Co"
+    assert fields["total_amount"] == "2,500.00"
+    assert fields["method"] == "mixed"
+    assert ocr_calls == [2]
+
+def test_is_usable_text():
+    assert invoice_processor.is_usable_text("Vendor: Acme Supplies\nTotal Amount: $10.00")
+    assert not invoice_processor.is_usable_text("   ")
+    assert not invoice_processor.is_usable_text("(cid:12)(cid:34)(cid:56)(cid:78)(cid:90)")
+    assert not invoice_processor.is_usable_text("~~~ ### ~~~ ### ~~~ ### ~~~")
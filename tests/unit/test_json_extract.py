@@ -0,0 +1,99 @@
+"""
+Test for utils/json_extract.py
+"""
+import json
+import random
+import pytest
+from utils.json_extract import (
+    JsonExtractionError, check_schema, extract_json, parse_json, scan_json_values
+)
+
+SENTIMENT = {"sentiment": "positive", "reasoning": "Says {great} service, \"really\" [fast]."}
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(SENTIMENT),
+    "```json\n" + json.dumps(SENTIMENT) + "\n```",
+    "```\n" + json.dumps(SENTIMENT, indent=2) + "\n```\nLet me know if you need more.",
+    "Sure! Here is the JSON: " + json.dumps(SENTIMENT) + " Hope this helps {:",
+    "Notes: a) ok] b} " + json.dumps(SENTIMENT),
+])
+def test_extracts_object_from_common_llm_wrappings(text):
+    assert extract_json(text) == SENTIMENT
+
+
+def test_raw_newlines_inside_strings_are_accepted():
+    assert extract_json('{"plain": "Hi there!\n\nBye", "n": 1}') == {"plain": "Hi there!\n\nBye", "n": 1}
+
+
+def test_arrays_and_multiple_values():
+    assert extract_json('Result: [{"id": 1}, {"id": 2}] done') == [{"id": 1}, {"id": 2}]
+    result = parse_json('Example: {"sentiment": 1}\nAnswer: {"sentiment": "neutral", "reasoning": "meh"}',
+                        {"sentiment": str, "reasoning": str})
+    assert result.ok and result.value == {"sentiment": "neutral", "reasoning": "meh"}
+    assert len(result.values) == 2
+    assert scan_json_values('{"a": 1} junk {oops} [2, 3]') == [{"a": 1}, [2, 3]]
+
+
+def test_truncated_output_is_closed_off():
+    result = parse_json('{"summary": "Order 5 boxes", "email": "Dear supplier, please send')
+    assert result.repaired
+    assert result.value == {"summary": "Order 5 boxes", "email": "Dear supplier, please send"}
+    assert scan_json_values('[1, 2', repair_truncated=False) == []
+
+
+def test_schema_check_and_errors():
+    assert check_schema([{"id": 1}], [{"id": int}]) is None
+    assert check_schema({"id": "1"}, {"id": int}) == "$.id: expected int, got str"
+    assert check_schema({}, {"id": int}) == "$: missing key 'id'"
+    assert check_schema({"tone": "mixed"}, {"tone": frozenset({"positive", "negative"})}) == (
+        "$.tone: expected one of 'negative', 'positive', got 'mixed'")
+    assert check_schema(1, frozenset({True})) is not None
+    result = parse_json('{"subject": "Hi"}', {"subject": str, "plain": str})
+    assert not result.ok and result.value is None and result.error == "$: missing key 'plain'"
+    assert extract_json("no json here", default=[]) == []
+    with pytest.raises(JsonExtractionError):
+        extract_json("no json here")
+    with pytest.raises(ValueError):
+        extract_json('{"id": "x"}', {"id": int})
+
+
+def _mutate(text, rng):
+    """One random corruption typical of LLM output."""
+    choice = rng.randrange(6) if text else 3
+    if choice == 0:
+        return text[:rng.randrange(len(text) + 1)]
+    if choice == 1:
+        i = rng.randrange(len(text) + 1)
+        return text[:i] + rng.choice('{}[]"\\,:') + text[i:]
+    if choice == 2:
+        i = rng.randrange(len(text))
+        return text[:i] + text[i + 1:]
+    if choice == 3:
+        return rng.choice(["", "Sure: ", "```json\n", "{note} "]) + text + rng.choice(["", "\n```", " }", " [end"])
+    if choice == 4:
+        return text.replace('"', "'", 1)
+    return "".join(rng.choice('{}[]"\\:, ab\n') for _ in range(rng.randrange(40)))
+
+
+def test_fuzz_never_raises_unexpected_errors():
+    rng = random.Random(1234)
+    base = [json.dumps(SENTIMENT), json.dumps([SENTIMENT, {"id": 2}]), '{"a": {"b": [1, {"c": "}]"}]}}']
+    for _ in range(3000):
+        text = rng.choice(base)
+        for _ in range(rng.randrange(1, 4)):
+            text = _mutate(text, rng)
+        result = parse_json(text, {"sentiment": str})
+        assert result.ok == (result.value is not None)
+        assert all(check_schema(v, (dict, list, str, int, float, bool, type(None))) is None for v in result.values)
+        assert extract_json(text, default=None) is None or result.values
+
+
+def test_fuzz_recovers_intact_value_from_noise():
+    rng = random.Random(99)
+    noise = "abc {} [] ]} \"' :,\n"
+    for _ in range(500):
+        payload = {"id": rng.randrange(1000), "text": "".join(rng.choice(noise) for _ in range(10))}
+        prefix = "".join(rng.choice("abc :,.\n]}") for _ in range(rng.randrange(20)))
+        suffix = "".join(rng.choice(noise) for _ in range(rng.randrange(20)))
+        assert extract_json(prefix + json.dumps(payload) + suffix, {"id": int, "text": str}) == payload
@@ -0,0 +1,70 @@
+"""
+Test for utils/lazy_import.py and lazy configuration in utils/config.py
+"""
+import os
+import subprocess
+import sys
+import pytest
+from utils import config
+from utils.lazy_import import lazy_import
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+def test_lazy_import_defers_until_attribute_access(tmp_path):
+    (tmp_path / "probe_module.py").write_text("print('executed')\nVALUE = 1\n")
+    code = (
+        "from utils.lazy_import import lazy_import; "
+        "m = lazy_import('probe_module'); print('imported'); print(m.VALUE)"
+    )
+    env = dict(os.environ, PYTHONPATH=f"{ROOT}{os.pathsep}{tmp_path}")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert result.stdout.split() == ["imported", "executed", "1"], result.stderr
+
+def test_missing_package_raises_on_first_use():
+    missing = lazy_import("surely_not_an_installed_package")
+    assert not missing
+    with pytest.raises(ImportError, match="not installed"):
+        missing.anything
+
+@pytest.mark.parametrize("module, heavy", [
+    ("analytics.sales_forecast", ["pandas", "matplotlib", "sklearn"]),
+    ("automation.report_generator", ["pandas", "reportlab"]),
+    ("operations.invoice_processor", ["pytesseract", "pandas"]),
+])
+def test_cli_modules_import_without_heavy_dependencies(module, heavy):
+    # A package that actually ran has loaded its submodules; a deferred one has none yet
+    code = f"import sys, {module}; print(','.join(m for m in {heavy!r} if any(k.startswith(m + '.') for k in sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_config_resolves_key_at_first_use(monkeypatch):
+    monkeypatch.setattr(config, "_loaded", True)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert config.get_openai_api_key(required=False) is None
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        config.get_openai_api_key()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-later")
+    from utils.config import OPENAI_API_KEY
+    assert OPENAI_API_KEY == "sk-later"
+
+
+def test_settings_read_at_import_or_first_use_come_from_env_file(monkeypatch):
+    import types
+    from utils import llm_cache
+    from analytics.model_cache import ModelCache
+    from customer_service.faq_matcher import FaqMatcher
+
+    def fake_load_dotenv():
+        monkeypatch.setenv("LLM_CACHE", "off")
+        monkeypatch.setenv("FAQ_MATCH_THRESHOLD", "0.5")
+        monkeypatch.setenv("FORECAST_MODEL_CACHE", ":memory:")
+
+    monkeypatch.setitem(sys.modules, "dotenv", types.SimpleNamespace(load_dotenv=fake_load_dotenv))
+    monkeypatch.setattr(config, "_loaded", False)
+    for name in ("LLM_CACHE", "FAQ_MATCH_THRESHOLD", "FORECAST_MODEL_CACHE"):
+        monkeypatch.delenv(name, raising=False)
+    llm_cache.reset()
+    assert not llm_cache._is_enabled()
+    assert FaqMatcher([]).threshold == 0.5
+    assert ModelCache().path == ":memory:"
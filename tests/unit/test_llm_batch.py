@@ -0,0 +1,67 @@
+"""
+Test for utils/llm_batch.py
+"""
+import pytest
+from utils import llm_batch
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_call_with_retries_retries_429(monkeypatch):
+    monkeypatch.setattr(llm_batch.time, "sleep", lambda s: None)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeStatusError(429)
+        return "ok"
+
+    assert llm_batch.call_with_retries(flaky, max_retries=5) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_with_retries_does_not_retry_client_errors(monkeypatch):
+    monkeypatch.setattr(llm_batch.time, "sleep", lambda s: None)
+    attempts = []
+
+    def bad_request():
+        attempts.append(1)
+        raise FakeStatusError(400)
+
+    with pytest.raises(FakeStatusError):
+        llm_batch.call_with_retries(bad_request, max_retries=5)
+    assert len(attempts) == 1
+
+
+def test_run_batch_preserves_order():
+    results = llm_batch.run_batch(lambda x: x * 2, range(50), concurrency=8)
+    assert results == [x * 2 for x in range(50)]
+
+
+def test_run_batch_is_the_only_retry_layer(monkeypatch, fake_openai_server):
+    import openai
+    from utils import openai_client
+    monkeypatch.setattr(llm_batch.time, "sleep", lambda s: None)
+    openai_client.configure(max_retries=2)
+    fake_openai_server.responder = lambda body: (503, {"error": {"message": "busy"}})
+
+    def ask(item):
+        return openai_client.chat_completion("gpt-4o", [{"role": "user", "content": item}])
+
+    with pytest.raises(openai.InternalServerError):
+        llm_batch.run_batch(ask, ["hi"], max_retries=2)
+    # max_retries + 1 HTTP attempts, not (max_retries + 1) x (SDK retries + 1)
+    assert len(fake_openai_server.requests) == 3
+
+
+def test_token_bucket_throttles():
+    bucket = llm_batch.TokenBucket(rate_per_minute=600, capacity=1)
+    start = llm_batch.time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert llm_batch.time.monotonic() - start >= 0.15
@@ -0,0 +1,59 @@
+"""
+Test for utils/llm_cache.py
+"""
+import pytest
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+
+def test_cached_chat_completion_hits_after_first_call(fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("hello"))
+    messages = [{"role": "user", "content": "Say hello"}]
+    assert llm_cache.cached_chat_completion("chatbot", "gpt-4o", messages, 10) == "hello"
+    assert llm_cache.cached_chat_completion("chatbot", "gpt-4o", messages, 10) == "hello"
+    assert len(fake_openai_server.requests) == 1
+    assert llm_cache.get_stats()["chatbot"] == {"hits": 1, "misses": 1}
+    # A different max_tokens is a different key
+    llm_cache.cached_chat_completion("chatbot", "gpt-4o", messages, 20)
+    assert len(fake_openai_server.requests) == 2
+
+
+def test_module_opt_out(fake_openai_server, monkeypatch):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("fresh"))
+    messages = [{"role": "user", "content": "Write an email"}]
+    llm_cache.disable_for("email_generator")
+    monkeypatch.setenv("LLM_CACHE_DISABLED", "report_generator")
+    for module in ("email_generator", "email_generator", "report_generator", "report_generator"):
+        llm_cache.cached_chat_completion(module, "gpt-4o", messages, 10)
+    assert len(fake_openai_server.requests) == 4
+    assert llm_cache.get_stats() == {}
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "ttl.sqlite"), ttl_seconds=60)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 61)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(clock)))
+    cache = LLMCache(str(tmp_path / "lru.sqlite"), ttl_seconds=0, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "b" is now least recently used
+    cache.set("c", "3")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_make_key_depends_on_model_and_messages():
+    msgs = [{"role": "user", "content": "hi"}]
+    assert LLMCache.make_key("gpt-4o", msgs, 10) == LLMCache.make_key("gpt-4o", list(msgs), 10)
+    assert LLMCache.make_key("gpt-4o", msgs, 10) != LLMCache.make_key("gpt-4o-mini", msgs, 10)
+    assert LLMCache.make_key("gpt-4o", msgs, 10) != LLMCache.make_key("gpt-4o", [{"role": "user", "content": "hey"}], 10)
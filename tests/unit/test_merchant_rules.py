@@ -0,0 +1,30 @@
+"""
+Test for finance/merchant_rules.py
+"""
+import pytest
+from finance.merchant_rules import MerchantRules, normalize_description
+
+
+def test_normalize_description():
+    assert normalize_description("SHELL OIL 1234") == "SHELL OIL"
+    assert normalize_description("Shell Oil #5678 06/01") == "SHELL OIL"
+    assert normalize_description("AMAZON MKTPLACE PMTS*2K3LJ9") == "AMAZON MKTPLACE PMTS"
+    assert normalize_description("DEBIT XXXX1234 WALMART 2025-06-01") == "WALMART"
+    assert normalize_description("STARBUCKS STORE 00123") == "STARBUCKS"
+    assert normalize_description("7-ELEVEN 34567") == "7-ELEVEN"
+    assert normalize_description("") == ""
+
+
+def test_rules_lookup_and_persistence(tmp_path):
+    path = tmp_path / "rules.json"
+    rules = MerchantRules(str(path))
+    rules.learn("AMAZON", "Supplies")
+    rules.add_prefix_rule("UBER", "Travel")
+    rules.save()
+    loaded = MerchantRules(str(path))
+    assert loaded.lookup("AMAZON") == ("Supplies", "rule_exact")
+    # Learned answers are exact-only; only explicit prefix rules cover longer names
+    assert loaded.lookup("AMAZON PRIME VIDEO") == (None, None)
+    assert loaded.lookup("UBER TRIP HELP") == ("Travel", "rule_prefix")
+    assert loaded.lookup("AMAZON WEB SERVICES") == (None, None)
+    assert len(loaded) == 2
@@ -0,0 +1,22 @@
+"""
+Test for utils/metrics.py
+"""
+from utils.metrics import LatencyRecorder, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_recorder_window():
+    recorder = LatencyRecorder(window=10)
+    for ms in range(100):
+        recorder.record("llm", float(ms))
+    recorder.record("exact", 0.5)
+    snapshot = recorder.snapshot()
+    assert snapshot["llm"]["count"] == 100
+    assert snapshot["llm"]["p50_ms"] == 94.0
+    assert snapshot["exact"] == {"count": 1, "p50_ms": 0.5, "p99_ms": 0.5}
@@ -0,0 +1,38 @@
+"""
+Test for analytics/model_cache.py
+"""
+import numpy as np
+from analytics.model_cache import CachedModel, ModelCache, classify, fingerprint, report
+
+DATES = np.arange("2024-01-01", "2024-01-11", dtype="datetime64[D]")
+VALUES = np.arange(10, dtype=float)
+
+
+def _entry(n, fitted_n=None):
+    state = {"params": [0.1], "fitted_n": fitted_n if fitted_n is not None else n}
+    return CachedModel("arima:1,1,1", "S1", n, fingerprint(DATES[:n], VALUES[:n]), state)
+
+
+def test_classify_by_history_prefix():
+    assert classify(None, DATES, VALUES) == "miss"
+    assert classify(_entry(10), DATES, VALUES) == "hit"
+    assert classify(_entry(8), DATES, VALUES, refit_every=5) == "append"
+    assert classify(_entry(8, fitted_n=4), DATES, VALUES, refit_every=5) == "warm_start"
+    assert classify(_entry(8), DATES, VALUES, can_append=False) == "warm_start"
+    restated = VALUES.copy()
+    restated[2] += 1
+    assert classify(_entry(8), DATES, restated) == "refit"
+    assert classify(_entry(10), DATES[:9], VALUES[:9]) == "refit"
+
+
+def test_store_round_trip_and_report(tmp_path):
+    cache = ModelCache(str(tmp_path / "models.sqlite"))
+    cache.put(_entry(10))
+    assert cache.get("arima:1,1,1", "S1") == _entry(10)
+    assert cache.get("prophet", "S1") is None
+    assert list(cache.get_many("arima:1,1,1", ["S1", "S2"])) == ["S1"]
+    cache.clear("arima:1,1,1")
+    assert len(cache) == 0
+    assert report(["hit", "append", "miss", "refit"]) == {
+        "hit": 1, "append": 1, "warm_start": 0, "refit": 1, "miss": 1, "hit_rate": 0.5,
+    }
@@ -0,0 +1,50 @@
+"""
+Test for utils/openai_client.py
+"""
+import time
+import openai
+import pytest
+from utils import openai_client
+
+
+def test_clients_share_one_connection_pool(fake_openai_server):
+    first = openai_client.get_client()
+    assert openai_client.get_client() is first
+    other = openai_client.get_client(api_key="sk-other")
+    assert other is not first
+    assert other._client is first._client
+    assert str(first.base_url).rstrip("/") == fake_openai_server.url
+
+
+def test_chat_completion_uses_configured_base_url(fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("pong"))
+    response = openai_client.chat_completion("gpt-4o", [{"role": "user", "content": "ping"}], max_tokens=5)
+    assert response.choices[0].message.content == "pong"
+    assert fake_openai_server.requests[0]["max_tokens"] == 5
+
+
+def test_per_call_timeout(fake_openai_server):
+    def slow(body):
+        time.sleep(1)
+        return 200, fake_openai_server.completion("late")
+
+    fake_openai_server.responder = slow
+    with pytest.raises(openai.APITimeoutError):
+        openai_client.chat_completion("gpt-4o", [{"role": "user", "content": "ping"}], timeout=0.2)
+
+
+def test_configure_replaces_pool(fake_openai_server):
+    first = openai_client.get_client()
+    openai_client.configure(max_connections=5)
+    assert openai_client.get_client() is not first
+
+
+def test_per_call_max_retries(fake_openai_server):
+    fake_openai_server.responder = lambda body: (500, {"error": {"message": "boom"}})
+    with pytest.raises(openai.InternalServerError):
+        openai_client.chat_completion("gpt-4o", [{"role": "user", "content": "ping"}], max_retries=1)
+    assert len(fake_openai_server.requests) == 2
+    openai_client.configure(max_retries=3)
+    with pytest.raises(openai.InternalServerError):
+        openai_client.chat_completion("gpt-4o", [{"role": "user", "content": "ping"}], max_retries=0)
+    assert len(fake_openai_server.requests) == 3
@@ -12,3 +12,128 @@ def test_load_sales_data():
     assert 'sales' in df.columns
     assert pd.api.types.is_datetime64_any_dtype(df['date'])
     assert pd.api.types.is_numeric_dtype(df['sales'])
+
+def _long_frame(lengths, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    parts = []
+    for i, n in enumerate(lengths):
+        dates = pd.date_range("2024-01-01", periods=n)
+        sales = 100 + (i + 1) * np.arange(n) + rng.normal(0, 2, n)
+        parts.append(pd.DataFrame({"sku": f"S{i}", "date": dates.strftime("%Y-%m-%d"), "sales": sales.round(2).astype(str)}))
+    return pd.concat(parts, ignore_index=True)
+
+def test_linear_batch_matches_per_series_regression():
+    import numpy as np
+    from sklearn.linear_model import LinearRegression
+    frame = _long_frame([5, 12, 30])
+    result = sales_forecast.forecast_batch(frame, periods=4, series_col="sku")
+    assert result.failures.empty
+    assert list(result.forecasts.columns) == ["series_id", "date", "yhat", "yhat_lower", "yhat_upper", "method"]
+    for sku, group in frame.groupby("sku"):
+        dates = pd.to_datetime(group["date"])
+        X = dates.map(pd.Timestamp.toordinal).to_numpy().reshape(-1, 1)
+        model = LinearRegression().fit(X, group["sales"].astype(float))
+        future = [dates.iloc[-1] + pd.Timedelta(days=i) for i in range(1, 5)]
+        expected = model.predict(np.array([d.toordinal() for d in future]).reshape(-1, 1))
+        got = result.forecasts[result.forecasts["series_id"] == sku]
+        assert list(got["date"]) == future
+        assert np.allclose(got["yhat"], expected)
+
+def test_batch_captures_failures_and_falls_back_for_short_series():
+    pytest.importorskip("statsmodels")
+    frame = _long_frame([1, 4, 15, 15])
+    frame.loc[len(frame)] = ["S9", "not a date", "10"]
+    result = sales_forecast.forecast_batch(frame, periods=3, method="arima", series_col="sku", workers=2, chunk_size=1)
+    methods = result.forecasts.groupby("series_id")["method"].first().to_dict()
+    assert methods == {"S1": "linear", "S2": "arima", "S3": "arima"}
+    assert (result.forecasts.groupby("series_id").size() == 3).all()
+    assert dict(zip(result.failures["series_id"], result.failures["error"])) == {
+        "S9": "no valid observations",
+        "S0": "needs at least 10 observations, has 1",
+    }
+    strict = sales_forecast.forecast_batch(frame, periods=3, method="arima", series_col="sku", workers=1, fallback=None)
+    assert set(strict.failures["series_id"]) == {"S0", "S1", "S9"}
+
+def test_batch_model_cache_reuses_and_updates_fits(tmp_path):
+    pytest.importorskip("statsmodels")
+    from analytics.model_cache import ModelCache
+    cache = ModelCache(str(tmp_path / "models.sqlite"))
+    frame = _long_frame([15, 15])
+
+    def run(data, **options):
+        return sales_forecast.forecast_batch(data, periods=3, method="arima", series_col="sku", workers=1, cache=cache, **options)
+
+    first = run(frame)
+    assert first.cache_report["miss"] == 2
+    again = run(frame)
+    assert again.cache_report["hit"] == 2 and again.cache_report["hit_rate"] == 1.0
+    pd.testing.assert_frame_equal(first.forecasts, again.forecasts)
+
+    grown = pd.concat([frame, pd.DataFrame({"sku": ["S0", "S1"], "date": ["2024-01-16"] * 2, "sales": ["130", "140"]})])
+    appended = run(grown)
+    assert appended.cache_report["append"] == 2
+    assert (appended.forecasts["date"].min() == pd.Timestamp("2024-01-17"))
+
+    restated = grown.copy()
+    restated.loc[restated["sku"] == "S0", "sales"] = "100"
+    grown_more = pd.concat([restated, pd.DataFrame({"sku": ["S1"], "date": ["2024-01-17"], "sales": ["141"]})])
+    mixed = run(grown_more, refit_every=1)
+    assert mixed.cache_report["refit"] == 1 and mixed.cache_report["warm_start"] == 1
+    assert mixed.failures.empty
+
+def test_forecast_series_is_numbers_only_with_prediction_intervals():
+    import numpy as np
+    sm = pytest.importorskip("statsmodels.api")
+    frame = _long_frame([20])
+    df = pd.DataFrame({"date": pd.to_datetime(frame["date"]), "sales": frame["sales"].astype(float)})
+    result = sales_forecast.forecast_series(df, periods=3, method="linear", interval=0.9)
+    assert list(result.columns) == ["date", "yhat", "yhat_lower", "yhat_upper"]
+    x = np.arange(-19, 1, dtype=float)
+    expected = sm.OLS(df["sales"].to_numpy(), sm.add_constant(x)).fit().get_prediction(sm.add_constant(np.arange(1.0, 4.0))).summary_frame(alpha=0.1)
+    assert np.allclose(result["yhat_lower"], expected["obs_ci_lower"])
+    assert np.allclose(result["yhat_upper"], expected["obs_ci_upper"])
+    arima = sales_forecast.forecast_series(df, periods=3, method="arima")
+    assert (arima["yhat_lower"] < arima["yhat"]).all() and (arima["yhat"] < arima["yhat_upper"]).all()
+    assert list(arima["date"]) == list(result["date"])
+    with pytest.raises(ValueError):
+        sales_forecast.forecast_series(df, method="linear", interval=95)
+
+def test_plots_are_optional_and_leave_no_open_figures(tmp_path):
+    import io
+    import matplotlib.pyplot as plt
+    df = sales_forecast.load_sales_data("data/sample_sales.csv")
+    open_figures = plt.get_fignums()
+    forecast, plot = sales_forecast.forecast_linear_regression(df, periods=3)
+    assert plot is None and len(forecast) == 3
+    for _ in range(20):
+        buffer = io.BytesIO()
+        assert sales_forecast.forecast_linear_regression(df, periods=3, plot_to=buffer)[1] is buffer
+        assert buffer.getvalue().startswith(b"\x89PNG")
+    path = str(tmp_path / "linear.svg")
+    sales_forecast.forecast_linear_regression(df, periods=3, plot_to=path)
+    assert open(path).read().lstrip().startswith("<?xml")
+    assert plt.get_fignums() == open_figures
+
+def test_prophet_warm_start_only_when_parameter_shapes_match():
+    from types import SimpleNamespace
+    fresh = SimpleNamespace(n_changepoints=25, changepoint_range=0.8, seasonalities={},
+                            weekly_seasonality="auto", yearly_seasonality="auto", daily_seasonality="auto")
+    days = lambda n: pd.date_range("2024-01-01", periods=n).to_numpy()
+    # 12 -> 13 points moves n_changepoints from 8 to 9; 13 -> 14 days turns on weekly seasonality
+    assert not sales_forecast._warm_start_compatible(SimpleNamespace(n_changepoints=8, seasonalities={}), fresh, days(13))
+    assert sales_forecast._warm_start_compatible(SimpleNamespace(n_changepoints=9, seasonalities={}), fresh, days(13))
+    assert not sales_forecast._warm_start_compatible(SimpleNamespace(n_changepoints=10, seasonalities={}), fresh, days(15))
+    assert sales_forecast._warm_start_compatible(SimpleNamespace(n_changepoints=25, seasonalities={"weekly": {}}), fresh, days(60))
+
+def test_prophet_cache_survives_history_that_changes_model_shape(tmp_path):
+    pytest.importorskip("prophet")
+    from analytics.model_cache import ModelCache
+    cache = ModelCache(str(tmp_path / "models.sqlite"))
+    frame = _long_frame([12])
+    first = sales_forecast.forecast_batch(frame, periods=3, method="prophet", series_col="sku", workers=1, cache=cache)
+    assert first.failures.empty
+    for day in ("2024-01-13", "2024-01-14", "2024-01-15"):
+        frame = pd.concat([frame, pd.DataFrame({"sku": ["S0"], "date": [day], "sales": ["120"]})], ignore_index=True)
+        grown = sales_forecast.forecast_batch(frame, periods=3, method="prophet", series_col="sku", workers=1, cache=cache)
+        assert grown.failures.empty and grown.cache_report["append"] == 1
@@ -0,0 +1,67 @@
+"""
+Test for operations/scheduling_engine.py
+"""
+import pytest
+from operations.scheduling_engine import Resource, SchedulingEngine, Service, build_engine
+from utils.time_slots import parse_hours_spec, parse_time_range
+
+WEEKDAYS_9_TO_5 = parse_hours_spec("Mon-Fri 9am-5pm")
+
+
+def make_engine(holidays=None):
+    resources = [
+        Resource("ann", "staff", "Main Store", frozenset({"Consultation"}), WEEKDAYS_9_TO_5),
+        Resource("ben", "staff", "Eastside Branch", frozenset({"Consultation", "Repair"}), parse_hours_spec("Mon-Sat 10am-2pm")),
+        Resource("room", "room", "Main Store", frozenset({"Repair"}), WEEKDAYS_9_TO_5),
+    ]
+    services = [Service("Consultation", 30), Service("Repair", 60, buffer_minutes=15)]
+    return SchedulingEngine(resources, services, holidays, step_minutes=15)
+
+
+def test_parse_hours_spec():
+    hours = parse_hours_spec("Mon-Fri 8am-6pm; Sat 9am-3pm")
+    assert hours[0] == [(480, 1080)] and hours[4] == [(480, 1080)]
+    assert hours[5] == [(540, 900)]
+    assert 6 not in hours
+    assert parse_time_range("12pm-12:30pm") == (720, 750)
+
+
+def test_first_available_across_resources():
+    engine = make_engine()
+    engine.add_booking("ann", "2025-09-02", "09:00", "10:00")
+    slots = engine.first_available("Consultation", n=3, start_date="2025-09-02")
+    assert slots == [
+        ("2025-09-02", "10:00", "10:30", "ann"),
+        ("2025-09-02", "10:00", "10:30", "ben"),
+        ("2025-09-02", "10:15", "10:45", "ann"),
+    ]
+    assert engine.first_available("Consultation", n=1, start_date="2025-09-02", location="Eastside Branch")[0][3] == "ben"
+
+
+def test_buffers_and_durations():
+    engine = make_engine()
+    engine.add_booking("room", "2025-09-02", "09:00", "10:00")
+    slots = engine.bulk_availability("Repair", start_date="2025-09-02", days_ahead=1, resource_ids=["room"])["room"]
+    # 15 minute buffer after the booking, 60 minute service must end by 17:00
+    assert slots[0] == ("2025-09-02", "10:15", "11:15")
+    assert slots[-1] == ("2025-09-02", "16:00", "17:00")
+
+
+def test_holiday_closures_and_special_hours():
+    holidays = [
+        {"holiday": "Closed Day", "date": "2025-09-02", "is_open": "No", "special_hours": ""},
+        {"holiday": "Short Day", "date": "2025-09-03", "is_open": "Yes", "special_hours": "10am-12pm"},
+    ]
+    engine = make_engine(holidays)
+    availability = engine.bulk_availability("Consultation", start_date="2025-09-02", days_ahead=2)
+    assert not any(d == "2025-09-02" for d, _, _ in availability["ann"])
+    ann_short_day = [s for d, s, _ in availability["ann"] if d == "2025-09-03"]
+    assert ann_short_day[0] == "10:00" and ann_short_day[-1] == "11:30"
+
+
+def test_build_engine_from_sample_data():
+    engine = build_engine(bookings_csv="data/sample_resource_bookings.csv")
+    slots = engine.first_available("Repair Service", n=2, start_date="2025-09-02")
+    assert slots[0] == ("2025-09-02", "12:15", "13:45", "bob")
+    # Thanksgiving (2025-11-27) is closed everywhere
+    assert engine.first_available("Training Session", n=1, start_date="2025-11-27")[0][0] == "2025-11-28"
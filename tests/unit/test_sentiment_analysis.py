@@ -1,8 +1,10 @@
 """
 Test for customer_service/sentiment_analysis.py
 """
+import json
 import pytest
 from customer_service import sentiment_analysis
+from utils import openai_client
 
 def test_analyze_sentiment(monkeypatch):
     class MockResponse:
@@ -10,7 +12,77 @@ def test_analyze_sentiment(monkeypatch):
             def __init__(self):
                 self.message = type('msg', (), {'content': '{"sentiment": "positive", "reasoning": "The message is friendly."}'})
         choices = [Choice()]
-    monkeypatch.setattr(sentiment_analysis.openai.ChatCompletion, "create", lambda *a, **kw: MockResponse())
+    monkeypatch.setattr(openai_client, "chat_completion", lambda *a, **kw: MockResponse())
     result = sentiment_analysis.analyze_sentiment("Great service!")
     assert result["sentiment"] == "positive"
     assert "reasoning" in result
+
+def test_analyze_csv_concurrent_preserves_order(tmp_path, fake_openai_server):
+    calls = {"n": 0}
+
+    def responder(body):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+        text = body["messages"][1]["content"]
+        return 200, fake_openai_server.completion('{"sentiment": "positive", "reasoning": "%s"}' % text)
+
+    fake_openai_server.responder = responder
+    input_csv = tmp_path / "reviews.csv"
+    input_csv.write_text("id,text\n" + "".join(f"{i},review {i}\n" for i in range(20)))
+    output_csv = tmp_path / "out.csv"
+    results = sentiment_analysis.analyze_csv(str(input_csv), output_csv=str(output_csv), concurrency=4, rpm=6000)
+    assert [r["reasoning"] for r in results] == [f"review {i}" for i in range(20)]
+    assert len(fake_openai_server.requests) == 21
+    assert output_csv.read_text().splitlines()[0] == "id,text,sentiment,reasoning"
+
+def test_packed_parses_fenced_array_and_tolerates_garbage(fake_openai_server):
+    content = '```json\n[{"id": 1, "sentiment": "positive", "reasoning": "ok"}]\n```'
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion(content))
+    assert sentiment_analysis.analyze_sentiment_packed(["Great!"]) == [{"sentiment": "positive", "reasoning": "ok"}]
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("[not json"))
+    assert sentiment_analysis.analyze_sentiment_packed(["Meh."]) == [None]
+
+def test_analyze_csv_packed_falls_back_for_missing_ids(tmp_path, fake_openai_server):
+    def responder(body):
+        user = body["messages"][1]["content"]
+        if body["messages"][0]["content"] == sentiment_analysis.SENTIMENT_BATCH_PROMPT:
+            lines = user.splitlines()
+            # Drop the second item to force a per-item fallback
+            items = [{"id": i, "sentiment": "neutral", "reasoning": line.split(". ", 1)[1]}
+                     for i, line in enumerate(lines, start=1) if i != 2]
+            return 200, fake_openai_server.completion(json.dumps(items))
+        return 200, fake_openai_server.completion('{"sentiment": "negative", "reasoning": "%s"}' % user)
+
+    fake_openai_server.responder = responder
+    input_csv = tmp_path / "reviews.csv"
+    input_csv.write_text("text\n" + "".join(f"review {i}\n" for i in range(10)))
+    results = sentiment_analysis.analyze_csv(str(input_csv), pack_size=5)
+    assert [r["reasoning"] for r in results] == [f"review {i}" for i in range(10)]
+    assert results[1]["sentiment"] == "negative" and results[6]["sentiment"] == "negative"
+    assert results[0]["sentiment"] == "neutral"
+    # Two packed calls plus one fallback call per dropped item
+    assert len(fake_openai_server.requests) == 4
+
+def test_analyze_csv_streams_in_chunks(tmp_path, fake_openai_server):
+    def responder(body):
+        return 200, fake_openai_server.completion('{"sentiment": "neutral", "reasoning": "%s"}' % body["messages"][1]["content"])
+
+    fake_openai_server.responder = responder
+    input_csv = tmp_path / "reviews.csv"
+    input_csv.write_text("text\n" + "".join(f"review {i}\n" for i in range(7)))
+    output_csv = tmp_path / "out.csv"
+    results = sentiment_analysis.analyze_csv(str(input_csv), output_csv=str(output_csv), chunk_size=3, collect=False)
+    assert results == []
+    lines = output_csv.read_text().splitlines()
+    assert lines[0] == "text,sentiment,reasoning"
+    assert lines[1:] == [f"review {i},neutral,review {i}" for i in range(7)]
+
+def test_cli_writes_through_analyze_csv(tmp_path, fake_openai_server, capsys):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion('{"sentiment": "positive", "reasoning": "ok"}'))
+    input_csv = tmp_path / "reviews.csv"
+    input_csv.write_text("text\ngreat\nlovely\n")
+    output_csv = tmp_path / "out.csv"
+    sentiment_analysis.main(["--csv", str(input_csv), "--output", str(output_csv), "--chunk_size", "1"])
+    assert output_csv.read_text().splitlines() == ["text,sentiment,reasoning", "great,positive,ok", "lovely,positive,ok"]
+    assert "Processed 2 rows." in capsys.readouterr().out
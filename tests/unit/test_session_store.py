@@ -0,0 +1,80 @@
+"""
+Test for customer_service/session_store.py
+"""
+from customer_service import session_store
+from customer_service.session_store import SessionStore, SQLiteSessionBackend
+
+
+def test_history_keeps_recent_turns_and_summarizes_older_ones():
+    store = SessionStore(window_tokens=40, summary_tokens=30, compact_tokens=10)
+    for i in range(10):
+        store.append("s1", "user", f"Question number {i}. With some more detail here.")
+    history = store.history("s1")
+    assert history[0]["role"] == "system"
+    assert history[0]["content"].startswith("Summary of the earlier conversation:")
+    assert history[-1] == {"role": "user", "content": "Question number 9. With some more detail here."}
+    assert sum(len(m["content"]) for m in history[1:]) // 4 <= 40 + 10
+    assert len(history[0]["content"].split(":\n", 1)[1]) <= 30 * 4
+    # Compaction runs per batch of overflow, not per turn
+    assert 0 < store.get_stats()["compactions"] < 8
+
+
+def test_oversized_messages_are_truncated():
+    store = SessionStore(window_tokens=20)
+    store.append("s1", "user", "x" * 10_000)
+    (message,) = store.history("s1")
+    assert message["content"].endswith("...")
+    assert len(message["content"]) <= 20 * 4
+
+
+def test_idle_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: now[0])
+    store = SessionStore(idle_seconds=60)
+    store.append("old", "user", "hello")
+    now[0] += 120
+    store.append("new", "user", "hi")
+    assert len(store) == 1
+    assert store.history("old") == []
+    assert store.get_stats()["evicted_idle"] == 1
+
+
+def test_lru_eviction_caps_sessions_and_tokens():
+    store = SessionStore(max_sessions=3)
+    for session_id in ("a", "b", "c"):
+        store.append(session_id, "user", "hello")
+    store.history("a")  # touch, so b is least recently used
+    store.append("d", "user", "hello")
+    assert set(store.sessions) == {"a", "c", "d"}
+
+    store = SessionStore(max_total_tokens=50)
+    for i in range(10):
+        store.append(f"s{i}", "user", "y" * 80)
+    assert store.get_stats()["total_tokens"] <= 50
+    assert "s9" in store.sessions and "s0" not in store.sessions
+
+
+def test_history_of_unknown_sessions_stores_nothing():
+    store = SessionStore(max_sessions=10)
+    for i in range(1000):
+        assert store.history(f"new-{i}") == []
+    assert len(store) == 0
+    store.append("s1", "user", "hello")
+    assert store.history("s1") == [{"role": "user", "content": "hello"}]
+
+
+def test_sqlite_backend_persists_and_shares_sessions(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = SessionStore(max_sessions=1, backend=SQLiteSessionBackend(path))
+    first.append("a", "user", "Where are you located?")
+    first.append("b", "user", "Hello")  # evicts a from memory only
+    assert "a" not in first.sessions
+    assert first.history("a") == [{"role": "user", "content": "Where are you located?"}]
+
+    # A second worker sees and extends the same session
+    second = SessionStore(backend=SQLiteSessionBackend(path))
+    second.append("a", "assistant", "Downtown.")
+    assert [m["content"] for m in first.history("a")] == ["Where are you located?", "Downtown."]
+
+    first.clear("a")
+    assert second.history("a") == []
@@ -0,0 +1,97 @@
+"""
+Test for smallbiz/cli.py and smallbiz/worker.py
+"""
+import os
+import threading
+import time
+import pytest
+from smallbiz import cli
+from smallbiz.cli import Tool
+from smallbiz.worker import FileQueue, Job, Worker, request_socket
+
+FAKE_TOOL = '''
+import os, sys, time
+CALLS = []
+
+def main(argv=None):
+    CALLS.append(argv)
+    if argv[:1] == ["crash"]:
+        raise RuntimeError("boom")
+    if argv[:1] == ["exit"]:
+        sys.exit(int(argv[1]))
+    if argv[:1] == ["sleep"]:
+        time.sleep(float(argv[1]))
+    if argv[:1] == ["chdir"]:
+        os.chdir("/")
+    print("ran", " ".join(argv), "in", os.path.basename(os.getcwd()))
+'''
+
+
+@pytest.fixture
+def fake_tool(tmp_path, monkeypatch):
+    (tmp_path / "fake_tool.py").write_text(FAKE_TOOL)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(cli.TOOLS, "fake", Tool("fake_tool", "Test tool"))
+    import fake_tool
+    fake_tool.CALLS.clear()
+    yield fake_tool
+
+
+def test_dispatch_runs_tool_main(fake_tool, capsys):
+    assert cli.main(["fake", "a", "b"]) == 0
+    assert fake_tool.CALLS == [["a", "b"]]
+    assert "ran a b" in capsys.readouterr().out
+    assert cli.main(["fake", "exit", "3"]) == 3
+    assert cli.main(["scheduling_engine", "--help"]) == 0
+    assert "usage: smallbiz scheduling_engine" in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        cli.run_tool("nope")
+
+
+def test_fork_isolation_contains_crashes_state_and_timeouts(fake_tool, tmp_path):
+    worker = Worker(isolation="fork")
+    worker.warm_up(["fake"])
+    cwd = os.getcwd()
+    ok = worker.run(Job("fake", ["chdir"], cwd=str(tmp_path)))
+    assert ok.ok and "ran chdir in" in ok.output
+    assert os.getcwd() == cwd and fake_tool.CALLS == []  # the child's state stayed in the child
+    crashed = worker.run(Job("fake", ["crash"]))
+    assert crashed.exit_code == 1 and "RuntimeError: boom" in crashed.output
+    slow = worker.run(Job("fake", ["sleep", "5"], timeout=0.5))
+    assert slow.exit_code == 124 and "timed out" in slow.error
+    assert worker.status()["jobs"] == 3 and worker.status()["timed_out"] == 1
+
+
+def test_inline_isolation_captures_output_and_errors(fake_tool, tmp_path):
+    worker = Worker(isolation="inline")
+    result = worker.run(Job("fake", ["x"], cwd=str(tmp_path)))
+    assert result.ok and result.output.strip() == f"ran x in {tmp_path.name}"
+    assert worker.run(Job("fake", ["crash"])).exit_code == 1
+    assert worker.handle({"tool": "missing"})["exit_code"] == 2
+
+
+def test_file_queue_processes_jobs_in_order(fake_tool, tmp_path):
+    queue = FileQueue(str(tmp_path / "queue"))
+    jobs = [Job("fake", [str(i)]) for i in range(3)]
+    for job in jobs:
+        queue.submit(job)
+    assert Worker(isolation="inline").serve_queue(queue, once=True) == 3
+    assert fake_tool.CALLS == [["0"], ["1"], ["2"]]
+    assert queue.wait_result(jobs[2].id, timeout=1)["output"].startswith("ran 2")
+    assert os.listdir(queue.incoming) == [] and os.listdir(queue.running) == []
+
+
+def test_socket_worker_runs_jobs_and_reports_status(fake_tool, tmp_path):
+    path = str(tmp_path / "worker.sock")
+    worker = Worker(isolation="inline")
+    thread = threading.Thread(target=worker.serve_socket, args=(path,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    reply = request_socket(path, Job("fake", ["hello"]).to_dict(), timeout=5)
+    assert reply["exit_code"] == 0 and "ran hello" in reply["output"]
+    assert request_socket(path, {"command": "status"}, timeout=5)["jobs"] == 1
+    request_socket(path, {"command": "shutdown"}, timeout=5)
+    thread.join(5)
+    assert not thread.is_alive()
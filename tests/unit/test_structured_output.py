@@ -0,0 +1,110 @@
+"""
+Test for utils/structured_output.py
+"""
+import json
+import pytest
+from utils import structured_output
+from utils.structured_output import OutputSchema, mini_schema, structured_completion
+
+ITEM = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "qty": {"type": "integer"}},
+    "required": ["name", "qty"],
+    "additionalProperties": False,
+}
+MESSAGES = [{"role": "user", "content": "Order list"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    structured_output.reset_stats()
+    yield
+    structured_output.reset_stats()
+
+
+def test_mini_schema_mirrors_json_schema():
+    assert mini_schema(ITEM) == {"name": str, "qty": int}
+    assert mini_schema({"type": "array", "items": {"type": "number"}}) == [(int, float)]
+
+
+def test_json_schema_mode_sends_response_format(fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion('{"name": "Tape", "qty": 3}'))
+    result = structured_completion("inventory_tracker", "gpt-4o", MESSAGES, OutputSchema("order", ITEM), 50)
+    assert result.ok and result.value == {"name": "Tape", "qty": 3}
+    response_format = fake_openai_server.requests[0]["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"] == {"name": "order", "schema": ITEM, "strict": True}
+    assert structured_output.get_stats()["order"]["valid_first_try"] == 1
+
+
+def test_array_output_is_wrapped_on_the_wire_and_unwrapped(fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion('{"items": [{"name": "Tape", "qty": 3}]}'))
+    result = structured_completion("inventory_tracker", "gpt-4o", MESSAGES, OutputSchema("orders", ITEM, array=True), 50)
+    assert result.value == [{"name": "Tape", "qty": 3}]
+    schema = fake_openai_server.requests[0]["response_format"]["json_schema"]["schema"]
+    assert schema["properties"]["items"] == {"type": "array", "items": ITEM}
+
+
+def test_function_calling_mode_reads_tool_arguments(fake_openai_server):
+    def responder(body):
+        payload = fake_openai_server.completion(None)
+        payload["choices"][0]["message"]["tool_calls"] = [{
+            "id": "call_1", "type": "function",
+            "function": {"name": "order", "arguments": json.dumps({"name": "Glue", "qty": 1})},
+        }]
+        return 200, payload
+    fake_openai_server.responder = responder
+    result = structured_completion("inventory_tracker", "gpt-4o", MESSAGES, OutputSchema("order", ITEM), 50, mode="tools")
+    assert result.value == {"name": "Glue", "qty": 1}
+    body = fake_openai_server.requests[0]
+    assert body["tool_choice"] == {"type": "function", "function": {"name": "order"}}
+    assert body["tools"][0]["function"]["parameters"] == ITEM
+    assert "response_format" not in body
+
+
+def test_parse_failure_triggers_one_repair_call(fake_openai_server, isolated_llm_cache):
+    replies = iter(['{"name": "Tape"}', '{"name": "Tape", "qty": 2}'])
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion(next(replies)))
+    output = OutputSchema("order", ITEM)
+    result = structured_completion("inventory_tracker", "gpt-4o", MESSAGES, output, 50)
+    assert result.value == {"name": "Tape", "qty": 2}
+    repair = fake_openai_server.requests[1]["messages"]
+    assert repair[1] == {"role": "assistant", "content": '{"name": "Tape"}'}
+    assert "missing key 'qty'" in repair[2]["content"]
+    stats = structured_output.get_stats()["order"]
+    assert stats["valid_after_repair"] == 1 and stats["repair_calls"] == 1 and stats["valid_parse_rate"] == 1.0
+    # The unusable first reply was dropped from the cache; the repaired one is reused
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion('{"name": "Tape", "qty": 2}'))
+    assert structured_completion("inventory_tracker", "gpt-4o", MESSAGES, output, 50).ok
+    assert len(fake_openai_server.requests) == 3
+
+
+def test_out_of_enum_value_triggers_repair(fake_openai_server, isolated_llm_cache):
+    schema = {
+        "type": "object",
+        "properties": {"sentiment": {"type": "string", "enum": ["positive", "neutral", "negative"]}},
+        "required": ["sentiment"],
+        "additionalProperties": False,
+    }
+    assert mini_schema(schema) == {"sentiment": frozenset({"positive", "neutral", "negative"})}
+    replies = iter(['{"sentiment": "Positive"}', '{"sentiment": "positive"}'])
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion(next(replies)))
+    result = structured_completion("sentiment_analysis", "gpt-4o", MESSAGES, OutputSchema("sentiment", schema), 50)
+    assert result.value == {"sentiment": "positive"}
+    assert "got 'Positive'" in fake_openai_server.requests[1]["messages"][2]["content"]
+    assert structured_output.get_stats()["sentiment"]["repair_calls"] == 1
+
+
+def test_repeated_failure_is_reported_not_retried_again(fake_openai_server):
+    fake_openai_server.responder = lambda body: (200, fake_openai_server.completion("Sorry, I can't do that."))
+    result = structured_completion("inventory_tracker", "gpt-4o", MESSAGES, OutputSchema("order", ITEM), 50)
+    assert not result.ok and result.error == "no JSON value found"
+    assert len(fake_openai_server.requests) == 2
+    assert structured_output.get_stats()["order"]["failed"] == 1
+    assert structured_output.get_stats()["order"]["valid_parse_rate"] == 0.0
+
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("LLM_OUTPUT_MODE", "xml")
+    with pytest.raises(ValueError):
+        structured_output.get_mode()
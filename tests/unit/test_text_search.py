@@ -0,0 +1,31 @@
+"""
+Test for utils/text_search.py
+"""
+from utils.text_search import BM25Index, tokenize
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("Where are you located?") == ["locat"]
+    assert tokenize("Location hours on Holidays") == ["locat", "hour", "holiday"]
+    assert tokenize("Business address") == ["business", "address"]
+
+
+def test_search_ranks_relevant_documents():
+    index = BM25Index()
+    index.add("a", "Holiday Hours - Thanksgiving: Closed")
+    index.add("b", "Promotion - Spring sale: 20% off cleaning")
+    index.add("c", "Location - Main Store: 123 Main St")
+    assert [doc_id for doc_id, _ in index.search("Are you open on Thanksgiving?")] == ["a"]
+    assert index.search("main store location", k=1)[0][0] == "c"
+    assert index.search("unrelated words") == []
+
+
+def test_add_replace_and_remove():
+    index = BM25Index()
+    index.add("a", "spring sale")
+    index.add("a", "winter sale")
+    assert len(index) == 1
+    assert index.search("spring") == []
+    assert index.search("winter")[0][0] == "a"
+    index.remove("a")
+    assert len(index) == 0 and index.postings == {} and index.total_length == 0
@@ -1,15 +1,49 @@
 """
 Configuration loader for environment variables and constants.
-- Loads .env securely using python-dotenv
-- Raises clear error if OPENAI_API_KEY is missing
+- Loads .env securely using python-dotenv, on first use rather than at import
+- Raises a clear error if OPENAI_API_KEY is missing when a key is actually needed
+- Offline code paths (local matching, forecasts, CSV tools) never require a key
 """
-from dotenv import load_dotenv
 import os
+import threading
 from typing import Optional
 
-load_dotenv()
+_lock = threading.Lock()
+_loaded = False
 
-OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
 
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in environment variables. Please set it in your .env file.")
+def load_env() -> None:
+    """Load .env into os.environ once; variables already set in the environment win."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            try:
+                from dotenv import load_dotenv
+            except ImportError:  # plain environment variables still work
+                load_dotenv = None
+            if load_dotenv is not None:
+                load_dotenv()
+            _loaded = True
+
+
+def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a setting from the environment after loading .env."""
+    load_env()
+    return os.getenv(name, default)
+
+
+def get_openai_api_key(required: bool = True) -> Optional[str]:
+    """Return OPENAI_API_KEY, raising ValueError if it is missing and `required`."""
+    key = get_env("OPENAI_API_KEY")
+    if not key and required:
+        raise ValueError("OPENAI_API_KEY not found in environment variables. Please set it in your .env file.")
+    return key or None
+
+
+def __getattr__(name: str):
+    # `from utils.config import OPENAI_API_KEY` keeps working, resolved at first use
+    if name == "OPENAI_API_KEY":
+        return get_openai_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
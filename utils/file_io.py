@@ -1,10 +1,17 @@
 """
 Helper functions for reading and writing CSV, JSON, and PDF files.
 - Robust to malformed files and encoding issues
+- Streaming readers (iter_csv, iter_jsonl) that yield rows or fixed-size chunks, with optional typed columns
+- CsvAppender that writes rows as they are produced
 """
 import csv
 import json
-from typing import Any, List, Dict
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+Types = Dict[str, Callable[[str], Any]]
+ERRORS = ("raise", "coerce")
 
 
 def read_csv(filepath: str) -> List[Dict[str, Any]]:
@@ -32,3 +39,168 @@ def write_json(filepath: str, data: Any) -> None:
     """Write data to a JSON file."""
     with open(filepath, mode='w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group an iterable into lists of at most `size` items."""
+    if size < 1:
+        raise ValueError("chunk size must be at least 1.")
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _coerce(row: Dict[str, Any], types: Types, errors: str, where: str) -> Dict[str, Any]:
+    """Convert typed columns in place; blank values become None."""
+    for column, convert in types.items():
+        value = row.get(column)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            row[column] = None
+            continue
+        try:
+            row[column] = convert(value)
+        except (TypeError, ValueError) as e:
+            if errors == "raise":
+                raise ValueError(f"{where}: bad value {value!r} for column '{column}': {e}") from e
+            row[column] = None
+    return row
+
+
+def _check_errors(errors: str) -> None:
+    if errors not in ERRORS:
+        raise ValueError(f"errors must be one of: {', '.join(ERRORS)}.")
+
+
+def _rows_or_chunks(rows: Iterator[Dict[str, Any]], chunk_size: Optional[int]) -> Iterator:
+    return rows if chunk_size is None else chunked(rows, chunk_size)
+
+
+def iter_csv(
+    filepath: str,
+    chunk_size: Optional[int] = None,
+    types: Optional[Types] = None,
+    errors: str = "raise",
+    encoding: str = "utf-8",
+) -> Iterator:
+    """Stream a CSV file as dict rows, or as lists of up to `chunk_size` rows.
+
+    `types` maps columns to converters (e.g. {"stock": int, "sales": float})
+    applied as each row is read; blank values become None. With
+    errors="coerce" unconvertible values become None instead of raising.
+    Only the current chunk is held in memory.
+    """
+    _check_errors(errors)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        with open(filepath, mode="r", encoding=encoding, newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield _coerce(row, types, errors, f"{filepath}:{reader.line_num}") if types else row
+
+    return _rows_or_chunks(rows(), chunk_size)
+
+
+def iter_jsonl(
+    filepath: str,
+    chunk_size: Optional[int] = None,
+    types: Optional[Types] = None,
+    errors: str = "raise",
+    encoding: str = "utf-8",
+) -> Iterator:
+    """Stream a JSON Lines file as parsed values, or as lists of up to `chunk_size` values.
+
+    Blank lines are ignored. With errors="coerce", malformed lines (e.g. a
+    truncated last line) are skipped and unconvertible typed values become
+    None; otherwise both raise ValueError naming the line.
+    """
+    _check_errors(errors)
+
+    def rows() -> Iterator[Any]:
+        with open(filepath, mode="r", encoding=encoding) as f:
+            for line_num, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    value = json.loads(line)
+                except ValueError as e:
+                    if errors == "raise":
+                        raise ValueError(f"{filepath}:{line_num}: invalid JSON: {e}") from e
+                    continue
+                if types and isinstance(value, dict):
+                    value = _coerce(value, types, errors, f"{filepath}:{line_num}")
+                yield value
+
+    return _rows_or_chunks(rows(), chunk_size)
+
+
+class CsvAppender:
+    """Write CSV rows one at a time as they are produced.
+
+    The file is opened on the first write, so nothing is created for an empty
+    run. With mode 'a', rows are appended to an existing file and its header is
+    reused; with mode 'w' the file is replaced. Fieldnames default to the keys
+    of the first row; missing keys are written blank and extra keys ignored.
+    The file is flushed every `flush_every` rows and on close. Use as a
+    context manager or call close().
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        fieldnames: Optional[List[str]] = None,
+        mode: str = "a",
+        flush_every: int = 100,
+        encoding: str = "utf-8",
+    ):
+        if mode not in ("a", "w"):
+            raise ValueError("mode must be 'a' or 'w'.")
+        self.filepath = filepath
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.mode = mode
+        self.flush_every = max(1, flush_every)
+        self.encoding = encoding
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+
+    def _open(self, first_row: Dict[str, Any]) -> None:
+        existing = None
+        if self.mode == "a" and os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0:
+            with open(self.filepath, mode="r", encoding=self.encoding, newline="") as f:
+                existing = next(csv.reader(f), None)
+        fieldnames = existing or self.fieldnames or list(first_row)
+        self._file = open(self.filepath, mode=self.mode, encoding=self.encoding, newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, restval="", extrasaction="ignore")
+        if not existing:
+            self._writer.writeheader()
+        self.fieldnames = fieldnames
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self._open(row)
+        self._writer.writerow(row)
+        self.rows_written += 1
+        if self.rows_written % self.flush_every == 0:
+            self._file.flush()
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+            self.mode = "a"  # writing again continues the file
+
+    def __enter__(self) -> "CsvAppender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,191 @@
+"""
+JSON extraction from LLM responses.
+- Fast path: json.loads on the whole response (plus a stripped ``` fence)
+- Fallback: one pass over the text that finds balanced {...} / [...] values, respecting strings and escapes
+- Arrays, several objects in one response and truncated output (unclosed brackets) are handled
+- Typed JsonResult with an optional lightweight schema check
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+OPENERS = {"{": "}", "[": "]"}
+_OPENER = re.compile(r"[{\[]")
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+_MISSING = object()
+
+
+class JsonExtractionError(ValueError):
+    """No JSON value matching the schema could be extracted."""
+
+
+@dataclass
+class JsonResult:
+    value: Any = None
+    values: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    repaired: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _loads(text: str) -> Any:
+    # strict=False accepts raw newlines/tabs inside strings, which models often emit
+    return json.loads(text, strict=False)
+
+
+def _strip_fence(text: str) -> str:
+    """'```json\\n{...}\\n```' -> '{...}'."""
+    text = text.strip()
+    if text.startswith("```"):
+        newline = text.find("\n")
+        text = text[newline + 1:] if newline != -1 else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def _scan(text: str):
+    """Single pass over text: (complete values, value repaired from an unclosed tail or _MISSING).
+
+    The regexes jump straight between structural characters, so long string
+    contents and prose are skipped in C rather than walked char by char.
+    """
+    values: List[Any] = []
+    stack: List[str] = []
+    start = pos = 0
+    in_string = False
+    while True:
+        if not stack:
+            match = _OPENER.search(text, pos)
+            if match is None:
+                break
+            start, pos = match.start(), match.end()
+            stack.append(OPENERS[match.group()])
+            continue
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            break
+        char, pos = match.group(), match.end()
+        if char == '"':
+            while True:
+                end = _STRING_END.search(text, pos)
+                if end is None:
+                    in_string, pos = True, len(text)
+                    break
+                pos = end.end() + (1 if end.group() == "\\" else 0)
+                if end.group() == '"':
+                    break
+        elif char in OPENERS:
+            stack.append(OPENERS[char])
+        elif char != stack[-1]:
+            # Mismatched bracket: not JSON, resume scanning after it
+            stack.clear()
+        else:
+            stack.pop()
+            if not stack:
+                try:
+                    values.append(_loads(text[start:pos]))
+                except ValueError:
+                    pass
+    repaired = _MISSING
+    if stack:
+        tail = text[start:].rstrip().rstrip(",")
+        closing = ('"' if in_string else "") + "".join(reversed(stack))
+        try:
+            repaired = _loads(tail + closing)
+        except ValueError:
+            pass
+    return values, repaired
+
+
+def scan_json_values(text: str, repair_truncated: bool = True) -> List[Any]:
+    """Parse every top-level balanced JSON object or array embedded in text, in order.
+
+    Brackets inside string literals are ignored. With `repair_truncated`, a value
+    left open at the end of the text (e.g. output cut off at max_tokens) is closed
+    and parsed if possible, and returned last.
+    """
+    values, repaired = _scan(text)
+    if repair_truncated and repaired is not _MISSING:
+        values.append(repaired)
+    return values
+
+
+def check_schema(value: Any, schema: Any, path: str = "$") -> Optional[str]:
+    """Return None if value matches schema, otherwise a description of the first mismatch.
+
+    A schema is a type or tuple of types (isinstance check), a dict of
+    {key: schema} (required keys of an object), a one-item list [schema]
+    (an array whose items all match) or a frozenset of allowed values (enum).
+    """
+    if isinstance(schema, frozenset):
+        allowed = [item for item in schema if type(item) is type(value)]
+        if value not in allowed:
+            return f"{path}: expected one of {', '.join(sorted(map(repr, schema)))}, got {value!r}"
+        return None
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return f"{path}: expected object, got {type(value).__name__}"
+        for key, sub_schema in schema.items():
+            if key not in value:
+                return f"{path}: missing key '{key}'"
+            error = check_schema(value[key], sub_schema, f"{path}.{key}")
+            if error:
+                return error
+        return None
+    if isinstance(schema, list):
+        if not isinstance(value, list):
+            return f"{path}: expected array, got {type(value).__name__}"
+        for i, item in enumerate(value):
+            error = check_schema(item, schema[0], f"{path}[{i}]")
+            if error:
+                return error
+        return None
+    if not isinstance(value, schema):
+        return f"{path}: expected {getattr(schema, '__name__', schema)}, got {type(value).__name__}"
+    return None
+
+
+def parse_json(text: Optional[str], schema: Any = None) -> JsonResult:
+    """Extract JSON from an LLM response.
+
+    `value` is the first extracted value that matches `schema` (or the first
+    value when no schema is given); `values` holds every value found.
+    """
+    text = text or ""
+    values: List[Any] = []
+    repaired = False
+    try:
+        values = [_loads(_strip_fence(text) if text.lstrip().startswith("```") else text)]
+    except ValueError:
+        pass
+    if not values:
+        values, tail = _scan(text)
+        if not values and tail is not _MISSING:
+            # Only fall back to a closed-off truncated value when nothing complete was found
+            values, repaired = [tail], True
+    if not values:
+        return JsonResult(error="no JSON value found")
+    if schema is None:
+        return JsonResult(values[0], values, repaired=repaired)
+    error = None
+    for value in values:
+        error = check_schema(value, schema)
+        if error is None:
+            return JsonResult(value, values, repaired=repaired)
+    return JsonResult(None, values, error=error, repaired=repaired)
+
+
+def extract_json(text: Optional[str], schema: Any = None, default: Any = _MISSING) -> Any:
+    """Return the extracted value, or `default` if given; otherwise raise JsonExtractionError."""
+    result = parse_json(text, schema)
+    if result.ok:
+        return result.value
+    if default is not _MISSING:
+        return default
+    raise JsonExtractionError(result.error)
@@ -0,0 +1,52 @@
+"""
+Deferred imports for heavy dependencies (pandas, numpy, OCR and plotting libraries).
+- lazy_import() returns a module object whose code only runs on first attribute access
+- CLI --help, config errors and light code paths no longer pay seconds of import time
+- A missing package raises ImportError when first used, not when the caller is imported
+"""
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+class _MissingModule(ModuleType):
+    """Stand-in for a package that is not installed; any attribute access raises ImportError."""
+
+    def __getattr__(self, attr: str):
+        raise ImportError(f"{self.__name__} is not installed.")
+
+    def __bool__(self) -> bool:
+        return False
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module `name` without executing it until an attribute is first read.
+
+    Top-level names cost nothing until used. For dotted names the parent
+    packages are imported eagerly (finding the submodule requires them), so
+    prefer importing submodules such as matplotlib.pyplot inside the
+    function that needs them. Annotations must not touch the module at
+    definition time: write them as strings ("pd.DataFrame").
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        try:
+            spec = importlib.util.find_spec(name)
+        except ImportError:
+            spec = None
+        if spec is None or spec.loader is None:
+            return _MissingModule(name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+        return module
@@ -0,0 +1,131 @@
+"""
+Concurrent batch helpers for OpenAI calls.
+- Bounded thread pool that preserves input order
+- Token-bucket rate limiting on requests and tokens per minute
+- Retry with jittered exponential backoff on 429/5xx errors, replacing the SDK's own retries
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+from utils.openai_client import sdk_retries
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive.")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Wait for one request slot and `tokens` tokens of budget."""
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for TPM budgeting."""
+    return len(text) // 4 + 1
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Return True for rate-limit, server-side and transient connection errors."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Read a Retry-After header (seconds) from an API error, if present."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retries(func: Callable[..., Any], *args, max_retries: int = 5, **kwargs) -> Any:
+    """Call `func`, retrying retryable errors with full-jitter exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            print(f"[WARN] Retryable OpenAI error ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+
+def run_batch(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = 1,
+    rate_limiter: Optional[RateLimiter] = None,
+    token_estimator: Optional[Callable[[Any], int]] = None,
+    max_retries: int = 5,
+) -> List[Any]:
+    """Apply `func` to every item with bounded concurrency, rate limiting and retries. Output order matches input order.
+
+    OpenAI calls made by `func` skip the SDK's own retries, so each HTTP
+    attempt passes the rate limiter and an item makes at most max_retries + 1.
+    """
+
+    def task(item: Any) -> Any:
+        def attempt() -> Any:
+            if rate_limiter:
+                rate_limiter.acquire(token_estimator(item) if token_estimator else 0)
+            with sdk_retries(0):
+                return func(item)
+        return call_with_retries(attempt, max_retries=max_retries)
+
+    if concurrency <= 1:
+        return [task(item) for item in items]
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        return list(executor.map(task, items))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
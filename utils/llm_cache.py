@@ -0,0 +1,292 @@
+"""
+Persistent, content-addressed cache for OpenAI chat completions.
+- Keyed on a SHA-256 hash of (model, messages, max_tokens, extra request params)
+- Stored on disk in SQLite with TTL and size-bounded LRU eviction
+- Per-module opt-out via LLM_CACHE_DISABLED or disable_for()
+- Hit/miss counters per module
+- Streaming variant that caches only completed streams
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.config import get_env
+
+DEFAULT_CACHE_PATH = ".llm_cache.sqlite"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class LLMCache:
+    """SQLite-backed response store with TTL expiry and LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int], **params: Any) -> str:
+        """Hash the request parameters that determine the completion."""
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
+        if params:
+            payload["params"] = params
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value and evict least recently used entries beyond max_entries."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self.conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+_settings: Dict[str, Any] = {}
+_disabled_modules = set()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def configure(
+    path: Optional[str] = None,
+    ttl_seconds: Optional[float] = None,
+    max_entries: Optional[int] = None,
+    enabled: Optional[bool] = None,
+) -> None:
+    """Override cache settings (otherwise read from LLM_CACHE_* env vars) and reopen the store."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+        for name, value in (("path", path), ("ttl_seconds", ttl_seconds), ("max_entries", max_entries), ("enabled", enabled)):
+            if value is not None:
+                _settings[name] = value
+
+
+def reset() -> None:
+    """Close the store and drop configure() overrides, opt-outs and counters."""
+    configure()
+    with _cache_lock:
+        _settings.clear()
+        _disabled_modules.clear()
+        _stats.clear()
+
+
+def _setting(name: str, env_var: str, default: Any) -> Any:
+    if name in _settings:
+        return _settings[name]
+    return get_env(env_var, default)
+
+
+def _is_enabled() -> bool:
+    if "enabled" in _settings:
+        return bool(_settings["enabled"])
+    return get_env("LLM_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the shared cache, opening it on first use. None when caching is off."""
+    global _cache
+    if not _is_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                path=_setting("path", "LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(_setting("ttl_seconds", "LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_entries=int(_setting("max_entries", "LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            )
+        return _cache
+
+
+def disable_for(module: str) -> None:
+    """Opt a module out of caching."""
+    _disabled_modules.add(module)
+
+
+def enable_for(module: str) -> None:
+    """Undo disable_for() for a module."""
+    _disabled_modules.discard(module)
+
+
+def is_enabled_for(module: str) -> bool:
+    env_disabled = {m.strip() for m in get_env("LLM_CACHE_DISABLED", "").split(",") if m.strip()}
+    return module not in _disabled_modules and module not in env_disabled
+
+
+def _count(module: str, outcome: str) -> None:
+    with _cache_lock:
+        counters = _stats.setdefault(module, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """Return hit/miss counters per module."""
+    with _cache_lock:
+        return {module: dict(counters) for module, counters in _stats.items()}
+
+
+def reset_stats() -> None:
+    with _cache_lock:
+        _stats.clear()
+
+
+def _lookup(module: str, model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int], **params: Any) -> Tuple[Optional[LLMCache], Optional[str], Optional[str]]:
+    """Return (cache, key, cached_value); cache and key are None when caching is off for the module."""
+    cache = get_cache() if is_enabled_for(module) else None
+    if cache is None:
+        return None, None, None
+    key = LLMCache.make_key(model, messages, max_tokens, **params)
+    try:
+        cached = cache.get(key)
+    except sqlite3.Error as e:
+        print(f"[WARN] LLM cache read failed: {e}")
+        cached = None
+    _count(module, "hits" if cached is not None else "misses")
+    return cache, key, cached
+
+
+def _store(cache: Optional[LLMCache], key: Optional[str], content: str) -> None:
+    if cache is None:
+        return
+    try:
+        cache.set(key, content)
+    except sqlite3.Error as e:
+        print(f"[WARN] LLM cache write failed: {e}")
+
+
+def _message_text(message: Any) -> str:
+    """Message content, or the arguments of a forced function call."""
+    if getattr(message, "content", None):
+        return message.content
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        return tool_calls[0].function.arguments or ""
+    return ""
+
+
+def cached_chat_completion(
+    module: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    api_key: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    **params: Any,
+) -> str:
+    """Return the assistant message content for a chat completion, served from cache when possible.
+
+    Extra `params` (e.g. response_format, tools) are sent with the request and
+    are part of the cache key; for a forced function call the call's arguments
+    are returned. Misses go through the shared pooled client in
+    utils.openai_client. Errors from the OpenAI call propagate unchanged and
+    are never cached. If the cache store itself fails, the call falls through
+    to OpenAI.
+    """
+    from utils.openai_client import chat_completion
+
+    cache, key, cached = _lookup(module, model, messages, max_tokens, **params)
+    if cached is not None:
+        return cached
+    response = chat_completion(model, messages, max_tokens, timeout=timeout, api_key=api_key, max_retries=max_retries, **params)
+    content = _message_text(response.choices[0].message)
+    _store(cache, key, content)
+    return content
+
+
+def invalidate(module: str, model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int] = None, **params: Any) -> None:
+    """Drop a cached response, e.g. one that turned out to be unusable."""
+    cache = get_cache() if is_enabled_for(module) else None
+    if cache is None:
+        return
+    try:
+        cache.delete(LLMCache.make_key(model, messages, max_tokens, **params))
+    except sqlite3.Error as e:
+        print(f"[WARN] LLM cache write failed: {e}")
+
+
+def cached_chat_completion_stream(
+    module: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    api_key: Optional[str] = None,
+    max_retries: Optional[int] = None,
+) -> Iterator[str]:
+    """Streaming variant of cached_chat_completion yielding content deltas.
+
+    A cache hit is yielded as one chunk. A miss is streamed from OpenAI and
+    cached only if the stream completes; closing the generator early closes
+    the upstream stream and stores nothing.
+    """
+    from utils.openai_client import stream_chat_completion
+
+    cache, key, cached = _lookup(module, model, messages, max_tokens)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    with closing(stream_chat_completion(model, messages, max_tokens, timeout=timeout, api_key=api_key, max_retries=max_retries)) as stream:
+        for delta in stream:
+            parts.append(delta)
+            yield delta
+    _store(cache, key, "".join(parts))
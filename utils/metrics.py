@@ -0,0 +1,48 @@
+"""
+Lightweight in-process request metrics.
+- Per-path counters and latency percentiles (p50/p99) over a bounded window of recent samples
+- Thread-safe; intended for /metrics-style endpoints and tuning thresholds
+"""
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+DEFAULT_WINDOW = 10000
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyRecorder:
+    """Counts requests per path and keeps the last `window` latencies of each for percentiles."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def record(self, path: str, latency_ms: float) -> None:
+        with self.lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+            self.samples.setdefault(path, deque(maxlen=self.window)).append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return {path: {"count", "p50_ms", "p99_ms"}}."""
+        with self.lock:
+            data = {path: (self.counts[path], sorted(samples)) for path, samples in self.samples.items()}
+        return {
+            path: {"count": count, "p50_ms": percentile(values, 50), "p99_ms": percentile(values, 99)}
+            for path, (count, values) in data.items()
+        }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts.clear()
+            self.samples.clear()
@@ -0,0 +1,245 @@
+"""
+Shared, pooled OpenAI client factory.
+- One httpx connection pool shared by every module (keep-alive, warm TLS connections)
+- Pool limits, timeouts, retries, HTTP/2 and base_url set via configure() or OPENAI_* env vars
+- Per-call timeout and retry overrides on chat_completion() and stream_chat_completion();
+  sdk_retries() turns SDK retries off for callers that retry themselves (utils.llm_batch)
+- Streaming generator that closes the upstream HTTP stream when the consumer stops early
+- Clients are cached per (api_key, base_url) and all reuse the same pool
+- Token usage counters, including provider-side cached prompt tokens
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_MAX_RETRIES = 2
+
+_lock = threading.Lock()
+_settings: Dict[str, Any] = {}
+_http_client = None
+_clients: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+_usage: Dict[str, int] = {}
+_retries_override: ContextVar[Optional[int]] = ContextVar("openai_max_retries", default=None)
+
+
+def configure(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+    max_retries: Optional[int] = None,
+    http2: Optional[bool] = None,
+) -> None:
+    """Override client settings (otherwise read from OPENAI_* env vars) and drop the current pool."""
+    overrides = {
+        "api_key": api_key,
+        "base_url": base_url,
+        "timeout": timeout,
+        "connect_timeout": connect_timeout,
+        "max_connections": max_connections,
+        "max_keepalive_connections": max_keepalive_connections,
+        "keepalive_expiry": keepalive_expiry,
+        "max_retries": max_retries,
+        "http2": http2,
+    }
+    close()
+    with _lock:
+        for name, value in overrides.items():
+            if value is not None:
+                _settings[name] = value
+
+
+def reset() -> None:
+    """Close the pool and drop configure() overrides."""
+    close()
+    with _lock:
+        _settings.clear()
+
+
+def close() -> None:
+    """Close the shared connection pool; the next call opens a new one."""
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _clients.clear()
+
+
+def _setting(name: str, env_var: str, default: Any) -> Any:
+    if name in _settings:
+        return _settings[name]
+    from utils.config import get_env
+    return get_env(env_var, default)
+
+
+def _flag(name: str, env_var: str) -> bool:
+    value = _setting(name, env_var, False)
+    if isinstance(value, str):
+        return value.lower() in ("1", "on", "true", "yes")
+    return bool(value)
+
+
+def _default_timeout():
+    import openai
+    return openai.Timeout(
+        float(_setting("timeout", "OPENAI_TIMEOUT", DEFAULT_TIMEOUT)),
+        connect=float(_setting("connect_timeout", "OPENAI_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+    )
+
+
+def _build_http_client():
+    import openai
+    # The SDK re-exports its HTTP library's types; use them rather than importing that library directly
+    limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+        max_connections=int(_setting("max_connections", "OPENAI_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(_setting("max_keepalive_connections", "OPENAI_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(_setting("keepalive_expiry", "OPENAI_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+    kwargs = {"limits": limits, "timeout": _default_timeout()}
+    if _flag("http2", "OPENAI_HTTP2"):
+        kwargs["http2"] = True  # requires the h2 package
+    return openai.DefaultHttpxClient(**kwargs)
+
+
+def _default_api_key() -> Optional[str]:
+    if _settings.get("api_key"):
+        return _settings["api_key"]
+    from utils.config import get_openai_api_key
+    return get_openai_api_key()
+
+
+def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """Return a shared openai.OpenAI client backed by the pooled HTTP transport."""
+    global _http_client
+    import openai
+
+    api_key = api_key or _default_api_key()
+    base_url = base_url or _setting("base_url", "OPENAI_BASE_URL", None)
+    with _lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            if _http_client is None:
+                _http_client = _build_http_client()
+            client = openai.OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=_default_timeout(),
+                max_retries=int(_setting("max_retries", "OPENAI_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+                http_client=_http_client,
+            )
+            _clients[(api_key, base_url)] = client
+        return client
+
+
+@contextmanager
+def sdk_retries(max_retries: int):
+    """Use `max_retries` SDK retries for calls made in this context (thread/task) that don't set their own."""
+    token = _retries_override.set(max_retries)
+    try:
+        yield
+    finally:
+        _retries_override.reset(token)
+
+
+def _call_client(api_key: Optional[str], max_retries: Optional[int]):
+    client = get_client(api_key)
+    if max_retries is None:
+        max_retries = _retries_override.get()
+    # with_options shares the pooled HTTP client; only the retry policy differs
+    return client if max_retries is None else client.with_options(max_retries=max_retries)
+
+
+def chat_completion(
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    api_key: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    **params: Any,
+):
+    """Create a chat completion on the shared client.
+
+    `timeout` (per attempt) and `max_retries` override the client defaults for this call only.
+    """
+    if timeout is not None:
+        params["timeout"] = timeout
+    response = _call_client(api_key, max_retries).chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        **params
+    )
+    _record_usage(getattr(response, "usage", None))
+    return response
+
+
+def stream_chat_completion(
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    api_key: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    **params: Any,
+) -> Iterator[str]:
+    """Yield content deltas of a streamed chat completion.
+
+    Closing the generator (e.g. when an HTTP client disconnects) closes the
+    upstream response, so the provider stops generating tokens.
+    """
+    if timeout is not None:
+        params["timeout"] = timeout
+    stream = _call_client(api_key, max_retries).chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+        stream_options={"include_usage": True},
+        **params
+    )
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                _record_usage(chunk.usage)
+            for choice in chunk.choices or []:
+                if choice.delta is not None and choice.delta.content:
+                    yield choice.delta.content
+    finally:
+        stream.close()
+
+
+def _record_usage(usage: Any) -> None:
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    counts = {
+        "requests": 1,
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_prompt_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+    with _lock:
+        for name, value in counts.items():
+            _usage[name] = _usage.get(name, 0) + value
+
+
+def get_usage() -> Dict[str, int]:
+    """Return totals of requests, prompt/completion tokens and prompt tokens served from the provider's prefix cache."""
+    with _lock:
+        return dict(_usage)
+
+
+def reset_usage() -> None:
+    with _lock:
+        _usage.clear()
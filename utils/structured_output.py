@@ -0,0 +1,176 @@
+"""
+Structured (JSON) outputs for OpenAI chat completions.
+- Each task declares a JSON schema, sent as response_format json_schema (default) or as a forced function call
+- Replies are parsed with utils.json_extract and checked against the schema
+- A reply that does not parse gets one targeted repair call, not a rerun of the batch
+- Per-task counters: requests, valid first try, repaired, failed and the valid-parse rate
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from utils.config import get_env
+from utils.json_extract import JsonResult, check_schema, parse_json
+from utils.llm_cache import cached_chat_completion, invalidate
+
+MODES = ("json_schema", "tools", "prompt")
+DEFAULT_MODE = "json_schema"
+ARRAY_KEY = "items"
+REPAIR_PROMPT = (
+    "Your previous reply could not be used: {error}. "
+    "Reply again with only the corrected JSON that matches the required schema, and no other text."
+)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+_TYPES = {"string": str, "integer": int, "number": (int, float), "boolean": bool, "object": dict, "array": list}
+
+
+def mini_schema(json_schema: Dict[str, Any]) -> Any:
+    """Translate a JSON schema into the lightweight schema used by json_extract.check_schema."""
+    kind = json_schema.get("type")
+    if "enum" in json_schema:
+        return frozenset(json_schema["enum"])
+    if kind == "object" and "properties" in json_schema:
+        required = json_schema.get("required", list(json_schema["properties"]))
+        return {key: mini_schema(json_schema["properties"][key]) for key in required}
+    if kind == "array" and "items" in json_schema:
+        return [mini_schema(json_schema["items"])]
+    return _TYPES.get(kind, object)
+
+
+@dataclass
+class OutputSchema:
+    """A JSON-returning task.
+
+    `schema` describes the reply. With `array=True` the reply is a list of
+    `schema` items; response_format only accepts objects, so the list is
+    requested wrapped as {"items": [...]} and unwrapped after parsing.
+    `check` overrides the local validation derived from `schema` (e.g. to
+    accept partially valid batches and let the caller retry single items).
+    """
+    name: str
+    schema: Dict[str, Any]
+    array: bool = False
+    check: Any = None
+    description: str = ""
+
+    def wire_schema(self) -> Dict[str, Any]:
+        if not self.array:
+            return self.schema
+        return {
+            "type": "object",
+            "properties": {ARRAY_KEY: {"type": "array", "items": self.schema}},
+            "required": [ARRAY_KEY],
+            "additionalProperties": False,
+        }
+
+    def local_check(self) -> Any:
+        if self.check is not None:
+            return self.check
+        return [mini_schema(self.schema)] if self.array else mini_schema(self.schema)
+
+    def unwrap(self, value: Any) -> Any:
+        if self.array and isinstance(value, dict) and isinstance(value.get(ARRAY_KEY), list):
+            return value[ARRAY_KEY]
+        return value
+
+
+def get_mode(mode: Optional[str] = None) -> str:
+    """Resolve the output mode: the argument, else LLM_OUTPUT_MODE, else json_schema."""
+    mode = (mode or get_env("LLM_OUTPUT_MODE") or DEFAULT_MODE).lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM output mode '{mode}'. Use one of: {', '.join(MODES)}.")
+    return mode
+
+
+def request_params(output: OutputSchema, mode: str) -> Dict[str, Any]:
+    """Extra chat.completions.create parameters for the mode."""
+    if mode == "json_schema":
+        return {"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": output.name, "schema": output.wire_schema(), "strict": True},
+        }}
+    if mode == "tools":
+        return {
+            "tools": [{"type": "function", "function": {
+                "name": output.name,
+                "description": output.description or f"Return the {output.name} result.",
+                "parameters": output.wire_schema(),
+            }}],
+            "tool_choice": {"type": "function", "function": {"name": output.name}},
+        }
+    return {}
+
+
+def _parse(output: OutputSchema, content: str) -> JsonResult:
+    result = parse_json(content)
+    check = output.local_check()
+    error = result.error
+    for value in result.values:
+        value = output.unwrap(value)
+        error = check_schema(value, check)
+        if error is None:
+            return JsonResult(value, result.values, repaired=result.repaired)
+    return JsonResult(None, result.values, error=error, repaired=result.repaired)
+
+
+def _count(task: str, outcome: str) -> None:
+    with _stats_lock:
+        counters = _stats.setdefault(task, {"requests": 0, "valid_first_try": 0, "valid_after_repair": 0, "failed": 0, "repair_calls": 0})
+        counters[outcome] += 1
+
+
+def structured_completion(
+    module: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    output: OutputSchema,
+    max_tokens: Optional[int] = None,
+    mode: Optional[str] = None,
+    timeout: Optional[float] = None,
+    api_key: Optional[str] = None,
+) -> JsonResult:
+    """Run a JSON-returning chat completion and return the parsed, schema-checked result.
+
+    If the reply does not parse or fails the schema check, its cache entry is
+    dropped and one repair request is sent with the bad reply and the error.
+    The result is `ok` only if a valid value was obtained. OpenAI errors propagate.
+    """
+    mode = get_mode(mode)
+    params = request_params(output, mode)
+    _count(output.name, "requests")
+    content = cached_chat_completion(module, model, messages, max_tokens, timeout=timeout, api_key=api_key, **params)
+    result = _parse(output, content)
+    if result.ok:
+        _count(output.name, "valid_first_try")
+        return result
+    invalidate(module, model, messages, max_tokens, **params)
+    repair_messages = messages + [
+        {"role": "assistant", "content": content},
+        {"role": "user", "content": REPAIR_PROMPT.format(error=result.error)},
+    ]
+    _count(output.name, "repair_calls")
+    content = cached_chat_completion(module, model, repair_messages, max_tokens, timeout=timeout, api_key=api_key, **params)
+    result = _parse(output, content)
+    if result.ok:
+        _count(output.name, "valid_after_repair")
+    else:
+        invalidate(module, model, repair_messages, max_tokens, **params)
+        _count(output.name, "failed")
+    return result
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Return per-task counters plus the valid-parse rate (valid first try or after repair)."""
+    with _stats_lock:
+        stats = {task: dict(counters) for task, counters in _stats.items()}
+    for counters in stats.values():
+        valid = counters["valid_first_try"] + counters["valid_after_repair"]
+        counters["valid_parse_rate"] = round(valid / counters["requests"], 4) if counters["requests"] else None
+    return stats
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
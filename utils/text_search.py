@@ -0,0 +1,89 @@
+"""
+Small in-memory BM25 index for retrieving short text records.
+- Lowercased word tokens with stopwords removed and common suffixes stripped
+- Documents can be added, replaced and removed one at a time (incremental updates)
+- Top-k search via an inverted index, touching only postings of the query terms
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "the", "to", "we", "what", "when", "where", "which",
+    "with", "you", "your",
+}
+SUFFIXES = ("ions", "ion", "ing", "ed", "es", "e", "s")
+MIN_STEM = 3
+
+
+def stem(token: str) -> str:
+    """Strip one common suffix so 'located'/'location' and 'holidays'/'holiday' share a term."""
+    if token.endswith("ss"):
+        return token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(token) for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over documents keyed by id."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.texts: Dict[str, str] = {}
+        self.lengths: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any existing document with the same id."""
+        if doc_id in self.texts:
+            self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        self.texts[doc_id] = text
+        self.lengths[doc_id] = sum(counts.values())
+        self.total_length += self.lengths[doc_id]
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str) -> None:
+        text = self.texts.pop(doc_id, None)
+        if text is None:
+            return
+        self.total_length -= self.lengths.pop(doc_id)
+        for term in set(tokenize(text)):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to k (doc_id, score) pairs with a positive score, best first."""
+        n_docs = len(self.texts)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self.texts)
@@ -0,0 +1,92 @@
+"""
+Helpers for time-of-day arithmetic used by the schedulers.
+- 'HH:MM' and '9am'/'6:30pm' parsing to minutes since midnight
+- Opening-hours specs like 'Mon-Fri 8am-6pm; Sat 9am-3pm'
+- Interval merging and free-window sweeps
+"""
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def parse_hhmm(value: str) -> int:
+    """Convert an 'HH:MM' string to minutes since midnight (accepts what strptime('%H:%M') accepts)."""
+    hours, sep, minutes = value.partition(":")
+    if sep and hours.isdigit() and minutes.isdigit() and len(hours) <= 2 and len(minutes) <= 2:
+        h, m = int(hours), int(minutes)
+        if h < 24 and m < 60:
+            return h * 60 + m
+    t = datetime.strptime(value, "%H:%M").time()
+    return t.hour * 60 + t.minute
+
+
+def format_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_clock(value: str) -> int:
+    """Parse '9am', '6:30pm', '12pm' or '17:00' to minutes since midnight."""
+    text = value.strip().lower().replace(" ", "")
+    if text.endswith(("am", "pm")):
+        suffix, text = text[-2:], text[:-2]
+        hours, _, minutes = text.partition(":")
+        h, m = int(hours), int(minutes or 0)
+        if not (1 <= h <= 12 and 0 <= m < 60):
+            raise ValueError(f"Invalid time: {value}")
+        return (h % 12 + (12 if suffix == "pm" else 0)) * 60 + m
+    return parse_hhmm(text)
+
+
+def parse_time_range(value: str) -> Tuple[int, int]:
+    """Parse '10am-2pm' or '09:00-17:00' to (start, end) minutes."""
+    start, sep, end = value.strip().partition("-")
+    if not sep:
+        raise ValueError(f"Invalid time range: {value}")
+    return parse_clock(start), parse_clock(end)
+
+
+def parse_hours_spec(spec: str) -> Dict[int, List[Tuple[int, int]]]:
+    """Parse 'Mon-Fri 8am-6pm; Sat 9am-3pm' to {weekday: [(start, end)]} with Monday == 0."""
+    hours: Dict[int, List[Tuple[int, int]]] = {}
+    for part in spec.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        days, _, times = part.partition(" ")
+        first, _, last = days.lower().partition("-")
+        first_idx = WEEKDAYS.index(first[:3])
+        last_idx = WEEKDAYS.index(last[:3]) if last else first_idx
+        window = parse_time_range(times)
+        for day in range(first_idx, last_idx + 1):
+            hours.setdefault(day, []).append(window)
+    return hours
+
+
+def merge_intervals(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort and merge overlapping or touching (start, end) intervals."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_windows(merged: List[Tuple[int, int]], day_start: int, day_end: int) -> List[Tuple[int, int]]:
+    """Gaps between merged busy intervals within [day_start, day_end)."""
+    windows = []
+    cursor = day_start
+    for b_start, b_end in merged:
+        if b_end <= cursor:
+            continue
+        if b_start >= day_end:
+            break
+        if b_start > cursor:
+            windows.append((cursor, b_start))
+        cursor = b_end
+    if cursor < day_end:
+        windows.append((cursor, day_end))
+    return windows